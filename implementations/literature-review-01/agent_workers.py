@@ -0,0 +1,105 @@
+"""
+Agent workers for the distributed runtime.
+
+Runs the gRPC host and the role workers a distributed ResearchTeam talks to
+(see src/distributed_runtime.py). Every worker hosts one replica of one role
+with its own Ollama clients, scheduler and event loop; more replicas of a
+busy role can be started on this machine or on others.
+
+Teams use the workers when DistributedConfig.ENABLED is set (REVIEW_DISTRIBUTED=1)
+and DistributedConfig.REPLICAS matches the replicas that are running.
+
+Usage:
+    python agent_workers.py up                                  # host and every replica here
+    python agent_workers.py host --address 0.0.0.0:50051
+    python agent_workers.py worker Reviewer --replica 1 --host gpu-box:50051
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+
+from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntimeHost
+
+from src.config import DistributedConfig
+from src.distributed_runtime import ROLE_AGENTS, replica_agent_type, start_role_worker
+from src.team import model_residency
+
+
+async def serve_host(address: str) -> None:
+    """Run the gRPC host until interrupted."""
+    host = GrpcWorkerAgentRuntimeHost(address=address)
+    host.start()
+    print(f"Agent host listening on {address}")
+    await host.stop_when_signal()
+
+
+async def serve_role(role: str, replica: int, host_address: str) -> None:
+    """Run one role replica until interrupted."""
+    await model_residency.preload()
+    runtime = await start_role_worker(role, replica, host_address)
+    print(f"{replica_agent_type(role, replica)} connected to {host_address}")
+    await runtime.stop_when_signal()
+
+
+def role_worker_main(role: str, replica: int, host_address: str) -> None:
+    """Worker process entry point."""
+    try:
+        asyncio.run(serve_role(role, replica, host_address))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve_all(address: str, replicas: dict) -> None:
+    """Run the host and every replica of every role, each replica in its own process."""
+    host = GrpcWorkerAgentRuntimeHost(address=address)
+    host.start()
+    print(f"Agent host listening on {address}")
+
+    # Spawned workers do not inherit the host's threads or event loop
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for role, count in replicas.items():
+        for replica in range(count):
+            process = context.Process(target=role_worker_main, args=(role, replica, address), daemon=True)
+            process.start()
+            processes.append(process)
+
+    try:
+        await host.stop_when_signal()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+def main():
+    """Agent workers entry point."""
+    parser = argparse.ArgumentParser(description="Run the agent host and role workers of the distributed runtime.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    up = commands.add_parser("up", help="Run the host and DistributedConfig.REPLICAS replicas of every role")
+    up.add_argument("--address", default=DistributedConfig.HOST_ADDRESS, help=f"Host address (default: {DistributedConfig.HOST_ADDRESS})")
+
+    host = commands.add_parser("host", help="Run only the host")
+    host.add_argument("--address", default=DistributedConfig.HOST_ADDRESS, help=f"Host address (default: {DistributedConfig.HOST_ADDRESS})")
+
+    worker = commands.add_parser("worker", help="Run one replica of one role")
+    worker.add_argument("role", choices=list(ROLE_AGENTS))
+    worker.add_argument("--replica", type=int, default=0, help="Replica number, from 0 (default: 0)")
+    worker.add_argument("--host", default=DistributedConfig.HOST_ADDRESS, help=f"Host address (default: {DistributedConfig.HOST_ADDRESS})")
+
+    args = parser.parse_args()
+
+    if args.command == "up":
+        asyncio.run(serve_all(args.address, DistributedConfig.REPLICAS))
+    elif args.command == "host":
+        asyncio.run(serve_host(args.address))
+    else:
+        if args.replica < 0:
+            parser.error("--replica must be at least 0")
+        role_worker_main(args.role, args.replica, args.host)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
 import asyncio
+import uuid
 import streamlit as st
-from src.config import UIConfig
-from src.team import ResearchTeam
+from src.config import EventLogConfig, ProfilerConfig, ServiceConfig, SessionConfig, UIConfig
+from src.event_log import EventLog, replay_run
+from src.service_client import stream_review, submit_review
 
 
 def initialize_session_state():
     """Initialize session state variables if they don't exist."""
-    if "agent_team" not in st.session_state:
+    if ServiceConfig.URL:
+        # Thin client: the review service runs the team, keyed by this session
+        if "session_id" not in st.session_state:
+            st.session_state["session_id"] = uuid.uuid4().hex
+    elif "agent_team" not in st.session_state:
+        # Imported here so a thin client never loads the agents and model clients
+        from src.team import ResearchTeam, model_residency
+
         # Create event loop for async operations
         loop = asyncio.new_event_loop()
         st.session_state["event_loop"] = loop
         asyncio.set_event_loop(loop)
         
+        # Load the models before the first query instead of during it
+        loop.run_until_complete(model_residency.preload())
+        
         # Initialize the research team
         st.session_state["agent_team"] = ResearchTeam()
     
@@ -46,6 +58,45 @@ def display_sidebar():
         
         st.divider()
         
+        st.header("🧠 Session Memory")
+        carry_over = st.selectbox(
+            "Carry over between queries",
+            SessionConfig.CARRY_OVER_MODES,
+            index=SessionConfig.CARRY_OVER_MODES.index(SessionConfig.CARRY_OVER),
+            help="Each query starts fresh by default. Carrying over the selected "
+                 "papers or a short summary keeps follow-up questions in context, "
+                 f"capped at {SessionConfig.MAX_CARRY_OVER_TOKENS} tokens.",
+        )
+        st.session_state["carry_over"] = carry_over
+        if "agent_team" in st.session_state:
+            st.session_state["agent_team"].carry_over = carry_over
+            
+            # Profiling runs in the service is switched on with REVIEW_PROFILE instead
+            st.session_state["agent_team"].profile = st.toggle(
+                "Profile runs",
+                value=ProfilerConfig.ENABLED,
+                help="Write a flamegraph-compatible profile and a hotspot summary "
+                     f"per run to {ProfilerConfig.OUTPUT_DIR}.",
+            )
+        
+        st.divider()
+        
+        st.header("📼 Replay")
+        runs = recent_runs(index_mtime())
+        if runs:
+            labels = {
+                run["run_id"]: f"{run['task'][:40]} ({run['run_id']})" + ("" if run["complete"] else " ⚠️")
+                for run in runs
+            }
+            run_id = st.selectbox("Logged run", list(labels), format_func=labels.get)
+            realtime = st.toggle("Original timing", help="Replay at the pace the run originally took")
+            if st.button("Replay run"):
+                st.session_state["replay"] = (run_id, realtime)
+        else:
+            st.caption("Finished runs are logged here and can be replayed without the models.")
+        
+        st.divider()
+        
         st.header("⚙️ Configuration")
         st.markdown(f"""
         - **Researcher Model**: granite3.3:2b
@@ -54,11 +105,180 @@ def display_sidebar():
         """)
 
 
-def display_chat_history():
-    """Display all previous messages in the chat."""
-    for message in st.session_state["messages"]:
-        with st.chat_message(message["role"]):
+def index_mtime() -> float:
+    """Modification time of the event log index; 0 before the first run is logged."""
+    try:
+        return EventLog().index_path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def recent_runs(mtime: float) -> list:
+    """Runs offered for replay; read again only when the index changed (mtime)."""
+    return EventLog().runs(limit=EventLogConfig.REPLAY_LIST_SIZE)
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def review_preview(content: str) -> str:
+    """
+    Build the one-line label of a collapsed message.
+    
+    Args:
+        content (str): Message markdown
+    
+    Returns:
+        str: First non-empty line without markdown markers, shortened to UIConfig.PREVIEW_CHARS
+    """
+    for line in content.splitlines():
+        line = line.strip().lstrip("#>*-").strip()
+        if line:
+            break
+    else:
+        line = "(empty)"
+    
+    if len(line) > UIConfig.PREVIEW_CHARS:
+        line = line[:UIConfig.PREVIEW_CHARS - 1].rstrip() + "…"
+    return line
+
+
+def display_message(index: int, message: dict, collapsed: bool):
+    """
+    Display one chat message, collapsing it behind an expander if requested.
+    
+    Args:
+        index (int): Position of the message in the history, used for widget keys
+        message (dict): Message with "role" and "content"
+        collapsed (bool): Whether to collapse the message until it is loaded
+    """
+    with st.chat_message(message["role"]):
+        if not collapsed:
             st.markdown(message["content"])
+            return
+        
+        # Collapsed bodies are only sent to the browser once they are asked for
+        with st.expander(review_preview(message["content"])):
+            if st.checkbox("Load full review", key=f"load_message_{index}"):
+                st.markdown(message["content"])
+
+
+def display_chat_history():
+    """Display one page of previous messages, newest page first."""
+    messages = st.session_state["messages"]
+    page_size = UIConfig.HISTORY_PAGE_SIZE
+    pages = max(1, -(-len(messages) // page_size))
+    page = min(st.session_state.get("history_page", 0), pages - 1)
+    
+    # Page 0 holds the newest messages
+    end = len(messages) - page * page_size
+    start = max(0, end - page_size)
+    
+    if pages > 1:
+        older, position, newer = st.columns([1, 2, 1])
+        if older.button("⬅️ Older", disabled=page == pages - 1):
+            st.session_state["history_page"] = page + 1
+            st.rerun()
+        position.caption(f"Messages {start + 1}–{end} of {len(messages)}")
+        if newer.button("Newer ➡️", disabled=page == 0):
+            st.session_state["history_page"] = page - 1
+            st.rerun()
+    
+    for index in range(start, end):
+        message = messages[index]
+        collapsed = (
+            message["role"] == "assistant"
+            and index < len(messages) - UIConfig.RECENT_FULL_MESSAGES
+        )
+        display_message(index, message, collapsed)
+
+
+def render_deltas(deltas, status) -> str:
+    """
+    Show the current turn of a run as its deltas arrive.
+    
+    Args:
+        deltas: Iterable of deltas in the ResearchTeam.stream_chat format
+        status: st.status box updated with the run's progress
+    
+    Returns:
+        str: Formatted conversation, or an error note
+    """
+    placeholder = st.empty()
+    source, text = None, ""
+    response = "❌ The run ended before it finished."
+    
+    for delta in deltas:
+        event = delta["event"]
+        if event == "entry":
+            source, text = delta["source"], delta.get("content", "")
+            if delta["type"] == "tool_request":
+                status.update(label=f"🛠️ {source} is calling {delta['tool_name']}")
+        elif event == "chunk":
+            text += delta["content"]
+        elif event == "done":
+            response = delta["content"]
+            break
+        elif event == "cancelled":
+            response = "🛑 The review was cancelled."
+            break
+        elif event == "error":
+            response = f"❌ The review failed: {delta['error']}"
+            break
+        
+        if text:
+            placeholder.markdown(f"**{source.title()}**:\n\n{text}")
+    
+    status.update(label="Done", state="complete")
+    placeholder.markdown(response)
+    return response
+
+
+def stream_from_service(prompt: str) -> str:
+    """
+    Run the query on the review service, showing the current turn as it streams in.
+    
+    Args:
+        prompt (str): User's research query
+    
+    Returns:
+        str: Formatted conversation, or an error note
+    """
+    status = st.status("🤖 AI team is collaborating... This may take a moment.")
+    job_id = submit_review(
+        ServiceConfig.URL,
+        prompt,
+        session=st.session_state["session_id"],
+        carry_over=st.session_state.get("carry_over", SessionConfig.CARRY_OVER),
+    )
+    return render_deltas(stream_review(ServiceConfig.URL, job_id), status)
+
+
+def handle_replay(run_id: str, realtime: bool):
+    """
+    Replay a logged run into the chat without calling any model.
+    
+    Args:
+        run_id (str): Run to replay from the event log
+        realtime (bool): Reproduce the original timing instead of replaying instantly
+    """
+    header, records = EventLog().load(run_id)
+    
+    st.session_state["history_page"] = 0
+    st.session_state["messages"].append({
+        "role": "user",
+        "content": f"📼 Replay of `{run_id}`: {header['task']}"
+    })
+    with st.chat_message("user"):
+        st.markdown(st.session_state["messages"][-1]["content"])
+    
+    with st.chat_message("assistant"):
+        status = st.status("📼 Replaying run...")
+        response = render_deltas(replay_run(records, realtime=realtime), status)
+    
+    st.session_state["messages"].append({
+        "role": "assistant",
+        "content": response
+    })
 
 
 def handle_user_input(prompt: str):
@@ -68,7 +288,8 @@ def handle_user_input(prompt: str):
     Args:
         prompt (str): User's research query
     """
-    # Add user message to history
+    # Add user message to history and jump back to the newest page
+    st.session_state["history_page"] = 0
     st.session_state["messages"].append({
         "role": "user",
         "content": prompt
@@ -80,15 +301,22 @@ def handle_user_input(prompt: str):
     
     # Get AI response
     with st.chat_message("assistant"):
-        with st.spinner("🤖 AI team is collaborating... This may take a moment."):
-            # Run the async task
-            loop = st.session_state["event_loop"]
-            response = loop.run_until_complete(
-                st.session_state["agent_team"].run_chat(prompt)
-            )
-            
-            # Display the response
-            st.markdown(response)
+        if ServiceConfig.URL:
+            response = stream_from_service(prompt)
+        else:
+            with st.spinner("🤖 AI team is collaborating... This may take a moment."):
+                # Run the async task
+                loop = st.session_state["event_loop"]
+                response = loop.run_until_complete(
+                    st.session_state["agent_team"].run_chat(prompt)
+                )
+                
+                # Display the response
+                st.markdown(response)
+                
+                profile = st.session_state["agent_team"].last_run_stats.get("profile")
+                if profile:
+                    st.caption(f"🔬 Profile `{profile['run_id']}` saved to `{profile['profile']}`")
     
     # Add assistant response to history
     st.session_state["messages"].append({
@@ -122,6 +350,10 @@ def main():
     # Display chat history
     display_chat_history()
     
+    # Replay a logged run if one was requested from the sidebar
+    if "replay" in st.session_state:
+        handle_replay(*st.session_state.pop("replay"))
+    
     # Handle user input
     if prompt := st.chat_input(UIConfig.DEFAULT_PLACEHOLDER):
         handle_user_input(prompt)
@@ -0,0 +1,205 @@
+"""
+Headless batch runner for literature reviews.
+
+Reads research queries from a JSONL file (one {"id": ..., "query": ...} object
+per line), runs a ResearchTeam pipeline per query with bounded concurrency and
+appends every finished review to an output JSONL file as soon as it completes.
+Ids already recorded as successful in the output file are skipped, so an
+interrupted run can simply be restarted with the same arguments.
+
+Usage:
+    python batch.py queries.jsonl reviews.jsonl --concurrency 2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from src.config import BatchConfig
+from src.scheduler import Priority
+from src.team import ResearchTeam, model_residency
+
+
+def load_jobs(input_path: Path) -> list:
+    """
+    Read the research queries to run.
+
+    Args:
+        input_path (Path): JSONL file with "id" and "query" fields
+
+    Returns:
+        list: Job dictionaries in file order
+    """
+    jobs = []
+    seen_ids = set()
+
+    with input_path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+
+            job = json.loads(line)
+            if "id" not in job or not job.get("query"):
+                raise ValueError(f"Line {line_number}: each job needs an 'id' and a non-empty 'query'")
+
+            job_id = str(job["id"])
+            if job_id in seen_ids:
+                raise ValueError(f"Line {line_number}: duplicate job id {job_id!r}")
+            seen_ids.add(job_id)
+
+            jobs.append({"id": job_id, "query": job["query"]})
+
+    return jobs
+
+
+def load_completed_ids(output_path: Path) -> set:
+    """
+    Collect ids that already finished successfully in a previous run.
+
+    Args:
+        output_path (Path): JSONL file written by earlier runs
+
+    Returns:
+        set: Ids to skip
+    """
+    if not output_path.exists():
+        return set()
+
+    completed = set()
+    with output_path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(str(record["id"]))
+
+    return completed
+
+
+class ResultWriter:
+    """Appends result records to the output file, one line per finished job."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self._lock = asyncio.Lock()
+        self.written = 0
+        self.failed = 0
+
+    async def write(self, record: dict) -> None:
+        async with self._lock:
+            with self.output_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+
+            self.written += 1
+            if record["status"] != "ok":
+                self.failed += 1
+
+            elapsed = record.get("stats", {}).get("elapsed_seconds")
+            timing = f" in {elapsed:.1f}s" if elapsed is not None else ""
+            print(f"[{record['status']}] {record['id']}{timing}", file=sys.stderr)
+
+
+async def run_job(job: dict, semaphore: asyncio.Semaphore, writer: ResultWriter) -> None:
+    """
+    Run one literature review and record its outcome.
+
+    Args:
+        job (dict): Job with "id" and "query"
+        semaphore (asyncio.Semaphore): Bounds the number of concurrent pipelines
+        writer (ResultWriter): Shared output sink
+    """
+    async with semaphore:
+        # Each job gets its own team so conversation histories never mix
+        team = ResearchTeam(priority=Priority.BACKGROUND)
+        started_at = time.time()
+
+        try:
+            review = await team.run_chat(job["query"])
+        except Exception as e:
+            await writer.write({
+                "id": job["id"],
+                "query": job["query"],
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+                "started_at": started_at,
+            })
+            return
+        finally:
+            # Frees the team's agents in the role workers in distributed mode
+            await team.close()
+
+        await writer.write({
+            "id": job["id"],
+            "query": job["query"],
+            "status": "ok",
+            "review": review,
+            "stats": team.last_run_stats,
+            "started_at": started_at,
+        })
+
+
+async def run_batch(input_path: Path, output_path: Path, concurrency: int) -> int:
+    """
+    Run every pending job from the input file.
+
+    Args:
+        input_path (Path): JSONL file of research queries
+        output_path (Path): JSONL file receiving the reviews
+        concurrency (int): Maximum number of pipelines running at once
+
+    Returns:
+        int: Number of jobs that failed
+    """
+    jobs = load_jobs(input_path)
+    completed = load_completed_ids(output_path)
+    pending = [job for job in jobs if job["id"] not in completed]
+
+    print(
+        f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, "
+        f"{len(pending)} to run with concurrency {concurrency}",
+        file=sys.stderr,
+    )
+
+    await model_residency.preload()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    writer = ResultWriter(output_path)
+    await asyncio.gather(*(run_job(job, semaphore, writer) for job in pending))
+
+    return writer.failed
+
+
+def main():
+    """Batch entry point."""
+    parser = argparse.ArgumentParser(description="Run many literature reviews from a JSONL file.")
+    parser.add_argument("input", type=Path, help="JSONL file with one {\"id\", \"query\"} object per line")
+    parser.add_argument("output", type=Path, help="JSONL file the finished reviews are appended to")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BatchConfig.DEFAULT_CONCURRENCY,
+        help=f"Number of reviews running at once (default: {BatchConfig.DEFAULT_CONCURRENCY})",
+    )
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    try:
+        failed = asyncio.run(run_batch(args.input, args.output, args.concurrency))
+    except KeyboardInterrupt:
+        print("Batch interrupted. Re-run the same command to resume.", file=sys.stderr)
+        sys.exit(130)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Build the offline citation/venue index used to pre-rank search results.
+
+Reads an offline dataset as JSONL, one paper per line:
+    {"arxiv_id": "2301.01234", "citations": 120, "influential_citations": 14,
+     "venue": "NeurIPS", "venue_tier": 3}
+
+Only "arxiv_id" is required; venue_tier runs from 0 (unknown) to 3 (top
+venue). Versions in the ids are ignored and the last line of a paper wins.
+
+Usage:
+    python build_citation_index.py citations.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from src.citation_index import build_index
+from src.config import CitationIndexConfig
+
+
+def read_records(input_path: Path):
+    """
+    Stream the dataset records.
+
+    Args:
+        input_path (Path): JSONL dataset
+
+    Yields:
+        dict: One record per non-empty line
+    """
+    with input_path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{input_path}:{line_number}: invalid JSON ({e})") from e
+            if "arxiv_id" not in record:
+                raise ValueError(f"{input_path}:{line_number}: missing \"arxiv_id\"")
+            yield record
+
+
+def main():
+    """Index build entry point."""
+    parser = argparse.ArgumentParser(description="Build the citation/venue index from a JSONL dataset.")
+    parser.add_argument("input", type=Path, help="JSONL file with one paper per line")
+    parser.add_argument("--index", default=CitationIndexConfig.PATH, help=f"Output table (default: {CitationIndexConfig.PATH})")
+    parser.add_argument(
+        "--venues",
+        default=CitationIndexConfig.VENUES_PATH,
+        help=f"Output venue names (default: {CitationIndexConfig.VENUES_PATH})",
+    )
+    args = parser.parse_args()
+
+    try:
+        count = build_index(read_records(args.input), args.index, args.venues)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Indexed {count} papers into {args.index}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+"""
+Concurrent-user load test for ResearchTeam.
+
+Simulates N users, each with its own team (like one Streamlit session),
+submitting literature review tasks back to back. Ollama and arXiv are
+replaced by a scripted model client and a stubbed search with configurable
+latency distributions, so the numbers show how the pipeline itself (the
+LLMScheduler queue, the event loop and the team orchestration) behaves as
+concurrency rises.
+
+Each concurrency level reports throughput, p50/p95/p99 end-to-end latency
+and the time model calls spent queued in the LLMScheduler. Scaling
+efficiency is throughput relative to perfect scaling of the one-user level;
+where it drops off is where a single app instance stops scaling.
+
+Latency distributions:
+    const:S                 always S seconds
+    uniform:LOW,HIGH        uniform between LOW and HIGH seconds
+    normal:MEAN,SD          normal, clipped at 0
+    lognormal:MEDIAN,SIGMA  lognormal with the given median and shape
+
+Usage:
+    python loadtest.py --users 1,2,4,8 --tasks-per-user 5 --model-latency lognormal:1.5,0.5
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import zlib
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken, FunctionCall
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    ModelInfo,
+    RequestUsage,
+    UserMessage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from src.config import ModelConfig, RunBudgetConfig, SchedulerConfig
+from src.papers import parse_papers
+from src.request_parsing import extract_paper_count, extract_search_intent
+from src.team import ResearchTeam
+
+TOPICS = [
+    "transformer architectures",
+    "multi-agent reinforcement learning",
+    "explainable AI in healthcare",
+    "graph neural networks for drug discovery",
+    "retrieval-augmented generation",
+    "federated learning privacy",
+    "diffusion models for image synthesis",
+    "large language model evaluation",
+]
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution.
+
+    Args:
+        spec (str): Distribution spec, e.g. "lognormal:1.5,0.5" (see module docstring)
+
+    Returns:
+        Callable[[random.Random], float]: Draws one latency in seconds
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Latency parameters must be numbers. Found value: {spec}")
+
+    expected = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+
+    if kind == "const":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+
+
+def percentile(samples: list, percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, math.ceil(percent / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+class ScriptedChatCompletionClient(ChatCompletionClient):
+    """
+    Stand-in for the Ollama clients that answers every pipeline role.
+
+    The role is read from the call itself: a call with tools is the
+    Researcher (answered with a Search_arXiv call), a structured call is the
+    Reviewer (a selection of the candidates) and anything else is a Writer
+    (a review of review_words words, streamed in chunks over the latency).
+    """
+
+    def __init__(self, model: str, latency, rng: random.Random, review_words: int = 400,
+                 swap_latency=None, resident: dict = None):
+        """
+        Args:
+            model (str): Model name reported to the scheduler
+            latency: Callable drawing one call latency in seconds
+            rng (random.Random): Source of randomness, shared for reproducible runs
+            review_words (int): Length of every written review
+            swap_latency: Callable drawing the cost of loading this model when
+                another one was used last
+            resident (dict): State shared by the clients of one simulated Ollama
+        """
+        self._model = model
+        self._latency = latency
+        self._rng = rng
+        self._review_words = review_words
+        self._swap_latency = swap_latency
+        self._resident = resident if resident is not None else {}
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _respond(self, messages: Sequence[LLMMessage], tools, json_output) -> tuple:
+        texts = [m.content for m in messages if isinstance(getattr(m, "content", None), str)]
+        task = next(
+            (m.content for m in reversed(messages) if isinstance(m, UserMessage) and m.source == "user"),
+            texts[-1] if texts else "",
+        )
+
+        if tools and not isinstance(messages[-1], FunctionExecutionResultMessage):
+            topic, count = extract_search_intent(task) or (task, extract_paper_count(task))
+            arguments = json.dumps({"query": topic, "max_results": count * 3})
+            return "function_calls", [FunctionCall(id=f"call-{self._rng.getrandbits(32)}", name="Search_arXiv", arguments=arguments)]
+
+        if json_output:
+            found = len(parse_papers("\n".join(texts)))
+            count = min(found, extract_paper_count(task))
+            return "stop", json.dumps({
+                "rationale": "Scripted selection",
+                "selected": [
+                    {"id": paper_id, "score": "High", "rationale": "Scripted"}
+                    for paper_id in range(1, count + 1)
+                ],
+            })
+
+        words = " ".join("lorem" for _ in range(self._review_words))
+        return "stop", f"{words}\n\n--- {RunBudgetConfig.WRITER_END_MARKER} ---"
+
+    def get_create_args(self) -> Mapping[str, Any]:
+        return {"model": self._model}
+
+    def _call_latency(self) -> float:
+        latency = self._latency(self._rng)
+        # Ollama on a small box holds one model; switching reloads it
+        if self._swap_latency is not None and self._resident.get("model") not in (None, self._model):
+            latency += self._swap_latency(self._rng)
+            self._resident["swaps"] = self._resident.get("swaps", 0) + 1
+        self._resident["model"] = self._model
+        return latency
+
+    def _usage(self, messages: Sequence[LLMMessage], content) -> RequestUsage:
+        usage = RequestUsage(
+            prompt_tokens=sum(len(str(getattr(m, "content", ""))) for m in messages) // 4,
+            completion_tokens=len(str(content)) // 4,
+        )
+        self._actual_usage = usage
+        self._total_usage = RequestUsage(
+            prompt_tokens=self._total_usage.prompt_tokens + usage.prompt_tokens,
+            completion_tokens=self._total_usage.completion_tokens + usage.completion_tokens,
+        )
+        return usage
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        finish_reason, content = self._respond(messages, tools, json_output)
+        await asyncio.sleep(self._call_latency())
+        return CreateResult(
+            finish_reason=finish_reason,
+            content=content,
+            usage=self._usage(messages, content),
+            cached=False,
+        )
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        finish_reason, content = self._respond(messages, tools, json_output)
+        latency = self._call_latency()
+
+        if isinstance(content, str):
+            # Spread the chunks over the call like a model generating tokens
+            chunks = [content[i:i + 40] for i in range(0, len(content), 40)]
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield chunk
+        else:
+            await asyncio.sleep(latency)
+
+        yield CreateResult(
+            finish_reason=finish_reason,
+            content=content,
+            usage=self._usage(messages, content),
+            cached=False,
+        )
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return sum(len(str(getattr(m, "content", ""))) for m in messages) // 4
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return 32768 - self.count_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):  # type: ignore
+        return self.model_info
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelConfig.granite_capabilities
+
+
+def stub_arxiv(latency, rng: random.Random):
+    """
+    Build a stand-in for tools.iter_arxiv_papers.
+
+    Args:
+        latency: Callable drawing one search latency in seconds
+        rng (random.Random): Source of randomness
+
+    Returns:
+        Callable: Generator function with the iter_arxiv_papers signature
+    """
+    def iter_arxiv_papers(query: str, max_results: int, page_size: int = 0, start: int = 0):
+        # Searches run in worker threads, so a blocking sleep is what arXiv looks like
+        time.sleep(latency(rng))
+        # Entry ids differ per query, as they would on arXiv
+        prefix = zlib.crc32(query.encode("utf-8")) % 10000
+        for paper_id in range(start + 1, max_results + 1):
+            yield {
+                "id": paper_id,
+                "title": f"{query.title()}: Study {paper_id}",
+                "authors": "A. Author, B. Author",
+                "published": "2024-01-01",
+                "url": f"http://arxiv.org/abs/{prefix:04d}.{paper_id:05d}v1",
+                "abstract": f"We study {query}. " * 20,
+            }
+
+    return iter_arxiv_papers
+
+
+def install_stubs(args, rng: random.Random, scheduler, resident: dict) -> None:
+    """
+    Swap Ollama, arXiv and the scheduler for the load test's stand-ins.
+
+    The src modules import each other by their plain names (from agents
+    import ...), so the stubs are installed on those module objects.
+    """
+    team_module = sys.modules[ResearchTeam.__module__]
+    agents = sys.modules[team_module.create_researcher_agent.__module__]
+    tools = sys.modules[agents.Search_arXiv.__module__]
+    config = sys.modules[team_module.QueryMemoConfig.__module__]
+
+    latency = parse_latency(args.model_latency)
+    swap_latency = parse_latency(args.swap_latency)
+    agents.ollama_client_lamma = ScriptedChatCompletionClient(
+        "llama3.1:8b", latency, rng, args.review_words, swap_latency, resident
+    )
+    agents.ollama_client_granite = ScriptedChatCompletionClient(
+        "granite3.3:8b", latency, rng, args.review_words, swap_latency, resident
+    )
+    # The stand-ins have no Ollama to ask which models are loaded
+    config.ResidencyConfig.ENABLED = False
+    agents.llm_scheduler = scheduler
+    tools.iter_arxiv_papers = stub_arxiv(parse_latency(args.arxiv_latency), rng)
+
+    # Every task would be a memo hit after the first round and skip the Researcher
+    config.QueryMemoConfig.ENABLED = args.query_memo
+    # Likewise every search would be read from the paper store
+    config.PaperStoreConfig.ENABLED = args.paper_store
+    config.EventLogConfig.ENABLED = args.event_log
+
+
+async def run_user(user: int, args, rng: random.Random, results: list) -> None:
+    """
+    One simulated user: a team of its own and tasks submitted back to back.
+
+    Args:
+        user (int): User number
+        args: Parsed command line arguments
+        rng (random.Random): Source of randomness
+        results (list): Receives one record per task
+    """
+    team = ResearchTeam()
+    think_time = parse_latency(args.think_time)
+
+    for task_number in range(args.tasks_per_user):
+        await asyncio.sleep(think_time(rng))
+        topic = TOPICS[(user + task_number) % len(TOPICS)]
+        task = f"Find {rng.randint(2, 5)} papers on {topic} (user {user}, task {task_number})"
+
+        started_at = time.perf_counter()
+        try:
+            await team.run_chat(task)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        results.append({
+            "user": user,
+            "latency": time.perf_counter() - started_at,
+            "error": error,
+        })
+
+
+async def run_level(users: int, args) -> dict:
+    """
+    Run one concurrency level against a fresh scheduler.
+
+    Args:
+        users (int): Number of concurrent users
+        args: Parsed command line arguments
+
+    Returns:
+        dict: Throughput, latency and queueing statistics of the level
+    """
+    # Imported by plain name for the same reason as in install_stubs
+    scheduler_module = sys.modules[sys.modules[ResearchTeam.__module__].Priority.__module__]
+    scheduler = scheduler_module.LLMScheduler(max_concurrent=args.max_concurrent_calls)
+
+    rng = random.Random(args.seed + users)
+    resident = {}
+    install_stubs(args, rng, scheduler, resident)
+
+    results = []
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_user(user, args, rng, results) for user in range(users)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies = sorted(r["latency"] for r in results if r["error"] is None)
+    queueing = scheduler.stats()["classes"]["interactive"]
+
+    return {
+        "users": users,
+        "tasks": len(results),
+        "errors": sum(1 for r in results if r["error"] is not None),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_minute": round(60 * len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_seconds": round(percentile(latencies, 50), 3),
+        "p95_seconds": round(percentile(latencies, 95), 3),
+        "p99_seconds": round(percentile(latencies, 99), 3),
+        "model_calls": queueing["calls"],
+        "mean_queue_seconds": round(queueing["mean_wait"], 3),
+        "p95_queue_seconds": round(queueing["p95_wait"], 3),
+        "model_swaps": resident.get("swaps", 0),
+    }
+
+
+def print_report(levels: list) -> None:
+    """Print one row per concurrency level."""
+    header = f"{'users':>5} {'tasks':>5} {'err':>4} {'tasks/min':>9} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'queue s':>8} {'q p95 s':>8} {'swaps':>6} {'scaling':>8}"
+    print(header)
+    print("-" * len(header))
+
+    baseline = levels[0]["throughput_per_minute"] / levels[0]["users"] if levels else 0.0
+    for level in levels:
+        ideal = baseline * level["users"]
+        scaling = level["throughput_per_minute"] / ideal if ideal else 0.0
+        level["scaling_efficiency"] = round(scaling, 3)
+        print(
+            f"{level['users']:>5} {level['tasks']:>5} {level['errors']:>4} "
+            f"{level['throughput_per_minute']:>9.2f} {level['p50_seconds']:>7.2f} "
+            f"{level['p95_seconds']:>7.2f} {level['p99_seconds']:>7.2f} "
+            f"{level['mean_queue_seconds']:>8.2f} {level['p95_queue_seconds']:>8.2f} {level['model_swaps']:>6} {scaling:>7.0%}"
+        )
+
+
+async def run_load_test(args) -> list:
+    """Run every concurrency level in turn."""
+    levels = []
+    for users in args.users:
+        print(f"Running {users} concurrent user(s)...", file=sys.stderr)
+        levels.append(await run_level(users, args))
+    return levels
+
+
+def main():
+    """Load test entry point."""
+    parser = argparse.ArgumentParser(description="Load test ResearchTeam with scripted models and a stubbed arXiv.")
+    parser.add_argument("--users", default="1,2,4,8", help="Comma-separated concurrency levels (default: 1,2,4,8)")
+    parser.add_argument("--tasks-per-user", type=int, default=5, help="Tasks each user submits (default: 5)")
+    parser.add_argument("--model-latency", default="lognormal:1.5,0.5", help="Latency of one model call")
+    parser.add_argument("--swap-latency", default="const:0", help="Extra latency of a call whose model was not the last one used")
+    parser.add_argument("--arxiv-latency", default="lognormal:1.0,0.3", help="Latency of one arXiv search")
+    parser.add_argument("--think-time", default="const:0", help="Pause before each task a user submits")
+    parser.add_argument("--review-words", type=int, default=400, help="Length of every scripted review")
+    parser.add_argument(
+        "--max-concurrent-calls",
+        type=int,
+        default=SchedulerConfig.MAX_CONCURRENT_CALLS,
+        help=f"LLMScheduler slots (default: {SchedulerConfig.MAX_CONCURRENT_CALLS})",
+    )
+    parser.add_argument("--query-memo", action="store_true", help="Keep the query memo enabled")
+    parser.add_argument("--paper-store", action="store_true", help="Keep the shared paper store enabled")
+    parser.add_argument("--event-log", action="store_true", help="Keep logging every run to the event log")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", type=argparse.FileType("w"), help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        args.users = [int(users) for users in args.users.split(",")]
+        for spec in (args.model_latency, args.swap_latency, args.arxiv_latency, args.think_time):
+            parse_latency(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if min(args.users) < 1 or args.tasks_per_user < 1 or args.max_concurrent_calls < 1:
+        parser.error("--users, --tasks-per-user and --max-concurrent-calls must be at least 1")
+
+    levels = asyncio.run(run_load_test(args))
+    print_report(levels)
+
+    if args.json:
+        json.dump(levels, args.json, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Standalone review service.
+
+An async HTTP front end that hands literature review jobs to a pool of worker
+processes and streams each run back as Server-Sent Events. The front end only
+routes jobs and relays events, so the compute tier (workers) scales
+independently of the UI tier; the Streamlit app becomes a thin client when
+ServiceConfig.URL is set (see src/service_client.py).
+
+Endpoints:
+    POST /reviews                 {"query": ..., "session": ..., "carry_over": ...} -> 202 {"id", "status"}
+    GET  /reviews/{id}            Job status, plus the review once it is finished
+    GET  /reviews/{id}/events     Server-Sent Events of ResearchTeam.stream_chat deltas
+    POST /reviews/{id}/cancel     Cancel a queued or running job
+
+Jobs with the same "session" always run on the same worker, on the same
+ResearchTeam, so the session's carry-over is kept between queries.
+
+Usage:
+    python service.py --workers 2 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+from aiohttp import web
+
+from src.config import ServiceConfig, SessionConfig
+from src.team import ResearchTeam, model_residency
+
+TERMINAL_STATUSES = ("done", "cancelled", "error")
+
+
+# Background closes of evicted sessions, referenced until they finish
+_closing = set()
+
+
+async def close_session(session: dict) -> None:
+    """Close an evicted session's team once the job it may be running is done."""
+    async with session["lock"]:
+        await session["team"].close()
+
+
+async def run_worker_job(job: dict, sessions: OrderedDict, slots: asyncio.Semaphore, events) -> None:
+    """
+    Run one review inside a worker process and report its deltas.
+
+    Args:
+        job (dict): Job with "id", "query", "session" and "carry_over"
+        sessions (OrderedDict): Session id -> {"team", "lock"}, least recently used first
+        slots (asyncio.Semaphore): Bounds the jobs running in this worker
+        events: Queue the (job id, delta) pairs are reported on
+    """
+    if job["session"] is None:
+        session = {"team": ResearchTeam(), "lock": asyncio.Lock()}
+    else:
+        session = sessions.pop(job["session"], None) or {"team": ResearchTeam(), "lock": asyncio.Lock()}
+        sessions[job["session"]] = session
+        while len(sessions) > ServiceConfig.MAX_SESSIONS_PER_WORKER:
+            _, evicted = sessions.popitem(last=False)
+            closing = asyncio.create_task(close_session(evicted))
+            _closing.add(closing)
+            closing.add_done_callback(_closing.discard)
+
+    # A team holds one conversation, so a session's jobs run one at a time.
+    # The slot is taken only once the session is free: a job queued behind
+    # its own session must not hold a slot other sessions could use.
+    async with session["lock"], slots:
+        team = session["team"]
+        team.carry_over = job["carry_over"]
+        job["team"] = team
+        events.put((job["id"], {"event": "status", "status": "running"}))
+        try:
+            async for delta in team.stream_chat(job["query"]):
+                events.put((job["id"], delta))
+        except Exception as e:
+            events.put((job["id"], {"event": "error", "error": f"{type(e).__name__}: {e}"}))
+        finally:
+            job["team"] = None
+            # A team without a session only ever runs this job
+            if job["session"] is None:
+                await team.close()
+
+
+async def serve_worker(commands, events) -> None:
+    """
+    Worker event loop: run jobs as they are dispatched until told to stop.
+
+    Args:
+        commands: Queue of ("run", job), ("cancel", job id) and ("stop", None) commands
+        events: Queue the (job id, delta) pairs are reported on
+    """
+    sessions = OrderedDict()
+    slots = asyncio.Semaphore(ServiceConfig.JOBS_PER_WORKER)
+    jobs = {}
+
+    await model_residency.preload()
+
+    while True:
+        command, payload = await asyncio.to_thread(commands.get)
+
+        if command == "stop":
+            break
+
+        if command == "run":
+            job = dict(payload, team=None)
+            jobs[job["id"]] = job
+            task = asyncio.create_task(run_worker_job(job, sessions, slots, events))
+            job["task"] = task
+            task.add_done_callback(lambda _, job_id=job["id"]: jobs.pop(job_id, None))
+
+        elif command == "cancel" and payload in jobs:
+            job = jobs[payload]
+            if job["team"] is not None:
+                # The run winds down and still reports its final "done" delta
+                job["team"].cancel()
+            else:
+                job["task"].cancel()
+                events.put((payload, {"event": "cancelled"}))
+
+
+def worker_main(commands, events) -> None:
+    """Worker process entry point."""
+    try:
+        asyncio.run(serve_worker(commands, events))
+    except KeyboardInterrupt:
+        pass
+
+
+class ReviewService:
+    """
+    Front end state: jobs, their buffered deltas and the worker pool.
+
+    Deltas from the workers arrive on one shared queue and are relayed into
+    the event loop by a reader thread; every job keeps its deltas so a stream
+    can start (or resume with Last-Event-ID) at any point of the run.
+    """
+
+    def __init__(self, workers: int = ServiceConfig.WORKERS):
+        """
+        Args:
+            workers (int): Number of worker processes
+        """
+        self.worker_count = workers
+        self.jobs = {}
+        self._finished = []
+
+        # Spawned workers do not inherit the front end's threads or event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._workers = []
+        self._loop = None
+
+    def start(self) -> None:
+        """Start the worker processes and the event reader thread."""
+        self._loop = asyncio.get_running_loop()
+        for _ in range(self.worker_count):
+            self._workers.append(self._spawn_worker())
+        threading.Thread(target=self._read_events, daemon=True).start()
+
+    def stop(self) -> None:
+        """Ask every worker to stop and wait for them."""
+        for worker in self._workers:
+            worker["commands"].put(("stop", None))
+        for worker in self._workers:
+            worker["process"].join(timeout=5)
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+        self._events.put(None)
+
+    def _spawn_worker(self) -> dict:
+        commands = self._context.Queue()
+        process = self._context.Process(target=worker_main, args=(commands, self._events), daemon=True)
+        process.start()
+        return {"process": process, "commands": commands}
+
+    async def watch_workers(self) -> None:
+        """Replace crashed workers, failing the jobs they were running."""
+        while True:
+            await asyncio.sleep(1.0)
+            for index, worker in enumerate(self._workers):
+                if worker["process"].is_alive():
+                    continue
+
+                print(f"Worker {index} exited with code {worker['process'].exitcode}, restarting", file=sys.stderr)
+                for job in list(self.jobs.values()):
+                    if job["worker"] == index and job["status"] not in TERMINAL_STATUSES:
+                        self._on_event(job["id"], {"event": "error", "error": "Worker process exited"})
+                self._workers[index] = self._spawn_worker()
+
+    def _read_events(self) -> None:
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_event, *item)
+
+    def _pick_worker(self, session: str | None) -> int:
+        # Sessions stick to one worker so their team and carry-over are reused
+        if session is not None:
+            return zlib.crc32(session.encode("utf-8")) % self.worker_count
+
+        load = [0] * self.worker_count
+        for job in self.jobs.values():
+            if job["status"] not in TERMINAL_STATUSES:
+                load[job["worker"]] += 1
+        return min(range(self.worker_count), key=load.__getitem__)
+
+    def submit(self, query: str, session: str | None, carry_over: str) -> dict:
+        """
+        Queue a review job on a worker.
+
+        Args:
+            query (str): The user's research query
+            session (str | None): Session whose team should run the job
+            carry_over (str): One of SessionConfig.CARRY_OVER_MODES
+
+        Returns:
+            dict: The new job
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "query": query,
+            "session": session,
+            "status": "queued",
+            "worker": self._pick_worker(session),
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "review": None,
+            "stats": None,
+            "error": None,
+            "cancel_requested": False,
+            "deltas": [],
+            "updated": asyncio.Event(),
+        }
+        self.jobs[job["id"]] = job
+
+        self._workers[job["worker"]]["commands"].put(("run", {
+            "id": job["id"],
+            "query": query,
+            "session": session,
+            "carry_over": carry_over,
+        }))
+        return job
+
+    def cancel(self, job: dict) -> None:
+        """Ask the job's worker to cancel it."""
+        if job["status"] in TERMINAL_STATUSES or job["cancel_requested"]:
+            return
+        job["cancel_requested"] = True
+        self._workers[job["worker"]]["commands"].put(("cancel", job["id"]))
+
+    def _on_event(self, job_id: str, delta: dict) -> None:
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+
+        event = delta["event"]
+        if event == "status":
+            job["status"] = delta["status"]
+            job["started_at"] = time.time()
+        elif event == "done":
+            job["status"] = "cancelled" if job["cancel_requested"] else "done"
+            job["review"] = delta["content"]
+            job["stats"] = delta["stats"]
+        elif event == "cancelled":
+            job["status"] = "cancelled"
+        elif event == "error":
+            job["status"] = "error"
+            job["error"] = delta["error"]
+
+        job["deltas"].append(delta)
+
+        if job["status"] in TERMINAL_STATUSES:
+            job["finished_at"] = time.time()
+            self._finished.append(job_id)
+            while len(self._finished) > ServiceConfig.MAX_FINISHED_JOBS:
+                self.jobs.pop(self._finished.pop(0), None)
+
+        # Wake every stream waiting on this job
+        job["updated"].set()
+        job["updated"] = asyncio.Event()
+
+
+def job_status(job: dict) -> dict:
+    """Public view of a job."""
+    return {
+        key: job[key] for key in (
+            "id", "query", "session", "status", "created_at", "started_at",
+            "finished_at", "review", "stats", "error",
+        )
+    }
+
+
+async def submit_review(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Body must be JSON")
+
+    query = body.get("query")
+    if not query or not isinstance(query, str):
+        raise web.HTTPBadRequest(text="\"query\" must be a non-empty string")
+
+    carry_over = body.get("carry_over", SessionConfig.CARRY_OVER)
+    if carry_over not in SessionConfig.CARRY_OVER_MODES:
+        raise web.HTTPBadRequest(text=f"\"carry_over\" must be one of {SessionConfig.CARRY_OVER_MODES}")
+
+    session = body.get("session")
+    if session is not None:
+        session = str(session)
+
+    job = request.app["service"].submit(query, session, carry_over)
+    return web.json_response({"id": job["id"], "status": job["status"]}, status=202)
+
+
+def _get_job(request: web.Request) -> dict:
+    job = request.app["service"].jobs.get(request.match_info["job_id"])
+    if job is None:
+        raise web.HTTPNotFound(text="Unknown job")
+    return job
+
+
+async def get_review(request: web.Request) -> web.Response:
+    return web.json_response(job_status(_get_job(request)))
+
+
+async def cancel_review(request: web.Request) -> web.Response:
+    job = _get_job(request)
+    request.app["service"].cancel(job)
+    return web.json_response({"id": job["id"], "status": job["status"]}, status=202)
+
+
+async def stream_review(request: web.Request) -> web.StreamResponse:
+    """Stream a job's deltas as Server-Sent Events, from the start or after Last-Event-ID."""
+    job = _get_job(request)
+
+    try:
+        cursor = int(request.headers.get("Last-Event-ID", -1)) + 1
+    except ValueError:
+        cursor = 0
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+
+    while True:
+        updated = job["updated"]
+        while cursor < len(job["deltas"]):
+            delta = job["deltas"][cursor]
+            await response.write(
+                f"id: {cursor}\nevent: {delta['event']}\ndata: {json.dumps(delta, ensure_ascii=False)}\n\n".encode("utf-8")
+            )
+            cursor += 1
+
+        if job["status"] in TERMINAL_STATUSES:
+            break
+
+        try:
+            await asyncio.wait_for(updated.wait(), ServiceConfig.SSE_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            await response.write(b": keepalive\n\n")
+
+    await response.write_eof()
+    return response
+
+
+def create_app(workers: int = ServiceConfig.WORKERS) -> web.Application:
+    """
+    Build the service application.
+
+    Args:
+        workers (int): Number of worker processes
+
+    Returns:
+        web.Application: The aiohttp application, starting its workers on startup
+    """
+    app = web.Application()
+    app["service"] = ReviewService(workers)
+
+    async def start_service(app):
+        app["service"].start()
+        app["watcher"] = asyncio.create_task(app["service"].watch_workers())
+
+    async def stop_service(app):
+        app["watcher"].cancel()
+        await asyncio.to_thread(app["service"].stop)
+
+    app.on_startup.append(start_service)
+    app.on_cleanup.append(stop_service)
+
+    app.router.add_post("/reviews", submit_review)
+    app.router.add_get("/reviews/{job_id}", get_review)
+    app.router.add_get("/reviews/{job_id}/events", stream_review)
+    app.router.add_post("/reviews/{job_id}/cancel", cancel_review)
+    return app
+
+
+def main():
+    """Service entry point."""
+    parser = argparse.ArgumentParser(description="Serve literature reviews over HTTP.")
+    parser.add_argument("--host", default=ServiceConfig.HOST, help=f"Bind address (default: {ServiceConfig.HOST})")
+    parser.add_argument("--port", type=int, default=ServiceConfig.PORT, help=f"Port (default: {ServiceConfig.PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=ServiceConfig.WORKERS,
+        help=f"Number of worker processes (default: {ServiceConfig.WORKERS})",
+    )
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    web.run_app(create_app(args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
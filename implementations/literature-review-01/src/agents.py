@@ -3,12 +3,33 @@ Agent creation and configuration.
 Each agent has a specific role in the literature review pipeline.
 """
 
+import logging
+
 from autogen_agentchat.agents import AssistantAgent
 from tools import Search_arXiv
-from prompts import RESEARCHER_PROMPT, REVIEWER_PROMPT, WRITER_PROMPT
-from config import ModelConfig, AgentConfig
+from prompts import (
+    RESEARCHER_PROMPT,
+    REVIEWER_PROMPT,
+    REVIEWER_SELECTION_PROMPT,
+    WRITER_PROMPT,
+    WRITER_SECTION_INSTRUCTIONS,
+)
+from config import ModelConfig, AgentConfig, ContextConfig, PromptCacheConfig, ResidencyConfig
+from scheduler import LLMScheduler, Priority
+from model_clients import (
+    PromptCacheChatCompletionClient,
+    ResidentChatCompletionClient,
+    ScheduledChatCompletionClient,
+    SizedChatCompletionClient,
+)
+from context_sizing import ContextSizer
+from prompt_cache import PromptCacheStats, record_ollama_stats
+from residency import ModelResidency
+from papers import ReviewerSelection
+from writer import SectionWriter
 from autogen_ext.models.ollama import OllamaChatCompletionClient
 
+logger = logging.getLogger(__name__)
 
 
 ollama_client_lamma = OllamaChatCompletionClient(
@@ -22,8 +43,34 @@ ollama_client_granite = OllamaChatCompletionClient(
             model_info= ModelConfig.granite_capabilities
         )
 
+# Shared by every team in the process so interactive and batch runs
+# compete for the same Ollama instance through one priority queue
+llm_scheduler = LLMScheduler()
+
+# Shared view of which models Ollama holds in memory
+model_residency = ModelResidency()
+
+# Shared so each model keeps one context size across agents
+context_sizer = ContextSizer()
+
+# Evaluated vs cached prompt tokens of every call, per agent role
+prompt_cache_stats = PromptCacheStats(context_sizer)
+
+if PromptCacheConfig.RECORD_STATS:
+    record_ollama_stats(ollama_client_lamma)
+    record_ollama_stats(ollama_client_granite)
+
+
+def _scheduled_client(client, priority: Priority, role: str) -> ScheduledChatCompletionClient:
+    """Route a shared Ollama client through the scheduler with the options of an agent role."""
+    if ResidencyConfig.ENABLED:
+        client = ResidentChatCompletionClient(client, model_residency)
+    client = SizedChatCompletionClient(client, role, context_sizer if ContextConfig.ENABLED else None)
+    client = PromptCacheChatCompletionClient(client, role, prompt_cache_stats if PromptCacheConfig.RECORD_STATS else None)
+    return ScheduledChatCompletionClient(client, llm_scheduler, priority)
 
-def create_researcher_agent() -> AssistantAgent:
+
+def create_researcher_agent(priority: Priority = Priority.INTERACTIVE, search_tool=None) -> AssistantAgent:
     """
     Create the Researcher agent.
     
@@ -33,20 +80,25 @@ def create_researcher_agent() -> AssistantAgent:
     - Using the arxiv_search tool to find papers
     - Returning structured paper information
     
+    Args:
+        priority (Priority): Scheduling class for this agent's model calls
+        search_tool: Replacement for the plain Search_arXiv tool, e.g. a
+            SpeculativeSearch tool. Must keep the Search_arXiv name.
+    
     Returns:
         AssistantAgent configured as a researcher
     """
     return AssistantAgent(
         name=AgentConfig.RESEARCHER_NAME,
         description=AgentConfig.RESEARCHER_DESCRIPTION,
-        model_client=ollama_client_lamma,
-        tools=[Search_arXiv],  # Give it access to arXiv search
+        model_client=_scheduled_client(ollama_client_lamma, priority, "researcher"),
+        tools=[search_tool or Search_arXiv],  # Give it access to arXiv search
         reflect_on_tool_use=False,
         model_client_stream=True,
         system_message=RESEARCHER_PROMPT
     )
 
-def create_reviewer_agent() -> AssistantAgent:
+def create_reviewer_agent(priority: Priority = Priority.INTERACTIVE) -> AssistantAgent:
     """
     Create the Reviewer agent.
     
@@ -56,18 +108,38 @@ def create_reviewer_agent() -> AssistantAgent:
     - Identifying gaps or off-topic papers
     - Validating the paper selection
     
+    With AgentConfig.REVIEWER_STRUCTURED_OUTPUT the Reviewer answers with a
+    ReviewerSelection (paper ids, scores and rationale) instead of rewriting
+    every selected paper in prose.
+    
+    Args:
+        priority (Priority): Scheduling class for this agent's model calls
+    
     Returns:
         AssistantAgent configured as a reviewer
     """
+    model_client = _scheduled_client(ollama_client_granite, priority, "reviewer")
+    
+    if AgentConfig.REVIEWER_STRUCTURED_OUTPUT:
+        return AssistantAgent(
+            name=AgentConfig.REVIEWER_NAME,
+            description= AgentConfig.REVIEWER_DESCRIPTION,
+            model_client=model_client,
+            output_content_type=ReviewerSelection,
+            # The JSON is short and rendered locally, no need to stream it
+            model_client_stream=False,
+            system_message=REVIEWER_SELECTION_PROMPT
+        )
+    
     return AssistantAgent(
         name=AgentConfig.REVIEWER_NAME,
         description= AgentConfig.REVIEWER_DESCRIPTION,
-        model_client=ollama_client_granite,
+        model_client=model_client,
         model_client_stream=True,
         system_message=REVIEWER_PROMPT
     )
 
-def create_writer_agent() -> AssistantAgent:
+def create_writer_agent(priority: Priority = Priority.INTERACTIVE) -> AssistantAgent:
     """
     Create the Writer agent.
     
@@ -77,15 +149,59 @@ def create_writer_agent() -> AssistantAgent:
     - Comparing and contrasting different approaches
     - Identifying trends and future directions
     
+    Args:
+        priority (Priority): Scheduling class for this agent's model calls
+    
     Returns:
         AssistantAgent configured as an academic writer
     """
     return AssistantAgent(
         name=AgentConfig.WRITER_NAME,
         description= AgentConfig.WRITER_DESCRIPTION,
-        model_client=ollama_client_granite,
+        model_client=_scheduled_client(ollama_client_granite, priority, "writer"),
         model_client_stream=True,
         system_message=WRITER_PROMPT
     )
 
 
+def create_section_writer(priority: Priority = Priority.INTERACTIVE) -> SectionWriter:
+    """
+    Create the section-parallel Writer used when AgentConfig.WRITER_MODE is "sections".
+    
+    Unlike the Writer agent it does not take part in the group chat: it is
+    called once the Reviewer has selected the papers.
+    
+    Args:
+        priority (Priority): Scheduling class for the section model calls
+    
+    Returns:
+        SectionWriter backed by the granite model
+    """
+    if llm_scheduler.max_concurrent < len(WRITER_SECTION_INSTRUCTIONS):
+        logger.warning(
+            "Section writer with MAX_CONCURRENT_CALLS=%d: its %d body sections will not all "
+            "run concurrently. Raise SchedulerConfig.MAX_CONCURRENT_CALLS and Ollama's "
+            "OLLAMA_NUM_PARALLEL to at least %d.",
+            llm_scheduler.max_concurrent,
+            len(WRITER_SECTION_INSTRUCTIONS),
+            len(WRITER_SECTION_INSTRUCTIONS),
+        )
+    return SectionWriter(
+        _scheduled_client(ollama_client_granite, priority, "section_writer")
+    )
+
+
+def create_selector_client(priority: Priority = Priority.INTERACTIVE) -> ScheduledChatCompletionClient:
+    """
+    Create the model client a SelectorGroupChat falls back to for speaker selection.
+    
+    ResearchTeam chooses speakers with a deterministic selector function, so
+    this client is only used if that function ever declines to choose.
+    
+    Args:
+        priority (Priority): Scheduling class for selection calls
+    
+    Returns:
+        Scheduled client backed by the granite model
+    """
+    return _scheduled_client(ollama_client_granite, priority, "selector")
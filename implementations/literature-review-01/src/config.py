@@ -1,6 +1,7 @@
 """
 Configuration settings for the AutoGen Literature Review system.
 """
+import os
 from dataclasses import dataclass
 from autogen_ext.models.ollama._model_info import ModelInfo, ModelFamily
 
@@ -13,6 +14,7 @@ class ModelConfig:
 
     LLAMA_3_1= "llama3.1:8b" 
     GRANITE_3_3 = "granite3.3:8b"      
+    NOMIC_EMBED_TEXT = "nomic-embed-text:latest"
 
     default_options_hyperparameters = {
         "temperature": 0.7,
@@ -24,6 +26,15 @@ class ModelConfig:
         "top_k": 10,
     }
 
+    # Sampling options sent with every call of an agent role
+    role_options = {
+        "researcher": default_options_hyperparameters_researcher,
+        "reviewer": default_options_hyperparameters,
+        "writer": default_options_hyperparameters,
+        "section_writer": default_options_hyperparameters,
+        "selector": default_options_hyperparameters,
+    }
+
     granite_capabilities = {
         "vision": False,
         "function_calling": True,
@@ -45,12 +56,366 @@ class AgentConfig:
     REVIEWER_NAME = "Reviewer"
     REVIEWER_DESCRIPTION = "A agent that can review the papers retrieved"
 
+    # Reviewer returns only paper ids, scores and rationale as JSON;
+    # the full paper records are rehydrated from the search results
+    REVIEWER_STRUCTURED_OUTPUT = True
+
     WRITER_NAME = "Writer"
     WRITER_DESCRIPTION = "A agent that can write the final report"
 
+    # "single": the Writer agent produces the whole review in one generation
+    # "sections": independent sections are generated concurrently and the
+    # paper list is rendered without the model (see src/writer.py).
+    # "sections" needs SchedulerConfig.MAX_CONCURRENT_CALLS >= 3 and Ollama
+    # started with OLLAMA_NUM_PARALLEL >= 3 (one slot per body section); with
+    # the defaults below the sections run one after another and the mode only
+    # saves the paper list generation.
+    WRITER_MODE = "single"
+
 
 class UIConfig:
     """Configuration for the user interface"""
     PAGE_TITLE = "AI Literature Review Assistant"
     PAGE_ICON = "📚"
     DEFAULT_PLACEHOLDER = "e.g., 'Find 3 papers on multi-agent systems for customer service'"
+
+    # Messages shown per page of chat history; older pages are behind "Older" / "Newer"
+    HISTORY_PAGE_SIZE = 10
+
+    # Only the latest exchanges render in full, older reviews are collapsed
+    RECENT_FULL_MESSAGES = 2
+
+    # Characters of a collapsed review shown in its expander label
+    PREVIEW_CHARS = 80
+
+
+class SchedulerConfig:
+    """Configuration for scheduling LLM calls on the shared Ollama instance"""
+    # Number of model calls allowed to run against Ollama at the same time.
+    # Keep it at or below Ollama's OLLAMA_NUM_PARALLEL; raise both to 3 for
+    # AgentConfig.WRITER_MODE = "sections"
+    MAX_CONCURRENT_CALLS = 1
+
+    # Seconds of waiting that promote a queued call by one priority class
+    AGING_SECONDS = 30.0
+
+    # Number of recent wait times kept per priority class for statistics
+    WAIT_STATS_WINDOW = 1000
+
+    # Queued calls for the model that was used last are served first: a call
+    # that needs a different model ranks this many priority classes lower.
+    # Aging still promotes it, so the other model is never starved.
+    MODEL_SWITCH_PENALTY = 0.5
+
+
+class ResidencyConfig:
+    """Configuration for keeping models resident in Ollama (src/residency.py)"""
+    # Load models explicitly before their first call and track loads/unloads
+    ENABLED = True
+
+    # Loaded in this order at startup. When only one model fits in memory the
+    # last one stays resident, so list the model the pipeline needs first last.
+    # Ollama's own OLLAMA_MAX_LOADED_MODELS must allow both for both to stay.
+    PRELOAD_MODELS = ("granite3.3:8b", "llama3.1:8b")
+
+    # How long Ollama keeps each model loaded after its last call
+    KEEP_ALIVE = {
+        "llama3.1:8b": "30m",
+        "granite3.3:8b": "30m",
+    }
+    DEFAULT_KEEP_ALIVE = "10m"
+
+    # Ollama is asked which models it holds only when the cached answer is
+    # older than this or lacks the model a call needs
+    STATE_TTL_SECONDS = 10
+
+
+class ContextConfig:
+    """Configuration for per-call context window and reply length sizing (src/context_sizing.py)"""
+    # Set num_ctx and num_predict on every call instead of using Ollama's defaults
+    ENABLED = True
+
+    # num_ctx is the smallest bucket that fits the prompt plus the reply cap.
+    # Ollama reloads a model when its num_ctx changes, so a model's context
+    # only grows within a process and few buckets keep the reloads rare.
+    NUM_CTX_BUCKETS = (4096, 8192, 16384, 32768)
+
+    # Context Ollama uses when num_ctx is not set; longer prompts lose their start
+    SERVER_DEFAULT_NUM_CTX = 2048
+
+    # Prompt tokens are estimated from characters. The ratio starts here and
+    # is calibrated per model from the prompt token counts Ollama reports.
+    INITIAL_CHARS_PER_TOKEN = 3.5
+    CALIBRATION_WEIGHT = 0.2
+    CHARS_PER_TOKEN_RANGE = (2.0, 5.0)
+
+    # Headroom on the estimated prompt tokens
+    SAFETY_MARGIN = 1.15
+
+    # Cap on generated tokens (num_predict) per agent role
+    NUM_PREDICT = {
+        "researcher": 512,
+        "reviewer": 1024,
+        "writer": 3072,
+        "section_writer": 1024,
+        "selector": 64,
+    }
+    DEFAULT_NUM_PREDICT = 1024
+
+
+class PromptCacheConfig:
+    """Configuration for prefix-cache-friendly prompt assembly (src/prompt_cache.py)"""
+    # Ollama reuses the KV cache of the longest prefix a prompt shares with
+    # the model's previous one. Start every prompt that carries the
+    # Researcher's papers with a preamble shared by all roles and the paper
+    # block, and only then the role's instructions and the conversation, so
+    # the Writer reuses the paper block the Reviewer just sent.
+    SHARED_PREFIX = True
+
+    # Record evaluated vs cached prompt tokens and prefill time per call
+    # from Ollama's response statistics
+    RECORD_STATS = True
+
+
+class BatchConfig:
+    """Configuration for headless batch runs"""
+    # Number of literature reviews running at the same time
+    DEFAULT_CONCURRENCY = 2
+
+
+class RunBudgetConfig:
+    """Per-run budgets that stop runaway or unnecessary model turns"""
+    # Wall-clock budget checked whenever an agent finishes a message
+    MAX_SECONDS = 600
+
+    # Extra time after MAX_SECONDS before an in-flight model call is cancelled
+    HARD_STOP_GRACE_SECONDS = 60
+
+    # Prompt plus completion tokens across all agents
+    MAX_TOTAL_TOKENS = 60000
+
+    # Skip the Reviewer when the search returned no more papers than requested
+    SKIP_REVIEWER_WHEN_FEW_CANDIDATES = True
+
+    # The Writer ends its review with this marker (see WRITER_PROMPT)
+    WRITER_END_MARKER = "END OF LITERATURE REVIEW"
+
+
+class PrefetchConfig:
+    """Configuration for the speculative arXiv search run alongside the Researcher's first turn"""
+    ENABLED = True
+
+    # The Researcher is asked for this many candidates per requested paper (see RESEARCHER_PROMPT)
+    CANDIDATES_PER_PAPER = 3
+
+    # Minimum word overlap (Jaccard) between the guessed and the actual query to reuse the result
+    MIN_QUERY_SIMILARITY = 0.5
+
+
+class QueryMemoConfig:
+    """Configuration for reusing the Researcher's query formulation across runs"""
+    ENABLED = True
+
+    # JSON file mapping normalized tasks to Search_arXiv arguments
+    PATH = "./.cache/query_memo.json"
+
+    # Oldest entries are evicted beyond this size
+    MAX_ENTRIES = 5000
+
+
+class ArxivConfig:
+    """Configuration for arXiv retrieval"""
+    # Results requested per arXiv API page
+    PAGE_SIZE = 25
+
+    # arXiv asks clients to wait at least 3 seconds between requests
+    REQUEST_SPACING_SECONDS = 3.0
+
+    # Retries of a failed page (transient errors and 5xx/429 responses)
+    MAX_RETRIES = 4
+    BACKOFF_BASE_SECONDS = 3.0
+    BACKOFF_MAX_SECONDS = 60.0
+
+    # Larger requests are clamped to this many results
+    MAX_RESULTS = 100
+
+    # Hard caps on the text returned to the model (tokens estimated as bytes / 4)
+    MAX_RESULT_BYTES = 60000
+    MAX_RESULT_TOKENS = 12000
+
+
+class RetrievalConfig:
+    """Configuration for progressive arXiv retrieval (src/retrieval.py)"""
+    # Fetch a small first page and further pages only until max_results
+    # relevant candidates are found, instead of a fixed over-fetch
+    PROGRESSIVE = True
+
+    # Most papers in the first page and in every further page
+    FIRST_PAGE_SIZE = 10
+    PAGE_SIZE = 10
+
+    # Lexical score (0-1) from which a candidate counts as highly relevant
+    HIGH_RELEVANCE = 0.6
+
+    # Pages are fetched until the papers the user asked for plus this many
+    # are highly relevant. The first page holds just that many candidates,
+    # and no search pulls more than the Researcher's max_results.
+    MARGIN = 2
+
+    # The query is broadened (its terms OR-ed) when less than this share of
+    # the first page is highly relevant
+    BROADEN_BELOW = 0.25
+
+
+class DedupConfig:
+    """Configuration for collapsing near-duplicate search results (src/dedup.py)"""
+    ENABLED = True
+
+    # Word shingles of this length are hashed into a bottom-k MinHash signature
+    SHINGLE_SIZE = 3
+    SIGNATURE_SIZE = 64
+
+    # Estimated Jaccard similarity of title + abstract above which two papers are one
+    SIMILARITY_THRESHOLD = 0.6
+
+    # Extra results fetched so the requested count survives deduplication
+    OVERFETCH_RATIO = 0.5
+
+
+class CitationIndexConfig:
+    """Configuration for the offline citation/venue index (src/citation_index.py)"""
+    # Attach citation and venue features to candidates and pre-rank them.
+    # Without an index file the candidates are left untouched.
+    ENABLED = True
+
+    # Built from an offline dataset with build_citation_index.py
+    PATH = "./data/citation_index.npy"
+    VENUES_PATH = "./data/citation_venues.json"
+
+    # Deterministic pre-ranker: search rank, citations per year (log scale)
+    # and venue tier (0 unknown to 3 top venue) are combined with these weights
+    RANK_WEIGHT = 0.5
+    CITATION_WEIGHT = 0.3
+    VENUE_WEIGHT = 0.2
+
+    # Citations per year that count as a full citation score
+    CITATIONS_PER_YEAR_SATURATION = 100
+
+
+class EmbeddingCacheConfig:
+    """Configuration for the content-hash embedding cache (src/embedding_cache.py)"""
+    ENABLED = True
+
+    # One memory-mapped float32 matrix, key table and last-use table per model
+    DIRECTORY = "./.cache/embeddings"
+
+    # Embeddings kept per model; the least recently used are evicted beyond it
+    MAX_ENTRIES = 50000
+
+
+class PaperStoreConfig:
+    """Configuration for the shared memory-mapped paper store (src/paper_store.py)"""
+    # Serve repeated arXiv searches from papers stored by any process
+    ENABLED = True
+
+    # Immutable segments of columnar paper files, attached by every process
+    DIRECTORY = "./.cache/papers"
+
+    # Stored search results older than this are searched again
+    RESULTS_TTL_SECONDS = 24 * 3600
+
+    # Segments are merged into one, dropping expired results and the papers
+    # only they referenced, once a process sees more than this many
+    COMPACT_AFTER_SEGMENTS = 256
+
+
+class SessionConfig:
+    """Configuration for what a ResearchTeam keeps between queries"""
+    # "none": every query starts from an empty history
+    # "papers": the previously selected papers are passed to the next query
+    # "summary": the previous request, selected papers and opening of the review
+    CARRY_OVER = "none"
+    CARRY_OVER_MODES = ("none", "papers", "summary")
+
+    # Cap on carried-over context per session (tokens estimated as characters / 4)
+    MAX_CARRY_OVER_TOKENS = 1500
+
+    # Characters of the previous review kept in "summary" mode
+    SUMMARY_REVIEW_CHARS = 800
+
+
+class ServiceConfig:
+    """Configuration for the standalone review service (service.py)"""
+    HOST = "127.0.0.1"
+    PORT = 8765
+
+    # Worker processes running review pipelines. Each worker has its own
+    # LLMScheduler, so up to WORKERS * SchedulerConfig.MAX_CONCURRENT_CALLS
+    # model calls reach Ollama at the same time
+    WORKERS = 2
+    JOBS_PER_WORKER = 1
+
+    # Teams (and their carry-over) a worker keeps alive for returning sessions
+    MAX_SESSIONS_PER_WORKER = 50
+
+    # Finished jobs kept around for status and stream requests
+    MAX_FINISHED_JOBS = 200
+
+    # Comment lines sent on idle event streams so proxies keep them open
+    SSE_KEEPALIVE_SECONDS = 15.0
+
+    # When set, the Streamlit app is a thin client of this service
+    # instead of running the team in-process
+    URL = os.environ.get("REVIEW_SERVICE_URL")
+
+
+class DistributedConfig:
+    """Configuration for hosting agent roles in worker processes (src/distributed_runtime.py)"""
+    # Run the Researcher, Reviewer and Writer in role workers connected over
+    # autogen's gRPC runtime instead of inside the team's process.
+    # Start the host and the workers first: python agent_workers.py up
+    ENABLED = os.environ.get("REVIEW_DISTRIBUTED", "") not in ("", "0")
+
+    # gRPC host every worker and team connects to
+    HOST_ADDRESS = os.environ.get("REVIEW_AGENT_HOST", "localhost:50051")
+
+    # Worker processes per role; teams are spread over a role's replicas.
+    # Teams must use the same counts as the running workers.
+    REPLICAS = {
+        "Researcher": 1,
+        "Reviewer": 1,
+        "Writer": 1,
+    }
+
+
+class ProfilerConfig:
+    """Configuration for per-run profiling (src/profiling.py)"""
+    # Profile every run; a single run can also be profiled via ResearchTeam.profile
+    ENABLED = os.environ.get("REVIEW_PROFILE", "") not in ("", "0")
+
+    # "sampling": periodic stack samples of the event loop thread, written as
+    # folded stacks (flamegraph.pl, speedscope, inferno)
+    # "deterministic": cProfile of every call, written as a .prof file
+    # (snakeviz, flameprof, pstats)
+    MODE = os.environ.get("REVIEW_PROFILE_MODE", "sampling")
+    MODES = ("sampling", "deterministic")
+
+    SAMPLE_INTERVAL_SECONDS = 0.005
+
+    # Profiles and the hotspot summaries (summaries.jsonl) are written here
+    OUTPUT_DIR = "./.cache/profiles"
+
+    # Number of hotspots kept in each run's summary
+    TOP_N = 20
+
+
+class EventLogConfig:
+    """Configuration for the append-only run event log (src/event_log.py)"""
+    # Record every run's deltas so it can be replayed without a model
+    ENABLED = True
+
+    # One gzip member per run in events-<date>-<pid>.jsonl.gz, plus index.jsonl
+    DIRECTORY = "./.cache/event_log"
+
+    # Number of recent runs offered for replay in the UI
+    REPLAY_LIST_SIZE = 20
@@ -0,0 +1,144 @@
+"""
+Per-call context window and reply length sizing.
+Ollama runs every call with its default context (num_ctx) unless told
+otherwise, silently dropping the start of longer prompts, and reserves KV
+cache for the whole context however short the prompt is. The sizer picks
+num_ctx from the measured prompt size, rounded up to a few buckets, and caps
+the reply length (num_predict) per agent role.
+"""
+
+import json
+import logging
+import threading
+
+from config import ContextConfig
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_chars(messages, tools=()) -> int:
+    """
+    Characters a call sends to the model: message contents and tool schemas.
+
+    Args:
+        messages: LLM messages of the call
+        tools: Tools or tool schemas offered to the model
+
+    Returns:
+        int: Character count
+    """
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", "")
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    for tool in tools:
+        chars += len(json.dumps(getattr(tool, "schema", tool), default=str))
+    return chars
+
+
+class ContextSizer:
+    """
+    Process-wide num_ctx / num_predict decisions for every model.
+
+    The prompt size is estimated from its characters with a per-model
+    characters-per-token ratio that is calibrated by the prompt token counts
+    Ollama reports back. Ollama reloads a model whenever num_ctx changes, so
+    a model's context only ever grows within a process: after the first
+    large prompt every call uses the same size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chars_per_token = {}
+        self._num_ctx = {}
+        self._stats = {
+            "calls": 0,
+            "truncations_avoided": 0,
+            "truncated_prompts": 0,
+            "capped_replies": 0,
+            "num_ctx": {},
+        }
+
+    def estimate_tokens(self, model: str, chars: int) -> int:
+        """Estimated prompt tokens of a model for a number of prompt characters."""
+        with self._lock:
+            chars_per_token = self._chars_per_token.get(model, ContextConfig.INITIAL_CHARS_PER_TOKEN)
+        return int(chars / chars_per_token) + 1
+
+    def observe(self, model: str, chars: int, prompt_tokens: int) -> None:
+        """
+        Calibrate a model's characters-per-token ratio from a finished call.
+
+        Args:
+            model (str): Model name
+            chars (int): Characters the call sent
+            prompt_tokens (int): Prompt tokens Ollama reported for it
+        """
+        if not chars or not prompt_tokens:
+            return
+        # A prompt prefix Ollama had cached may not be counted, which would
+        # make tokens look longer than they are; implausible ratios are clamped
+        low, high = ContextConfig.CHARS_PER_TOKEN_RANGE
+        observed = min(high, max(low, chars / prompt_tokens))
+        with self._lock:
+            current = self._chars_per_token.get(model, ContextConfig.INITIAL_CHARS_PER_TOKEN)
+            weight = ContextConfig.CALIBRATION_WEIGHT
+            self._chars_per_token[model] = (1 - weight) * current + weight * observed
+
+    def options(self, model: str, role: str, chars: int) -> dict:
+        """
+        Sizing options for one call.
+
+        Args:
+            model (str): Model name
+            role (str): Agent role, a key of ContextConfig.NUM_PREDICT
+            chars (int): Characters the call sends (see prompt_chars)
+
+        Returns:
+            dict: num_ctx and num_predict for the call's Ollama options
+        """
+        num_predict = ContextConfig.NUM_PREDICT.get(role, ContextConfig.DEFAULT_NUM_PREDICT)
+        prompt_tokens = self.estimate_tokens(model, chars)
+        needed = int(prompt_tokens * ContextConfig.SAFETY_MARGIN) + num_predict
+        bucket = next((size for size in ContextConfig.NUM_CTX_BUCKETS if size >= needed), None)
+
+        with self._lock:
+            self._stats["calls"] += 1
+            num_ctx = max(bucket or ContextConfig.NUM_CTX_BUCKETS[-1], self._num_ctx.get(model, 0))
+            grown = num_ctx != self._num_ctx.get(model)
+            self._num_ctx[model] = num_ctx
+            self._stats["num_ctx"][model] = num_ctx
+            if bucket is None:
+                self._stats["truncated_prompts"] += 1
+            elif prompt_tokens > ContextConfig.SERVER_DEFAULT_NUM_CTX:
+                self._stats["truncations_avoided"] += 1
+
+        if bucket is None:
+            logger.warning(
+                "%s prompt of ~%d tokens plus %d reply tokens exceeds the largest context (%d); Ollama will truncate it",
+                role, prompt_tokens, num_predict, num_ctx,
+            )
+        elif prompt_tokens > ContextConfig.SERVER_DEFAULT_NUM_CTX:
+            logger.debug(
+                "%s prompt of ~%d tokens would have been truncated at the default %d-token context; using num_ctx=%d",
+                role, prompt_tokens, ContextConfig.SERVER_DEFAULT_NUM_CTX, num_ctx,
+            )
+        elif grown:
+            logger.info("Context of %s set to %d tokens", model, num_ctx)
+
+        return {"num_ctx": num_ctx, "num_predict": num_predict}
+
+    def reply_capped(self, role: str, num_predict: int) -> None:
+        """Record a reply that stopped at its num_predict cap."""
+        with self._lock:
+            self._stats["capped_replies"] += 1
+        logger.info("%s reply stopped at its %s-token cap (ContextConfig.NUM_PREDICT)", role, num_predict)
+
+    def stats(self) -> dict:
+        """Sized calls, truncations avoided and not avoided, capped replies and per-model num_ctx."""
+        with self._lock:
+            return dict(
+                self._stats,
+                num_ctx=dict(self._stats["num_ctx"]),
+                chars_per_token={model: round(ratio, 2) for model, ratio in self._chars_per_token.items()},
+            )
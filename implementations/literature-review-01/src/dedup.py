@@ -0,0 +1,117 @@
+"""
+Near-duplicate collapsing of search results.
+Versions of one arXiv entry (v1, v2, ...) and workshop/journal variants with
+nearly identical titles and abstracts are collapsed to their latest version
+before the candidates reach the Reviewer.
+"""
+
+import re
+import zlib
+
+from config import DedupConfig
+
+_ENTRY_ID = re.compile(r"(?:arxiv\.org/abs/|^)(?P<id>[\w.-]+?(?:/\d+)?)(?:v(?P<version>\d+))?$")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_entry_id(url: str) -> tuple:
+    """
+    Split an arXiv entry URL into its versionless id and version.
+
+    Args:
+        url (str): Entry URL or bare id, e.g. http://arxiv.org/abs/2401.01234v2 or 2401.01234v2
+
+    Returns:
+        tuple: (versionless id, version number; 0 if the URL has none)
+    """
+    match = _ENTRY_ID.search(url)
+    if match is None:
+        return url, 0
+    return match.group("id"), int(match.group("version") or 0)
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    size = DedupConfig.SHINGLE_SIZE
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> set:
+    """
+    Bottom-k MinHash signature of the text's word shingles.
+
+    Every shingle is hashed once and the DedupConfig.SIGNATURE_SIZE smallest
+    hashes are kept, which costs one pass over the text instead of one pass
+    per hash function.
+
+    Args:
+        text (str): Text to sign
+
+    Returns:
+        set: Smallest shingle hashes (empty for empty text)
+    """
+    hashes = sorted({zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(text)})
+    return set(hashes[:DedupConfig.SIGNATURE_SIZE])
+
+
+def estimated_similarity(first: set, second: set) -> float:
+    """
+    Estimate the Jaccard similarity of two shingle sets from their signatures.
+
+    Args:
+        first (set): Signature from minhash_signature
+        second (set): Another signature
+
+    Returns:
+        float: Similarity between 0 and 1
+    """
+    if not first or not second:
+        return 0.0
+    # The smallest hashes of the union are a uniform sample of it
+    union = sorted(first | second)[:DedupConfig.SIGNATURE_SIZE]
+    return sum(1 for h in union if h in first and h in second) / len(union)
+
+
+def collapse_near_duplicates(papers: list, threshold: float = DedupConfig.SIMILARITY_THRESHOLD) -> list:
+    """
+    Collapse versions and near-duplicates of the same paper.
+
+    Papers with the same versionless arXiv id, or whose title and abstract
+    are at least `threshold` similar, form one group. Each group is kept
+    once, at the rank of its best-ranked member, as its latest version: the
+    most recently updated entry, and of one entry the highest version.
+    "published" is the v1 date, so it only stands in for a missing "updated".
+
+    Args:
+        papers (list): Paper records in relevance order
+        threshold (float): Estimated Jaccard similarity that makes two papers duplicates
+
+    Returns:
+        list: Deduplicated records, renumbered from 1 in relevance order
+    """
+    entry_ids = [normalize_entry_id(paper["url"]) for paper in papers]
+    signatures = [minhash_signature(f"{paper['title']} {paper['abstract']}") for paper in papers]
+
+    # Each paper joins the group of the first earlier paper it duplicates
+    group_of = list(range(len(papers)))
+    for i in range(len(papers)):
+        for j in range(i):
+            if group_of[j] != j:
+                continue
+            if (entry_ids[i][0] == entry_ids[j][0]
+                    or estimated_similarity(signatures[i], signatures[j]) >= threshold):
+                group_of[i] = j
+                break
+
+    groups = {}
+    for i, leader in enumerate(group_of):
+        groups.setdefault(leader, []).append(i)
+
+    unique = []
+    for leader in sorted(groups):
+        latest = max(groups[leader], key=lambda i: (papers[i].get("updated") or papers[i]["published"], entry_ids[i][1]))
+        unique.append(dict(papers[latest], id=len(unique) + 1))
+
+    return unique
@@ -0,0 +1,420 @@
+"""
+Distributed agent runtime.
+Hosts each agent role (Researcher, Reviewer, Writer) in its own worker
+process, connected through autogen's gRPC worker runtime, on this machine or
+on others. A distributed ResearchTeam keeps only its group chat manager in
+process and reaches the role agents through the host, so a slow tool or a
+long generation in one role no longer holds up the others.
+
+Every replica of a role is a worker registering its own agent type
+("Reviewer_replica1"); each team is assigned one replica per role and the
+replica keeps one agent per team, keyed by the team id, until the team
+leaves (ResearchTeam.close).
+"""
+
+import asyncio
+import itertools
+import json
+
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, MessageFactory, StructuredMessage
+from autogen_agentchat.teams import SelectorGroupChat
+# Internal to autogen_agentchat: the events and participant container a
+# group chat exchanges with its participants through the runtime
+from autogen_agentchat.teams._group_chat._chat_agent_container import ChatAgentContainer
+from autogen_agentchat.teams._group_chat._events import (
+    GroupChatAgentResponse,
+    GroupChatError,
+    GroupChatMessage,
+    GroupChatPause,
+    GroupChatRequestPublish,
+    GroupChatReset,
+    GroupChatResume,
+    GroupChatStart,
+    GroupChatTermination,
+)
+from autogen_agentchat.teams._group_chat._selector_group_chat import SelectorGroupChatManager
+from autogen_core import (
+    JSON_DATA_CONTENT_TYPE,
+    AgentId,
+    AgentInstantiationContext,
+    AgentType,
+    MessageContext,
+    MessageHandlerContext,
+    TypeSubscription,
+    rpc,
+)
+from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime
+from pydantic import BaseModel
+
+from agents import create_researcher_agent, create_reviewer_agent, create_writer_agent
+from config import AgentConfig, DistributedConfig
+from papers import ReviewerSelection
+
+
+class JoinTeam(BaseModel):
+    """Asks a role replica to take part in a team's group chat."""
+
+    group_topic_type: str
+    output_topic_type: str
+
+
+class LeaveTeam(BaseModel):
+    """Asks a role replica to drop its agent for a team that is closed."""
+
+    group_topic_type: str
+
+
+GROUP_CHAT_EVENTS = (
+    GroupChatStart,
+    GroupChatAgentResponse,
+    GroupChatRequestPublish,
+    GroupChatMessage,
+    GroupChatTermination,
+    GroupChatReset,
+    GroupChatPause,
+    GroupChatResume,
+    GroupChatError,
+    JoinTeam,
+    LeaveTeam,
+)
+
+ROLE_AGENTS = {
+    AgentConfig.RESEARCHER_NAME: create_researcher_agent,
+    AgentConfig.REVIEWER_NAME: create_reviewer_agent,
+    AgentConfig.WRITER_NAME: create_writer_agent,
+}
+
+
+def replica_agent_type(role: str, replica: int) -> str:
+    """Agent type a role replica registers with the host."""
+    return f"{role}_replica{replica}"
+
+
+def create_message_factory() -> MessageFactory:
+    """Message factory that knows every message the team's agents produce."""
+    message_factory = MessageFactory()
+    message_factory.register(StructuredMessage[ReviewerSelection])
+    return message_factory
+
+
+def _encode(value, message_factory: MessageFactory):
+    if isinstance(value, (BaseChatMessage, BaseAgentEvent)):
+        return {"__message__": value.dump()}
+    if isinstance(value, Response):
+        inner_messages = value.inner_messages
+        return {"__response__": {
+            "chat_message": _encode(value.chat_message, message_factory),
+            "inner_messages": None if inner_messages is None else [_encode(m, message_factory) for m in inner_messages],
+        }}
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [_encode(item, message_factory) for item in value]
+    return value
+
+
+def _decode(value, message_factory: MessageFactory):
+    if isinstance(value, list):
+        return [_decode(item, message_factory) for item in value]
+    if isinstance(value, dict) and "__message__" in value:
+        return message_factory.create(value["__message__"])
+    if isinstance(value, dict) and "__response__" in value:
+        response = value["__response__"]
+        inner_messages = response["inner_messages"]
+        return Response(
+            chat_message=_decode(response["chat_message"], message_factory),
+            inner_messages=None if inner_messages is None else _decode(inner_messages, message_factory),
+        )
+    return value
+
+
+class GroupChatEventSerializer:
+    """
+    JSON serializer for a group chat event.
+
+    The events hold chat messages of any registered type, which plain
+    pydantic serialization cannot restore, so messages are written with
+    their type and rebuilt with the message factory.
+    """
+
+    data_content_type = JSON_DATA_CONTENT_TYPE
+
+    def __init__(self, event_type: type, message_factory: MessageFactory):
+        self._event_type = event_type
+        self._message_factory = message_factory
+
+    @property
+    def type_name(self) -> str:
+        return self._event_type.__name__
+
+    def serialize(self, message) -> bytes:
+        fields = {name: _encode(getattr(message, name), self._message_factory) for name in type(message).model_fields}
+        return json.dumps(fields).encode("utf-8")
+
+    def deserialize(self, payload: bytes):
+        fields = {name: _decode(value, self._message_factory) for name, value in json.loads(payload).items()}
+        return self._event_type.model_validate(fields)
+
+
+class _NoneSerializer:
+    # Reset, pause and resume requests answer with None
+    data_content_type = JSON_DATA_CONTENT_TYPE
+    type_name = "NoneType"
+
+    def serialize(self, message) -> bytes:
+        return b"null"
+
+    def deserialize(self, payload: bytes):
+        return None
+
+
+def add_serializers(runtime: GrpcWorkerAgentRuntime, message_factory: MessageFactory) -> None:
+    """
+    Register the serializers of everything a group chat sends over the runtime.
+
+    Registering an agent type installs plain pydantic serializers for the
+    messages it handles, so call this again after every registration.
+    """
+    runtime.add_message_serializer([GroupChatEventSerializer(event, message_factory) for event in GROUP_CHAT_EVENTS])
+    runtime.add_message_serializer(_NoneSerializer())
+
+
+class _HandlerContext:
+    """
+    Runs every handler of an agent inside its message handler context.
+
+    The gRPC worker runtime calls event handlers outside that context, so a
+    DefaultTopicId published from them gets the "default" source instead of
+    the team id and reaches a new agent instead of the team's one.
+    """
+
+    async def on_message_impl(self, message, ctx: MessageContext):
+        with MessageHandlerContext.populate_context(self.id):
+            return await super().on_message_impl(message, ctx)
+
+
+def _subscription_id(group_topic_type: str, agent_type: str) -> str:
+    # Derived from the team, so a replica can drop it without having kept it
+    return f"{group_topic_type}/{agent_type}"
+
+
+class RoleAgentContainer(_HandlerContext, ChatAgentContainer):
+    """Participant container of a role replica; one per team it serves."""
+
+    def __init__(self, parent_topic_type: str, output_topic_type: str, agent, message_factory: MessageFactory, release=None):
+        """
+        Args:
+            parent_topic_type (str): The team's group topic
+            output_topic_type (str): The team's output topic
+            agent (ChatAgent): The role agent serving this team
+            message_factory (MessageFactory): Rebuilds chat messages from JSON
+            release: Called with the container's AgentId when the team leaves,
+                to drop the container from the worker runtime
+        """
+        super().__init__(parent_topic_type, output_topic_type, agent, message_factory)
+        self._release = release
+
+    @rpc
+    async def handle_join(self, message: JoinTeam, ctx: MessageContext) -> None:
+        """Subscribe this team's agent to the team's group topic."""
+        self._parent_topic_type = message.group_topic_type
+        self._output_topic_type = message.output_topic_type
+        await self.runtime.add_subscription(
+            TypeSubscription(
+                topic_type=message.group_topic_type,
+                agent_type=self.id.type,
+                id=_subscription_id(message.group_topic_type, self.id.type),
+            )
+        )
+
+    @rpc
+    async def handle_leave(self, message: LeaveTeam, ctx: MessageContext) -> None:
+        """Unsubscribe from the team's group topic and drop this team's agent."""
+        await self.runtime.remove_subscription(_subscription_id(message.group_topic_type, self.id.type))
+        await self._agent.close()
+        if self._release is not None:
+            self._release(self.id)
+
+
+class DistributedSelectorGroupChatManager(_HandlerContext, SelectorGroupChatManager):
+    """Group chat manager of a distributed team."""
+
+
+async def start_role_worker(role: str, replica: int = 0, host_address: str = DistributedConfig.HOST_ADDRESS) -> GrpcWorkerAgentRuntime:
+    """
+    Connect a worker hosting one replica of a role to the host.
+
+    Args:
+        role (str): Agent name, a key of ROLE_AGENTS
+        replica (int): Replica number, below DistributedConfig.REPLICAS[role]
+        host_address (str): gRPC host address
+
+    Returns:
+        GrpcWorkerAgentRuntime: The running worker runtime; stop() it to leave
+    """
+    if role not in ROLE_AGENTS:
+        raise ValueError(f"Unknown role {role!r}, expected one of {', '.join(ROLE_AGENTS)}")
+
+    message_factory = create_message_factory()
+    runtime = GrpcWorkerAgentRuntime(host_address=host_address)
+    await runtime.start()
+
+    agent_type = replica_agent_type(role, replica)
+
+    def release(agent_id: AgentId) -> None:
+        # The worker runtime has no public way to drop an agent instance; a
+        # later message to the same id would create a new container
+        runtime._instantiated_agents.pop(agent_id, None)
+
+    def create_container() -> RoleAgentContainer:
+        # The agent key is the team id; handle_join confirms the topics
+        team_id = AgentInstantiationContext.current_agent_id().key
+        return RoleAgentContainer(
+            f"group_topic_{team_id}", f"output_topic_{team_id}", ROLE_AGENTS[role](), message_factory, release
+        )
+
+    await RoleAgentContainer.register(runtime, agent_type, create_container)
+    add_serializers(runtime, message_factory)
+    await runtime.add_subscription(TypeSubscription(topic_type=agent_type, agent_type=agent_type))
+    return runtime
+
+
+class Coordinator:
+    """
+    Process-wide connection of distributed teams to the host.
+
+    Connects on first use and assigns each new team a replica of every role,
+    round robin.
+    """
+
+    def __init__(self, host_address: str = DistributedConfig.HOST_ADDRESS, replicas: dict = DistributedConfig.REPLICAS):
+        """
+        Args:
+            host_address (str): gRPC host address
+            replicas (dict): Role -> number of running replicas
+        """
+        self.host_address = host_address
+        self.replicas = replicas
+        self.message_factory = create_message_factory()
+
+        self.runtime = GrpcWorkerAgentRuntime(host_address=host_address)
+
+        self._start_lock = None
+        self._started = False
+        self._next_replica = {role: itertools.count() for role in replicas}
+
+    async def start(self) -> None:
+        """Connect to the host unless already connected."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if not self._started:
+                await self.runtime.start()
+                self._started = True
+
+    def assign_replica(self, role: str) -> str:
+        """Agent type of the replica of a role the next team uses."""
+        count = self.replicas.get(role, 1)
+        counter = self._next_replica.setdefault(role, itertools.count())
+        return replica_agent_type(role, next(counter) % count)
+
+
+class DistributedSelectorGroupChat(SelectorGroupChat):
+    """
+    SelectorGroupChat whose participants run in role workers.
+
+    The participant agents passed in only provide names, descriptions and
+    message types; their replicas in the workers do the work. The group chat
+    manager runs here, so speaker selection, termination and the output
+    stream behave as in a local team.
+    """
+
+    def __init__(self, participants: list, *, coordinator: Coordinator, **kwargs):
+        super().__init__(participants, runtime=coordinator.runtime, **kwargs)
+        self._coordinator = coordinator
+        self._participant_topic_types = [coordinator.assign_replica(p.name) for p in participants]
+        self._base_group_chat_manager_class = DistributedSelectorGroupChatManager
+        self._manager_subscriptions = []
+
+    def _create_group_chat_manager_factory(self, name, group_topic_type, output_topic_type, participant_topic_types,
+                                           participant_names, participant_descriptions, output_message_queue,
+                                           termination_condition, max_turns, message_factory):
+        # Same arguments as SelectorGroupChat's factory, with the distributed manager class
+        return lambda: DistributedSelectorGroupChatManager(
+            name,
+            group_topic_type,
+            output_topic_type,
+            participant_topic_types,
+            participant_names,
+            participant_descriptions,
+            output_message_queue,
+            termination_condition,
+            max_turns,
+            message_factory,
+            self._model_client,
+            self._selector_prompt,
+            self._allow_repeated_speaker,
+            self._selector_func,
+            self._max_selector_attempts,
+            self._candidate_func,
+            self._emit_team_events,
+            self._model_context,
+            self._model_client_streaming,
+        )
+
+    async def _init(self, runtime) -> None:
+        await self._coordinator.start()
+        add_serializers(runtime, self._coordinator.message_factory)
+
+        # The replicas subscribe themselves: the host only delivers an event
+        # to the worker owning the agent type, which matches it locally
+        join = JoinTeam(group_topic_type=self._group_topic_type, output_topic_type=self._output_topic_type)
+        for agent_type in self._participant_topic_types:
+            await runtime.send_message(join, AgentId(type=agent_type, key=self._team_id))
+
+        # The manager is registered as in BaseGroupChat._init
+        group_chat_manager_agent_type = AgentType(self._group_chat_manager_topic_type)
+        await self._base_group_chat_manager_class.register(
+            runtime,
+            type=group_chat_manager_agent_type.type,
+            factory=self._create_group_chat_manager_factory(
+                name=self._group_chat_manager_name,
+                group_topic_type=self._group_topic_type,
+                output_topic_type=self._output_topic_type,
+                participant_names=self._participant_names,
+                participant_topic_types=self._participant_topic_types,
+                participant_descriptions=self._participant_descriptions,
+                output_message_queue=self._output_message_queue,
+                termination_condition=self._termination_condition,
+                max_turns=self._max_turns,
+                message_factory=self._message_factory,
+            ),
+        )
+        add_serializers(runtime, self._coordinator.message_factory)
+        for topic_type in (self._group_chat_manager_topic_type, self._group_topic_type, self._output_topic_type):
+            subscription = TypeSubscription(topic_type=topic_type, agent_type=group_chat_manager_agent_type.type)
+            await runtime.add_subscription(subscription)
+            self._manager_subscriptions.append(subscription.id)
+
+        self._initialized = True
+
+    async def leave(self) -> None:
+        """
+        Release the team's agents in the role workers and its manager's subscriptions.
+
+        The team cannot run afterwards; a team that never ran has nothing to release.
+        """
+        if not self._initialized or not self._manager_subscriptions:
+            return
+
+        leave = LeaveTeam(group_topic_type=self._group_topic_type)
+        for agent_type in self._participant_topic_types:
+            await self._runtime.send_message(leave, AgentId(type=agent_type, key=self._team_id))
+        for subscription_id in self._manager_subscriptions:
+            await self._runtime.remove_subscription(subscription_id)
+        self._manager_subscriptions = []
+
+
+# Shared by every distributed team in the process
+coordinator = Coordinator()
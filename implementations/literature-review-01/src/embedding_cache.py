@@ -0,0 +1,289 @@
+"""
+Content-hash embedding cache.
+Embeddings are keyed by model and a hash of the embedded text and stored in
+memory-mapped float32 matrices, one per model, so identical texts (memory
+entries, queries, arXiv abstracts) are embedded once across calls, runs
+and processes.
+"""
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+from ollama import AsyncClient
+
+from config import EmbeddingCacheConfig, ModelConfig
+from file_lock import file_lock
+
+KEY_DTYPE = np.dtype("S32")
+
+
+def content_key(text: str) -> bytes:
+    """Hash of a text, the key of its embedding."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest().encode("ascii")
+
+
+class _ModelTable:
+    """
+    Cached embeddings of one model: three memory-mapped .npy files with
+    one row per entry (vectors, keys and last-use ticks). An empty key marks
+    a free row. Called with the cache lock held.
+
+    Every process maps the same files. Its key -> row index is only a hint:
+    another process may have evicted a row and reused it since, so the key
+    stored in the row is checked on every read, and writers hold a lock file.
+    """
+
+    def __init__(self, prefix: Path, dim: int = None, capacity: int = None):
+        paths = [prefix.with_name(f"{prefix.name}.{part}.npy") for part in ("vectors", "keys", "last_used")]
+        self.lock_path = prefix.with_name(f"{prefix.name}.lock")
+        if not all(path.exists() for path in paths):
+            if dim is None:
+                raise FileNotFoundError(prefix)
+            prefix.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.lock_path):
+                # Another process may have created the table while this one waited
+                if not all(path.exists() for path in paths):
+                    open_memmap = np.lib.format.open_memmap
+                    for path, dtype, shape in zip(
+                        paths, (np.float32, KEY_DTYPE, np.int64), ((capacity, dim), (capacity,), (capacity,))
+                    ):
+                        open_memmap(path, mode="w+", dtype=dtype, shape=shape).flush()
+
+        self.vectors, self.keys, self.last_used = (np.load(path, mmap_mode="r+") for path in paths)
+        self.tick = 0
+        self.reload()
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def reload(self) -> None:
+        """Rebuild the row index from the shared key table."""
+        self.rows = {key: row for row, key in enumerate(self.keys.tolist()) if key}
+        self.tick = max(self.tick, int(self.last_used.max(initial=0)))
+
+    def find(self, keys: list) -> list:
+        """Rows of the keys (None for missing ones), checked against the shared key table."""
+        rows = self._checked(keys)
+        if None in rows:
+            # Entries added, moved or evicted by other processes
+            self.reload()
+            rows = self._checked(keys)
+
+        found = [row for row in rows if row is not None]
+        if found:
+            self.tick += 1
+            self.last_used[found] = self.tick
+        return rows
+
+    def _checked(self, keys: list) -> list:
+        rows = [self.rows.get(key) for key in keys]
+        return [row if row is not None and self.keys[row] == key else None for row, key in zip(rows, keys)]
+
+    def insert(self, keys: list, vectors: np.ndarray) -> int:
+        """Store new entries, reusing the least recently used rows when full. Returns evictions."""
+        with file_lock(self.lock_path):
+            self.reload()
+
+            # Entries another process stored in the meantime are kept
+            new = [index for index, key in enumerate(keys) if key not in self.rows]
+            # A batch larger than the table keeps its last entries
+            new = new[-len(self.keys):]
+            keys, vectors = [keys[index] for index in new], vectors[new]
+
+            free = np.flatnonzero(self.keys == b"")
+            evicted = 0
+            if len(free) < len(keys):
+                evicted = len(keys) - len(free)
+                used = np.flatnonzero(self.keys != b"")
+                oldest = used[np.argsort(self.last_used[used], kind="stable")[:evicted]]
+                for key in self.keys[oldest].tolist():
+                    self.rows.pop(key, None)
+                # Cleared before the vector is replaced, so readers never match a half-written row
+                self.keys[oldest] = b""
+                free = np.concatenate([free, oldest])
+
+            rows = free[:len(keys)]
+            self.tick += 1
+            self.vectors[rows] = vectors
+            self.keys[rows] = keys
+            self.last_used[rows] = self.tick
+            for key, row in zip(keys, rows.tolist()):
+                self.rows[key] = row
+            self.flush()
+            return evicted
+
+    def flush(self) -> None:
+        for array in (self.vectors, self.keys, self.last_used):
+            array.flush()
+
+
+class EmbeddingCache:
+    """
+    Process-wide embedding cache shared by the memory and ranking paths.
+
+    Each model's table holds at most `capacity` embeddings; beyond that the
+    least recently used ones are evicted. Lookups and computations are
+    batched: one call embeds every distinct missing text at once.
+    """
+
+    def __init__(self, directory: str = EmbeddingCacheConfig.DIRECTORY, capacity: int = EmbeddingCacheConfig.MAX_ENTRIES):
+        """
+        Args:
+            directory (str): Directory holding one set of .npy files per model
+            capacity (int): Embeddings kept per model when its table is created
+        """
+        self.directory = Path(directory)
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _table(self, model: str, dim: int = None) -> _ModelTable | None:
+        # Called with the lock held
+        if model not in self._tables:
+            prefix = self.directory / re.sub(r"[^\w.-]", "_", model)
+            try:
+                self._tables[model] = _ModelTable(prefix, dim, self.capacity)
+            except FileNotFoundError:
+                return None
+        return self._tables[model]
+
+    def lookup(self, model: str, texts: list) -> tuple:
+        """
+        Look up the cached embeddings of many texts.
+
+        Args:
+            model (str): Embedding model
+            texts (list): Texts to look up
+
+        Returns:
+            tuple: (list with a float32 vector or None per text,
+                indices of the texts that were not cached)
+        """
+        keys = [content_key(text) for text in texts]
+        with self._lock:
+            table = self._table(model)
+            rows = table.find(keys) if table is not None else [None] * len(keys)
+            hits = [index for index, row in enumerate(rows) if row is not None]
+            if hits:
+                vectors = list(np.array(table.vectors[[rows[index] for index in hits]]))
+                # A row reused by another process while it was copied is a miss
+                current = table.keys[[rows[index] for index in hits]].tolist()
+                cached = {index: vector for index, vector, key in zip(hits, vectors, current) if key == keys[index]}
+            else:
+                cached = {}
+
+            self._stats["hits"] += len(cached)
+            self._stats["misses"] += len(keys) - len(cached)
+
+        vectors = [cached.get(index) for index in range(len(keys))]
+        missing = [index for index in range(len(keys)) if index not in cached]
+        return vectors, missing
+
+    def store(self, model: str, texts: list, vectors) -> None:
+        """
+        Add computed embeddings.
+
+        Args:
+            model (str): Embedding model
+            texts (list): Embedded texts
+            vectors: One embedding per text
+        """
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [content_key(text) for text in texts]
+        with self._lock:
+            table = self._table(model, dim=vectors.shape[1])
+            if table.dim != vectors.shape[1]:
+                raise ValueError(f"{model} embeddings have {vectors.shape[1]} dimensions, the cache has {table.dim}")
+            self._stats["evictions"] += table.insert(keys, vectors)
+
+    def _misses(self, model: str, texts: list) -> tuple:
+        vectors, missing = self.lookup(model, texts)
+        # Identical texts within a batch are embedded once
+        pending = list(dict.fromkeys(texts[index] for index in missing))
+        return vectors, missing, pending
+
+    def _fill(self, model: str, texts: list, vectors: list, missing: list, pending: list, computed) -> np.ndarray:
+        computed = np.asarray(computed, dtype=np.float32)
+        self.store(model, pending, computed)
+        by_text = dict(zip(pending, computed))
+        for index in missing:
+            vectors[index] = by_text[texts[index]]
+        return np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    def embed(self, model: str, texts: list, compute) -> np.ndarray:
+        """
+        Embeddings of many texts, computing only the ones not cached.
+
+        Args:
+            model (str): Embedding model
+            texts (list): Texts to embed
+            compute: Callable embedding a list of texts, returning one vector per text
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text
+        """
+        vectors, missing, pending = self._misses(model, texts)
+        computed = compute(pending) if pending else []
+        return self._fill(model, texts, vectors, missing, pending, computed)
+
+    async def aembed(self, model: str, texts: list, compute) -> np.ndarray:
+        """
+        Async variant of `embed`.
+
+        Args:
+            model (str): Embedding model
+            texts (list): Texts to embed
+            compute: Async callable embedding a list of texts
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text
+        """
+        vectors, missing, pending = self._misses(model, texts)
+        computed = await compute(pending) if pending else []
+        return self._fill(model, texts, vectors, missing, pending, computed)
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate, evictions and cached entries per model."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                hit_rate=round(self._stats["hits"] / lookups, 3) if lookups else None,
+                entries={model: len(table.rows) for model, table in self._tables.items()},
+            )
+
+
+# Shared by every embedding user in the process
+embedding_cache = EmbeddingCache()
+
+
+async def embed_texts(texts: list, model: str = ModelConfig.NOMIC_EMBED_TEXT) -> np.ndarray:
+    """
+    Embed texts with Ollama through the shared cache.
+
+    Args:
+        texts (list): Texts to embed
+        model (str): Ollama embedding model
+
+    Returns:
+        np.ndarray: float32 matrix with one row per text
+    """
+    async def compute(pending: list) -> list:
+        client = AsyncClient(host=ModelConfig.OLLAMA_HOST)
+        try:
+            response = await client.embed(model=model, input=pending)
+        finally:
+            await client.close()
+        return response.embeddings
+
+    if not EmbeddingCacheConfig.ENABLED:
+        return np.asarray(await compute(texts), dtype=np.float32)
+    return await embedding_cache.aembed(model, texts, compute)
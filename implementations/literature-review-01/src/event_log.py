@@ -0,0 +1,175 @@
+"""
+Append-only log of run events.
+Every run's deltas (see ResearchTeam.stream_chat) are stored with their
+timing as one gzip-compressed JSONL member, and index.jsonl records where
+each run lives. Any logged run can be replayed without touching a model,
+instantly or at its original pace.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from config import EventLogConfig
+
+# Bytes read at a time when reading the index from its end
+_TAIL_BLOCK = 64 * 1024
+
+
+class EventLog:
+    """
+    Run event log in a directory shared by every team in the process.
+
+    Each process appends to its own file, so the compressed offsets in the
+    index stay correct when several service workers log at once.
+    """
+
+    def __init__(self, directory: str = EventLogConfig.DIRECTORY):
+        """
+        Args:
+            directory (str): Directory holding the log files and the index
+        """
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.jsonl"
+
+    def append(self, header: dict, records: list) -> None:
+        """
+        Append one run to the log.
+
+        Args:
+            header (dict): Run metadata (run_id, task, started_at, complete)
+            records (list): {"t": seconds since the run started, "delta": delta} in order
+        """
+        lines = [json.dumps(header, ensure_ascii=False)]
+        lines.extend(json.dumps(record, ensure_ascii=False) for record in records)
+        member = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+
+        log_path = self.directory / f"events-{time.strftime('%Y%m%d')}-{os.getpid()}.jsonl.gz"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with log_path.open("ab") as f:
+                offset = f.tell()
+                f.write(member)
+
+            entry = {**header, "file": log_path.name, "offset": offset, "length": len(member)}
+            with self.index_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def runs(self, limit: int = None) -> list:
+        """
+        List logged runs, newest first.
+
+        Args:
+            limit (int): Return at most this many runs
+
+        Returns:
+            list: Index entries (run_id, task, started_at, complete, file, offset, length)
+        """
+        try:
+            lines = self._tail(limit) if limit is not None else self.index_path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return []
+
+        entries = [json.loads(line) for line in lines if line.strip()]
+        entries.reverse()
+        return entries[:limit] if limit is not None else entries
+
+    def _tail(self, count: int) -> list:
+        """Last `count` lines of the index, read from the end so the index can grow without bound."""
+        with self.index_path.open("rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(_TAIL_BLOCK, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+
+        lines = [line for line in data.splitlines() if line.strip()]
+        # The first line may have been cut by the block boundary
+        if position > 0:
+            lines = lines[1:]
+        return lines[-count:] if count else []
+
+    def load(self, run_id: str) -> tuple:
+        """
+        Read one run back from the log.
+
+        Args:
+            run_id (str): Run to load
+
+        Returns:
+            tuple: (header dict, list of records)
+        """
+        entry = next((entry for entry in self.runs() if entry["run_id"] == run_id), None)
+        if entry is None:
+            raise KeyError(f"Run not found in the event log: {run_id}")
+
+        # Only this run's member is read and decompressed
+        with (self.directory / entry["file"]).open("rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+
+        header, *records = [json.loads(line) for line in gzip.decompress(member).decode("utf-8").splitlines()]
+        return header, records
+
+
+async def record_run(deltas, event_log: EventLog, task: str, run_id: str):
+    """
+    Log a run while passing its deltas through.
+
+    The run is written once it finishes; a run that is abandoned or fails
+    is still written, marked as incomplete.
+
+    Args:
+        deltas: Async iterator of run deltas
+        event_log (EventLog): Log the run is appended to
+        task (str): The user's research query
+        run_id (str): Key of the run in the log
+
+    Yields:
+        dict: The run's deltas, unchanged
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    records = []
+    complete = False
+
+    try:
+        async for delta in deltas:
+            records.append({"t": round(time.perf_counter() - start, 4), "delta": delta})
+            complete = delta["event"] == "done"
+            yield delta
+    finally:
+        event_log.append(
+            {"run_id": run_id, "task": task, "started_at": started_at, "complete": complete},
+            records,
+        )
+
+
+def replay_run(records: list, realtime: bool = False, speed: float = 1.0):
+    """
+    Replay a logged run's deltas.
+
+    Args:
+        records (list): Records returned by EventLog.load
+        realtime (bool): Reproduce the original timing instead of replaying instantly
+        speed (float): Playback speed when realtime (2.0 is twice as fast)
+
+    Yields:
+        dict: The run's deltas in their original order
+    """
+    start = time.perf_counter()
+    for record in records:
+        if realtime:
+            wait = record["t"] / speed - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+        yield record["delta"]
@@ -0,0 +1,32 @@
+"""
+Exclusive lock files.
+Serializes writers of a file shared by several processes (service workers,
+role workers, batch jobs).
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows: writers in several processes are then not serialized
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Hold an exclusive lock on a file, blocking until no other process holds it.
+
+    Args:
+        path (Path): Lock file, created if missing
+    """
+    with open(path, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
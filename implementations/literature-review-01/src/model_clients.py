@@ -0,0 +1,295 @@
+"""
+Model client wrappers.
+Each wrapper sits in front of a shared Ollama client and adds one concern
+(scheduling, option sizing, metrics) without changing the agent code.
+"""
+
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelInfo, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from config import ModelConfig, PromptCacheConfig
+from context_sizing import ContextSizer, prompt_chars
+from prompt_cache import PromptCacheStats, assemble_prompt, current_call, recording
+from residency import ModelResidency
+from scheduler import LLMScheduler, Priority
+
+
+def model_name(client: ChatCompletionClient) -> str | None:
+    """
+    Name of the model behind a client, looking through wrappers.
+
+    Args:
+        client (ChatCompletionClient): Possibly wrapped model client
+
+    Returns:
+        str | None: Model name, or None for clients that do not name one
+    """
+    while isinstance(client, DelegatingChatCompletionClient):
+        client = client.inner_client
+    get_create_args = getattr(client, "get_create_args", None)
+    return get_create_args().get("model") if get_create_args else None
+
+
+class DelegatingChatCompletionClient(ChatCompletionClient):
+    """
+    Base wrapper that forwards every call to an inner model client.
+
+    Subclasses override `create` / `create_stream` to add behaviour around the
+    call. The inner client is shared between agents, so closing a wrapper
+    leaves it open.
+    """
+
+    def __init__(self, client: ChatCompletionClient):
+        self._client = client
+
+    @property
+    def inner_client(self) -> ChatCompletionClient:
+        return self._client
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        return await self._client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async for chunk in self._client.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            yield chunk
+
+    async def close(self) -> None:
+        # The inner client is owned by the agents module, not by this wrapper
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
+
+
+class ScheduledChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    Routes every call through an `LLMScheduler` slot of a fixed priority.
+
+    A streamed call keeps its slot until the last chunk has been consumed.
+    The model name lets the scheduler batch queued calls by model.
+    """
+
+    def __init__(self, client: ChatCompletionClient, scheduler: LLMScheduler, priority: Priority):
+        super().__init__(client)
+        self._scheduler = scheduler
+        self._priority = priority
+        self._model = model_name(client)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        async with self._scheduler.slot(self._priority, self._model):
+            return await super().create(messages, **kwargs)
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async with self._scheduler.slot(self._priority, self._model):
+            async for chunk in super().create_stream(messages, **kwargs):
+                yield chunk
+
+
+class ResidentChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    Makes sure the client's model is loaded in Ollama before each call and
+    asks Ollama to keep it for the model's configured keep_alive.
+
+    Wrap it in a ScheduledChatCompletionClient so the load happens inside the
+    call's scheduler slot.
+    """
+
+    def __init__(self, client: ChatCompletionClient, residency: ModelResidency):
+        super().__init__(client)
+        self._residency = residency
+        self._model = model_name(client)
+
+    def _extra_create_args(self, kwargs: dict) -> dict:
+        return {"keep_alive": self._residency.keep_alive_for(self._model), **kwargs.get("extra_create_args", {})}
+
+    async def _ensure_loaded(self, kwargs: dict) -> None:
+        num_ctx = kwargs.get("extra_create_args", {}).get("options", {}).get("num_ctx")
+        await self._residency.ensure_loaded(self._model, num_ctx)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        if self._model is None:
+            return await super().create(messages, **kwargs)
+
+        await self._ensure_loaded(kwargs)
+        kwargs["extra_create_args"] = self._extra_create_args(kwargs)
+        return await super().create(messages, **kwargs)
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        if self._model is not None:
+            await self._ensure_loaded(kwargs)
+            kwargs["extra_create_args"] = self._extra_create_args(kwargs)
+
+        async for chunk in super().create_stream(messages, **kwargs):
+            yield chunk
+
+
+class SizedChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    Sends an agent role's Ollama options with every call: its sampling
+    options (ModelConfig.role_options) and, with a sizer, a context window
+    that fits the prompt and a cap on the reply length.
+
+    The options are merged into the caller's extra_create_args, so they
+    reach Ollama next to the keep_alive set by ResidentChatCompletionClient.
+    Wrap this client around the resident one so the model is loaded with
+    the chosen context.
+    """
+
+    def __init__(self, client: ChatCompletionClient, role: str, sizer: ContextSizer = None):
+        """
+        Args:
+            client (ChatCompletionClient): Client to send the options through
+            role (str): Agent role, a key of ModelConfig.role_options
+            sizer (ContextSizer): Picks num_ctx and num_predict; None keeps Ollama's defaults
+        """
+        super().__init__(client)
+        self._role = role
+        self._sizer = sizer
+        self._model = model_name(client)
+
+    def _size(self, messages: Sequence[LLMMessage], kwargs: dict) -> tuple:
+        chars = prompt_chars(messages, kwargs.get("tools", []))
+        extra_create_args = dict(kwargs.get("extra_create_args", {}))
+
+        options = dict(ModelConfig.role_options.get(self._role, {}))
+        if self._sizer is not None and self._model is not None:
+            options.update(self._sizer.options(self._model, self._role, chars))
+        # Options passed by the caller win over the role's
+        options.update(extra_create_args.get("options", {}))
+
+        extra_create_args["options"] = options
+        kwargs["extra_create_args"] = extra_create_args
+        return chars, options
+
+    def _finished(self, result: CreateResult, chars: int, options: dict) -> None:
+        if self._sizer is None or self._model is None:
+            return
+        # Ollama does not count the prompt prefix it took from its cache
+        record = current_call()
+        cached_chars = record["shared_chars"] if record is not None and "prompt_eval_count" in record else 0
+        self._sizer.observe(self._model, chars - cached_chars, result.usage.prompt_tokens)
+        if result.finish_reason == "length":
+            self._sizer.reply_capped(self._role, options.get("num_predict"))
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        chars, options = self._size(messages, kwargs)
+        result = await super().create(messages, **kwargs)
+        self._finished(result, chars, options)
+        return result
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        chars, options = self._size(messages, kwargs)
+        async for chunk in super().create_stream(messages, **kwargs):
+            if isinstance(chunk, CreateResult):
+                self._finished(chunk, chars, options)
+            yield chunk
+
+
+class PromptCacheChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    Sends an agent role's prompts in prefix-cache-friendly order (see
+    prompt_cache.assemble_prompt) and records how much of each prompt
+    Ollama served from its cache.
+
+    Wrap it around the sized client, so the sizer can discount the cached
+    prefix when it calibrates its token estimates.
+    """
+
+    def __init__(self, client: ChatCompletionClient, role: str, stats: PromptCacheStats = None):
+        """
+        Args:
+            client (ChatCompletionClient): Client to send the prompts through
+            role (str): Agent role the statistics are kept under
+            stats (PromptCacheStats): Receives every call; None records nothing
+        """
+        super().__init__(client)
+        self._role = role
+        self._stats = stats
+        self._model = model_name(client)
+
+    def _begin(self, messages: Sequence[LLMMessage], kwargs: dict) -> tuple:
+        if PromptCacheConfig.SHARED_PREFIX:
+            messages = assemble_prompt(messages)
+        record = None
+        if self._stats is not None and self._model is not None:
+            record = self._stats.begin(self._model, self._role, messages, kwargs.get("tools", []))
+        return messages, record
+
+    def _finished(self, record: dict | None) -> None:
+        if record is not None:
+            self._stats.finish(record)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        messages, record = self._begin(messages, kwargs)
+        with recording(record):
+            result = await super().create(messages, **kwargs)
+        self._finished(record)
+        return result
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        messages, record = self._begin(messages, kwargs)
+        with recording(record):
+            async for chunk in super().create_stream(messages, **kwargs):
+                yield chunk
+        self._finished(record)
@@ -0,0 +1,305 @@
+"""
+Shared memory-mapped paper store.
+Papers fetched from arXiv are written once, as columnar files (entry ids,
+field offsets and one UTF-8 text blob), and memory-mapped by every process
+that reads them, so worker processes share the OS page cache instead of
+each keeping its own copy of the search results. A search result is stored
+as the list of entry ids it returned: that id list is all a process needs
+to read the papers back.
+
+The store is a directory of immutable segments. A process writes a new
+segment for every search it runs and attaches the segments written by the
+others on its next lookup. Nothing is modified in place, so readers and
+writers need no locking; only merging the segments takes a lock file.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import PaperStoreConfig
+from dedup import normalize_entry_id
+
+# Text fields of a paper record, in the order their offsets are stored.
+# New fields go last: segments written before them store only a prefix.
+FIELDS = ("title", "authors", "published", "url", "abstract", "updated")
+
+KEY_DTYPE = np.dtype("S32")
+
+# Written last: a segment without it is not attached
+_RESULTS_SUFFIX = ".results.json"
+
+
+def entry_key(paper: dict) -> str:
+    """Versioned arXiv entry id of a paper record, its key in the store."""
+    arxiv_id, version = normalize_entry_id(paper["url"])
+    return f"{arxiv_id}v{version}" if version else arxiv_id
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased query with collapsed whitespace, so trivially different searches share a result."""
+    return " ".join(query.lower().split())
+
+
+class _Segment:
+    """The memory-mapped columns of one segment."""
+
+    def __init__(self, prefix: Path, count: int):
+        self.count = count
+        if count:
+            self.keys = np.load(f"{prefix}.keys.npy", mmap_mode="r")
+            self.offsets = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+            self.text = np.memmap(f"{prefix}.text.bin", dtype=np.uint8, mode="r")
+
+    def record(self, row: int) -> dict:
+        offsets = self.offsets[row].tolist()
+        data = self.text[offsets[0]:offsets[-1]].tobytes()
+        base = offsets[0]
+        # zip stops at the fields the segment was written with
+        return {
+            field: data[start - base:end - base].decode("utf-8")
+            for field, start, end in zip(FIELDS, offsets, offsets[1:])
+        }
+
+
+def _write_segment(directory: Path, name: str, papers: list, results: list) -> None:
+    """Write a segment's columns, then its results file, which makes it visible."""
+    prefix = directory / name
+    if papers:
+        blobs = [paper.get(field, "").encode("utf-8") for paper in papers for field in FIELDS]
+        ends = np.cumsum([len(blob) for blob in blobs], dtype=np.int64)
+        offsets = np.concatenate([[0], ends]).astype(np.int64)
+        # Row i's fields span offsets[i * len(FIELDS)] .. offsets[(i + 1) * len(FIELDS)]
+        rows = np.lib.stride_tricks.sliding_window_view(offsets, len(FIELDS) + 1)[::len(FIELDS)]
+
+        Path(f"{prefix}.text.bin").write_bytes(b"".join(blobs))
+        np.save(f"{prefix}.offsets.npy", np.ascontiguousarray(rows))
+        np.save(f"{prefix}.keys.npy", np.array([entry_key(paper).encode("utf-8") for paper in papers], dtype=KEY_DTYPE))
+
+    temporary = Path(f"{prefix}{_RESULTS_SUFFIX}.tmp")
+    temporary.write_text(json.dumps({"papers": len(papers), "results": results}), encoding="utf-8")
+    os.replace(temporary, f"{prefix}{_RESULTS_SUFFIX}")
+
+
+class PaperStore:
+    """
+    Process-wide view of the shared paper store.
+
+    Each process keeps only an index of entry ids to segment rows and of
+    queries to id lists; the paper text stays in the mapped files until a
+    record is read.
+    """
+
+    def __init__(
+        self,
+        directory: str = PaperStoreConfig.DIRECTORY,
+        ttl_seconds: float = PaperStoreConfig.RESULTS_TTL_SECONDS,
+        compact_after: int = PaperStoreConfig.COMPACT_AFTER_SEGMENTS,
+    ):
+        """
+        Args:
+            directory (str): Directory holding the segments
+            ttl_seconds (float): Age beyond which a stored search result is ignored
+            compact_after (int): Segment count that triggers a compaction
+        """
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.compact_after = compact_after
+
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._rows = {}
+        self._results = {}
+        self._written = 0
+        self._stats = {"hits": 0, "misses": 0, "stored_papers": 0, "compactions": 0}
+
+    def _refresh(self) -> None:
+        # Called with the lock held: attach segments written since the last call
+        try:
+            names = sorted(
+                path.name[:-len(_RESULTS_SUFFIX)]
+                for path in self.directory.iterdir()
+                if path.name.endswith(_RESULTS_SUFFIX)
+            )
+        except FileNotFoundError:
+            return
+
+        # A compaction removed segments this process attached: start over from the listing
+        if not set(self._segments) <= set(names):
+            self._segments, self._rows, self._results = {}, {}, {}
+
+        for name in names:
+            if name not in self._segments:
+                self._attach(name)
+
+    def _attach(self, name: str) -> None:
+        prefix = self.directory / name
+        try:
+            meta = json.loads(Path(f"{prefix}{_RESULTS_SUFFIX}").read_text(encoding="utf-8"))
+            segment = _Segment(prefix, meta["papers"])
+        except FileNotFoundError:
+            # Removed by a compaction since it was listed; the compacted segment has its papers
+            return
+
+        self._segments[name] = segment
+        for row, key in enumerate(segment.keys.tolist() if segment.count else []):
+            self._rows.setdefault(key.decode("utf-8"), (name, row))
+        for result in meta["results"]:
+            entries = self._results.setdefault(result["query"], {})
+            current = entries.get(result["max_results"])
+            if current is None or current["created"] < result["created"]:
+                entries[result["max_results"]] = result
+
+    def _fresh(self, result: dict) -> bool:
+        return time.time() - result["created"] < self.ttl_seconds
+
+    def get(self, keys: list) -> list:
+        """
+        Read papers by entry id.
+
+        Args:
+            keys (list): Entry ids (see entry_key)
+
+        Returns:
+            list: One record per id (None for unknown ids), without a result number
+        """
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            locations = [self._rows.get(key) for key in keys]
+            return [None if location is None else self._segments[location[0]].record(location[1]) for location in locations]
+
+    def search(self, query: str, max_results: int) -> list | None:
+        """
+        Look up a stored search result.
+
+        A result stored for more papers answers a smaller request with its
+        first papers, and one that exhausted arXiv's matches answers any
+        larger request.
+
+        Args:
+            query (str): arXiv search query
+            max_results (int): Number of papers requested
+
+        Returns:
+            list | None: Paper records numbered from 1, or None if no fresh result is stored
+        """
+        with self._lock:
+            self._refresh()
+            candidates = [
+                result for stored_max, result in self._results.get(normalize_query(query), {}).items()
+                if self._fresh(result) and (stored_max >= max_results or result["exhausted"])
+            ]
+            if not candidates:
+                self._stats["misses"] += 1
+                return None
+
+            result = max(candidates, key=lambda result: result["created"])
+            locations = [self._rows.get(key) for key in result["keys"][:max_results]]
+            if None in locations:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["hits"] += 1
+            papers = [self._segments[name].record(row) for name, row in locations]
+
+        return [dict(paper, id=number) for number, paper in enumerate(papers, start=1)]
+
+    def put(self, query: str, max_results: int, papers: list, exhausted: bool = False) -> None:
+        """
+        Store the papers a search returned, writing only the ones not stored yet.
+
+        Args:
+            query (str): arXiv search query
+            max_results (int): Number of papers requested
+            papers (list): Paper records in result order
+            exhausted (bool): arXiv had no further matches
+        """
+        keys = [entry_key(paper) for paper in papers]
+        result = {
+            "query": normalize_query(query),
+            "max_results": max_results,
+            "exhausted": exhausted,
+            "created": time.time(),
+            "keys": keys,
+        }
+
+        with self._lock:
+            self._refresh()
+            new = {}
+            for key, paper in zip(keys, papers):
+                if key not in self._rows:
+                    new.setdefault(key, paper)
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._written += 1
+            name = f"{time.time_ns()}-{os.getpid()}-{self._written}"
+            _write_segment(self.directory, name, list(new.values()), [result])
+            self._stats["stored_papers"] += len(new)
+            self._attach(name)
+
+            if len(self._segments) > self.compact_after:
+                self._compact()
+
+    def _compact(self) -> None:
+        # Called with the lock held. One process compacts at a time; the others
+        # keep reading the segments they mapped, which stay valid once unlinked
+        lock_path = self.directory / "compact.lock"
+        try:
+            lock = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # A lock left behind by a crashed process is removed after a while
+            try:
+                if time.time() - lock_path.stat().st_mtime > 600:
+                    lock_path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        os.close(lock)
+
+        try:
+            self._refresh()
+            results = [result for entries in self._results.values() for result in entries.values() if self._fresh(result)]
+            keys = list(dict.fromkeys(key for result in results for key in result["keys"] if key in self._rows))
+            papers = [self._segments[self._rows[key][0]].record(self._rows[key][1]) for key in keys]
+
+            old = list(self._segments)
+            self._written += 1
+            name = f"{time.time_ns()}-{os.getpid()}-{self._written}"
+            _write_segment(self.directory, name, papers, results)
+
+            # Results files first, so no process attaches a segment being removed
+            for segment in old:
+                for suffix in (_RESULTS_SUFFIX, ".keys.npy", ".offsets.npy", ".text.bin"):
+                    try:
+                        os.remove(self.directory / f"{segment}{suffix}")
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        # Still mapped by a process on a platform that forbids removing it
+                        break
+
+            self._refresh()
+            self._stats["compactions"] += 1
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate, papers written by this process and attached papers, results and segments."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                hit_rate=round(self._stats["hits"] / lookups, 3) if lookups else None,
+                papers=len(self._rows),
+                results=sum(len(entries) for entries in self._results.values()),
+                segments=len(self._segments),
+            )
+
+
+# Shared by every search in the process
+paper_store = PaperStore()
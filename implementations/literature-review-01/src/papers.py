@@ -0,0 +1,204 @@
+"""
+Paper records shared by the pipeline stages.
+The Reviewer only returns paper ids and scores; the full records are
+rehydrated locally from the Researcher's search results.
+"""
+
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+# Matches one "Paper N:" block produced by Search_arXiv
+_PAPER_BLOCK = re.compile(r"^Paper (\d+):\n((?:  .*\n?)+)", re.MULTILINE)
+_PAPER_FIELD = re.compile(r"^  (\w+): ?(.*)$", re.MULTILINE)
+
+
+class PaperScore(BaseModel):
+    """The Reviewer's verdict on one selected paper."""
+    id: int = Field(description="Number of the paper in the Researcher's search results")
+    score: Literal["High", "Medium", "Low"]
+    rationale: str = Field(description="One sentence on why the paper is relevant")
+
+
+class ReviewerSelection(BaseModel):
+    """Structured output of the Reviewer."""
+    rationale: str = Field(description="2-3 sentences explaining the selection as a whole")
+    selected: list[PaperScore]
+
+
+def format_papers(papers: list) -> str:
+    """
+    Render paper records as the text returned by the Search_arXiv tool.
+
+    Args:
+        papers (list): Paper records
+
+    Returns:
+        str: One "Paper N:" block per paper, readable by parse_papers
+    """
+    paper_details = []
+
+    for paper in papers:
+        paper_details.append(
+            f"Paper {paper['id']}:\n"
+            f"  Title: {paper['title']}\n"
+            f"  Authors: {paper['authors']}\n"
+            f"  Published: {paper['published']}\n"
+            f"  URL: {paper['url']}\n"
+            f"{_format_citation_features(paper)}"
+            f"  Abstract: {paper['abstract']}...\n"
+        )
+
+    return "\n".join(paper_details)
+
+
+def _format_citation_features(paper: dict) -> str:
+    """Citation index lines of a paper, empty if it was never ranked (see src/citation_index.py)."""
+    lines = ""
+    if "citations" in paper:
+        lines += (
+            f"  Citations: {paper['citations']} ({paper['citations_per_year']}/year, "
+            f"{paper['influential_citations']} influential)\n"
+        )
+        if paper.get("venue"):
+            lines += f"  Venue: {paper['venue']} (tier {paper['venue_tier']} of 3)\n"
+    if "prior_score" in paper:
+        lines += f"  Prior: {paper['prior_score']}\n"
+    return lines
+
+
+def contains_papers(text: str) -> bool:
+    """Whether a text holds "Paper N:" blocks produced by Search_arXiv."""
+    return _PAPER_BLOCK.search(text) is not None
+
+
+def parse_papers(search_results: str) -> list:
+    """
+    Parse the text returned by Search_arXiv back into paper records.
+
+    Args:
+        search_results (str): Output of the Search_arXiv tool
+
+    Returns:
+        list: One dict per paper with id, title, authors, published, url and abstract
+    """
+    papers = []
+
+    for match in _PAPER_BLOCK.finditer(search_results):
+        fields = {key.lower(): value.strip() for key, value in _PAPER_FIELD.findall(match.group(2))}
+        papers.append({
+            "id": int(match.group(1)),
+            "title": fields.get("title", ""),
+            "authors": fields.get("authors", ""),
+            "published": fields.get("published", ""),
+            "url": fields.get("url", ""),
+            "abstract": fields.get("abstract", "").removesuffix("..."),
+        })
+
+    return papers
+
+
+def rehydrate_selection(papers: list, selection: ReviewerSelection) -> list:
+    """
+    Attach the Reviewer's scores to the full paper records.
+
+    Ids that do not match a search result are dropped, as are repeated ids.
+
+    Args:
+        papers (list): Records returned by parse_papers
+        selection (ReviewerSelection): The Reviewer's structured output
+
+    Returns:
+        list: Selected paper records in the Reviewer's order
+    """
+    papers_by_id = {paper["id"]: paper for paper in papers}
+    selected = []
+    seen = set()
+
+    for choice in selection.selected:
+        paper = papers_by_id.get(choice.id)
+        if paper is None or choice.id in seen:
+            continue
+        seen.add(choice.id)
+        selected.append({**paper, "score": choice.score, "score_rationale": choice.rationale})
+
+    return selected
+
+
+def format_selection(selected: list, rationale: str) -> str:
+    """
+    Render the Reviewer's selection as markdown.
+
+    Args:
+        selected (list): Records returned by rehydrate_selection
+        rationale (str): The Reviewer's overall selection rationale
+
+    Returns:
+        str: Markdown with the rationale followed by the selected papers
+    """
+    lines = [f"**Selection Rationale**: {rationale.strip()}", "", "**Selected Papers**:"]
+
+    for paper in selected:
+        lines.extend([
+            "",
+            f"**Paper {paper['id']}**: {paper['title']}",
+            f"- **Authors**: {paper['authors']}",
+            f"- **Published Date**: {paper['published']}",
+            f"- **Summary**: {paper['abstract']}",
+            f"- **PDF URL**: [{paper['url']}]({paper['url']})",
+            f"- **Relevance Score**: {paper['score']} - {paper['score_rationale']}",
+        ])
+
+    return "\n".join(lines)
+
+
+def format_paper_context(papers: list) -> str:
+    """
+    Render the papers as compact model context.
+
+    Args:
+        papers (list): Paper records
+
+    Returns:
+        str: One block per paper with title, authors, date and abstract
+    """
+    blocks = []
+
+    for paper in papers:
+        blocks.append(
+            f"Paper {paper['id']}: {paper['title']}\n"
+            f"  Authors: {paper['authors']}\n"
+            f"  Published: {paper['published']}\n"
+            f"  Abstract: {paper['abstract']}"
+        )
+
+    return "\n\n".join(blocks)
+
+
+def render_paper_list(papers: list) -> str:
+    """
+    Render the "Reviewed Papers" section without involving the model.
+
+    Args:
+        papers (list): Paper records, optionally carrying the Reviewer's score
+
+    Returns:
+        str: Markdown list in the format the Writer prompt asks for
+    """
+    entries = []
+
+    for paper in papers:
+        lines = [
+            f"**Paper**: {paper['title']}",
+            f"- **Authors**: {paper['authors']}",
+            f"- **Published Date**: {paper['published']}",
+            f"- **Summary**: {paper['abstract']}",
+            f"- **PDF URL**: [{paper['url']}]({paper['url']})",
+        ]
+        if paper.get("score"):
+            lines.append(f"- **Relevance Score**: {paper['score']} - {paper['score_rationale']}")
+        entries.append("\n".join(lines))
+
+    return "\n\n".join(entries)
@@ -0,0 +1,134 @@
+"""
+Speculative arXiv search.
+The search is started from a heuristic reading of the task while the
+Researcher's first model turn is still running, and the Researcher's tool
+call is served from it when the queries match closely enough.
+"""
+
+import asyncio
+
+from autogen_core.tools import FunctionTool
+
+from config import PrefetchConfig
+from papers import format_papers
+from request_parsing import extract_paper_count, extract_search_intent, query_terms
+from tools import Search_arXiv, fetch_arxiv_papers, rank_papers, search_arxiv_text
+
+
+def query_similarity(first: str, second: str) -> float:
+    """
+    Word-level Jaccard similarity of two search queries.
+
+    Args:
+        first (str): A search query
+        second (str): Another search query
+
+    Returns:
+        float: Similarity between 0 and 1
+    """
+    first_terms, second_terms = query_terms(first), query_terms(second)
+    if not first_terms or not second_terms:
+        return 0.0
+    return len(first_terms & second_terms) / len(first_terms | second_terms)
+
+
+class SpeculativeSearch:
+    """
+    Per-team speculative search that backs the Researcher's Search_arXiv tool.
+
+    Call `start(task)` before the team runs; the Researcher's tool then
+    awaits the prefetched result instead of querying arXiv a second time.
+    """
+
+    def __init__(self):
+        self._query = None
+        self._max_results = 0
+        self._task = None
+
+        # Papers the user asked for, which bounds how far a search pulls
+        self._wanted = None
+
+        # Outcome of the most recent run: "hit", "miss" or "none"
+        self.last_outcome = "none"
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, task: str) -> None:
+        """
+        Start fetching the papers the Researcher is expected to ask for.
+
+        Args:
+            task (str): The user's research query
+        """
+        self.discard()
+        self._wanted = extract_paper_count(task)
+        if not PrefetchConfig.ENABLED:
+            return
+
+        intent = extract_search_intent(task)
+        if intent is None:
+            return
+
+        topic, count = intent
+        self._query = topic
+        self._max_results = count * PrefetchConfig.CANDIDATES_PER_PAPER
+        # Kept in search order: ranking a longer list is not a prefix of ranking a shorter one
+        self._task = asyncio.ensure_future(
+            asyncio.to_thread(fetch_arxiv_papers, self._query, self._max_results, False, count)
+        )
+
+    def discard(self) -> None:
+        """Drop the current speculative result, used or not."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._query = None
+        self._max_results = 0
+        self._wanted = None
+        self.last_outcome = "none"
+
+    def _matches(self, query: str, max_results: int) -> bool:
+        return (
+            self._task is not None
+            and max_results <= self._max_results
+            and query_similarity(query, self._query) >= PrefetchConfig.MIN_QUERY_SIMILARITY
+        )
+
+    async def search(self, query: str, max_results: int) -> str:
+        """Search arXiv, answering from the speculative result when it matches."""
+        if self._matches(query, max_results):
+            try:
+                papers = await self._task
+            except Exception:
+                # A failed prefetch must not fail the tool call, search for real
+                papers = None
+
+            if papers:
+                self.hits += 1
+                self.last_outcome = "hit"
+                # Search order is stable, so a shorter request is a prefix;
+                # it is ranked on its own, as a direct search would be
+                papers = await asyncio.to_thread(rank_papers, papers[:max_results])
+                return format_papers(papers)
+
+        self.misses += 1
+        self.last_outcome = "miss"
+        return await asyncio.to_thread(search_arxiv_text, query, max_results, self._wanted)
+
+    def as_tool(self) -> FunctionTool:
+        """
+        Expose the search as the Researcher's Search_arXiv tool.
+
+        Returns:
+            FunctionTool: Same name and description as the plain Search_arXiv tool
+        """
+        return FunctionTool(self.search, description=Search_arXiv.__doc__, name="Search_arXiv")
+
+    def stats(self) -> dict:
+        """Hit/miss counts across all runs of the team."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
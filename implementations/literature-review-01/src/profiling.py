@@ -0,0 +1,234 @@
+"""
+Per-run profiling.
+Wraps one ResearchTeam run in a sampling or deterministic profiler, writes a
+flamegraph-compatible profile and appends a top-N hotspot summary keyed by
+run id to ProfilerConfig.OUTPUT_DIR/summaries.jsonl.
+
+Both profilers see everything running on the event loop thread, so runs
+that overlap on the same loop (e.g. batch.py) show up in each other's
+profiles. Only one cProfile can be active in a process, so a run asking
+for a deterministic profile while another run holds it is sampled instead.
+Time spent waiting on Ollama or arXiv appears as the event loop's selector
+frame in sampling mode.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from config import ProfilerConfig
+
+logger = logging.getLogger(__name__)
+
+# Held by the run whose cProfile is active; Python allows one per process
+_deterministic_profiler = threading.Lock()
+
+
+class RunProfiler:
+    """
+    Profiler for a single run, started and stopped on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        run_id: str = None,
+        mode: str = ProfilerConfig.MODE,
+        output_dir: str = ProfilerConfig.OUTPUT_DIR,
+        top_n: int = ProfilerConfig.TOP_N,
+    ):
+        """
+        Args:
+            run_id (str): Key of the profile files and summary, generated if omitted
+            mode (str): One of ProfilerConfig.MODES
+            output_dir (str): Directory the profile and summaries are written to
+            top_n (int): Number of hotspots kept in the summary
+        """
+        if mode not in ProfilerConfig.MODES:
+            raise ValueError(f"Profiler mode must be one of {ProfilerConfig.MODES}. Found value: {mode}")
+
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n
+
+        self._profile = None
+        self._holds_cprofile = False
+        self._samples = Counter()
+        self._sampler = None
+        self._stop_sampling = threading.Event()
+        self._started_at = None
+        self.seconds = 0.0
+
+    def start(self) -> None:
+        """Start profiling the calling thread."""
+        self._started_at = time.perf_counter()
+
+        if self.mode == "deterministic":
+            if self._start_cprofile():
+                return
+            self.mode = "sampling"
+
+        self._sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(),),
+            name=f"profiler-{self.run_id}",
+            daemon=True,
+        )
+        self._sampler.start()
+
+    def _start_cprofile(self) -> bool:
+        """Enable cProfile unless another run (or tool) already profiles the process."""
+        if not _deterministic_profiler.acquire(blocking=False):
+            logger.warning("Run %s: another run holds the deterministic profiler, sampling instead", self.run_id)
+            return False
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as error:
+            # Python 3.12+ refuses a second profiler, e.g. a debugger or coverage
+            _deterministic_profiler.release()
+            logger.warning("Run %s: cProfile unavailable (%s), sampling instead", self.run_id, error)
+            return False
+
+        self._profile = profile
+        self._holds_cprofile = True
+        return True
+
+    def stop(self) -> None:
+        """Stop profiling. Safe to call more than once."""
+        if self._started_at is None:
+            return
+        self.seconds = time.perf_counter() - self._started_at
+        self._started_at = None
+
+        if self._profile is not None:
+            self._profile.disable()
+        if self._holds_cprofile:
+            self._holds_cprofile = False
+            _deterministic_profiler.release()
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+
+    def _sample(self, thread_id: int) -> None:
+        while not self._stop_sampling.wait(ProfilerConfig.SAMPLE_INTERVAL_SECONDS):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                # Folded stacks list the root first
+                self._samples[";".join(reversed(stack))] += 1
+
+    def _hotspots(self) -> list:
+        if self.mode == "deterministic":
+            stats = pstats.Stats(self._profile)
+            rows = [
+                {
+                    "function": f"{name} ({os.path.basename(filename)}:{line})",
+                    "calls": calls,
+                    "self_seconds": round(self_time, 4),
+                    "total_seconds": round(total_time, 4),
+                }
+                for (filename, line, name), (_, calls, self_time, total_time, _) in stats.stats.items()
+            ]
+        else:
+            self_samples = Counter()
+            total_samples = Counter()
+            for stack, count in self._samples.items():
+                frames = stack.split(";")
+                self_samples[frames[-1]] += count
+                # A recursive function counts once per sample
+                for function in set(frames):
+                    total_samples[function] += count
+
+            interval = ProfilerConfig.SAMPLE_INTERVAL_SECONDS
+            rows = [
+                {
+                    "function": function,
+                    "samples": total_samples[function],
+                    "self_seconds": round(self_samples[function] * interval, 4),
+                    "total_seconds": round(total_samples[function] * interval, 4),
+                }
+                for function in total_samples
+            ]
+
+        rows.sort(key=lambda row: row["self_seconds"], reverse=True)
+        return rows[:self.top_n]
+
+    def write(self, **extra) -> dict:
+        """
+        Write the profile and append the run's hotspot summary.
+
+        Args:
+            **extra: Additional fields stored with the summary (e.g. the task)
+
+        Returns:
+            dict: Run id, profile path and the top-N hotspots
+        """
+        self.stop()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.mode == "deterministic":
+            profile_path = self.output_dir / f"{self.run_id}.prof"
+            self._profile.dump_stats(profile_path)
+        else:
+            profile_path = self.output_dir / f"{self.run_id}.folded"
+            profile_path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in self._samples.items()),
+                encoding="utf-8",
+            )
+
+        summary = {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "seconds": round(self.seconds, 3),
+            "profile": str(profile_path),
+            **extra,
+            "hotspots": self._hotspots(),
+        }
+        with (self.output_dir / "summaries.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+        return summary
+
+
+async def profile_run(deltas, task: str, run_id: str = None):
+    """
+    Profile a run while passing its deltas through.
+
+    The profile summary is attached to the "done" delta's stats under "profile".
+
+    Args:
+        deltas: Async iterator of run deltas (see ResearchTeam.stream_chat)
+        task (str): The user's research query, stored with the summary
+        run_id (str): Key of the profile, generated if omitted
+
+    Yields:
+        dict: The run's deltas, unchanged apart from the "done" stats
+    """
+    profiler = RunProfiler(run_id)
+    profiler.start()
+    try:
+        async for delta in deltas:
+            if delta["event"] == "done":
+                summary = profiler.write(task=task)
+                delta["stats"]["profile"] = {
+                    "run_id": summary["run_id"],
+                    "profile": summary["profile"],
+                    "hotspots": summary["hotspots"][:5],
+                }
+            yield delta
+    finally:
+        profiler.stop()
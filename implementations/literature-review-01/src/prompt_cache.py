@@ -0,0 +1,235 @@
+"""
+Prefix-cache-friendly prompt assembly.
+Ollama keeps the KV cache of a model's previous prompt and only evaluates
+what follows the longest prefix the next prompt shares with it. The
+Reviewer and the Writer run on one model and both read the Researcher's
+paper block, but each prompt started with the role's own system prompt
+and the task, so the Writer's prompt left the cached Reviewer prompt at
+its first characters and the whole paper block was evaluated again.
+Prompts are assembled as a preamble shared by every role, the paper block,
+the role's instructions and then the conversation, and Ollama's response
+statistics are recorded per call to measure how much of each prompt was
+served from the cache.
+"""
+
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from autogen_core.models import SystemMessage, UserMessage
+
+from papers import contains_papers
+from prompts import ROLE_INSTRUCTIONS_HEADER, SEARCH_RESULTS_MOVED, SHARED_PREAMBLE
+
+# The call a response's statistics belong to, set by PromptCacheChatCompletionClient
+_current_call = contextvars.ContextVar("prompt_cache_call", default=None)
+
+
+def current_call() -> dict | None:
+    """Record of the model call running in this context, if any."""
+    return _current_call.get()
+
+
+@contextmanager
+def recording(record: dict | None):
+    """Make `record` the current call record, receiving Ollama's response statistics."""
+    token = _current_call.set(record)
+    try:
+        yield record
+    finally:
+        try:
+            _current_call.reset(token)
+        except ValueError:
+            # A stream closed from another context; that context never saw the record
+            pass
+
+
+def _is_paper_block(message) -> bool:
+    return (
+        isinstance(message, UserMessage) and message.source != "user"
+        and isinstance(message.content, str) and contains_papers(message.content)
+    )
+
+
+def assemble_prompt(messages: list) -> list:
+    """
+    Put a prompt's stable content first for prefix reuse.
+
+    A prompt that carries the Researcher's paper block becomes one system
+    message (SHARED_PREAMBLE, the paper block, the role's system prompt)
+    followed by the conversation in its original order. The paper
+    messages themselves are replaced by a short reference, so the papers
+    are sent once. Every role that reads the same search results sends the
+    same bytes up to its own instructions.
+
+    Args:
+        messages: LLM messages of a call
+
+    Returns:
+        list: The assembled messages; prompts without papers or a system prompt unchanged
+    """
+    system = [message for message in messages if isinstance(message, SystemMessage)]
+    papers = [message for message in messages if _is_paper_block(message)]
+    if not system or not papers:
+        return list(messages)
+
+    paper_block = "\n\n".join(message.content.strip() for message in papers)
+    instructions = "\n\n".join(message.content.strip() for message in system)
+    assembled = [SystemMessage(
+        content=f"{SHARED_PREAMBLE.strip()}\n\n{paper_block}\n\n{ROLE_INSTRUCTIONS_HEADER}\n\n{instructions}"
+    )]
+
+    moved = {id(message) for message in papers}
+    for message in messages:
+        if isinstance(message, SystemMessage):
+            continue
+        if id(message) in moved:
+            message = UserMessage(content=SEARCH_RESULTS_MOVED, source=message.source)
+        assembled.append(message)
+    return assembled
+
+
+def prompt_text(messages, tools=()) -> str:
+    """
+    Text a prefix comparison runs on: tool schemas, then message contents.
+
+    Has as many characters as context_sizing.prompt_chars counts.
+    """
+    parts = [json.dumps(getattr(tool, "schema", tool), default=str) for tool in tools]
+    for message in messages:
+        content = getattr(message, "content", "")
+        parts.append(content if isinstance(content, str) else str(content))
+    return "".join(parts)
+
+
+class PromptCacheStats:
+    """
+    Process-wide prompt cache statistics per agent role.
+
+    Ollama reports the prompt tokens it evaluated, not the ones it took from
+    the cache; the cached share is the estimated prompt size minus the
+    evaluated tokens. The prefix each prompt shares with the previous prompt
+    sent to the same model is what the cache could have served (with several
+    parallel Ollama slots, at best).
+    """
+
+    def __init__(self, sizer):
+        """
+        Args:
+            sizer (ContextSizer): Estimates a model's prompt tokens from characters
+        """
+        self._sizer = sizer
+        self._lock = threading.Lock()
+        self._previous = {}
+        self._roles = {}
+
+    def begin(self, model: str, role: str, messages, tools=()) -> dict:
+        """
+        Start the record of one call.
+
+        Args:
+            model (str): Model name
+            role (str): Agent role
+            messages: LLM messages of the call, in the order they are sent
+            tools: Tools offered to the model
+
+        Returns:
+            dict: Record with the prompt size and the prefix shared with the previous prompt
+        """
+        text = prompt_text(messages, tools)
+        with self._lock:
+            shared = len(os.path.commonprefix([self._previous.get(model, ""), text]))
+            self._previous[model] = text
+        return {"model": model, "role": role, "chars": len(text), "shared_chars": shared}
+
+    def finish(self, record: dict) -> None:
+        """Add a finished call to its role's statistics; calls without Ollama statistics are skipped."""
+        if "prompt_eval_count" not in record:
+            return
+
+        model = record["model"]
+        prompt_tokens = self._sizer.estimate_tokens(model, record["chars"])
+        evaluated = record["prompt_eval_count"]
+        with self._lock:
+            stats = self._roles.setdefault(record["role"], {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "evaluated_tokens": 0,
+                "cached_tokens": 0,
+                "shared_prefix_tokens": 0,
+                "prefill_seconds": 0.0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["evaluated_tokens"] += evaluated
+            stats["cached_tokens"] += max(0, prompt_tokens - evaluated)
+            stats["shared_prefix_tokens"] += self._sizer.estimate_tokens(model, record["shared_chars"]) if record["shared_chars"] else 0
+            stats["prefill_seconds"] += record["prompt_eval_seconds"]
+
+    def stats(self) -> dict:
+        """Per role: calls, estimated, evaluated, cached and shared-prefix prompt tokens, cache hit rate and prefill time."""
+        with self._lock:
+            return {
+                role: dict(
+                    stats,
+                    prefill_seconds=round(stats["prefill_seconds"], 3),
+                    cache_hit_rate=round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else None,
+                    prefill_ms_per_token=(
+                        round(1000 * stats["prefill_seconds"] / stats["evaluated_tokens"], 3)
+                        if stats["evaluated_tokens"] else None
+                    ),
+                )
+                for role, stats in self._roles.items()
+            }
+
+
+def _record_response(response) -> None:
+    record = _current_call.get()
+    if record is None or (response.prompt_eval_count is None and response.eval_count is None):
+        return
+    # A prompt served entirely from the cache may come without a count
+    record["prompt_eval_count"] = response.prompt_eval_count or 0
+    record["prompt_eval_seconds"] = (response.prompt_eval_duration or 0) / 1e9
+    record["load_seconds"] = (response.load_duration or 0) / 1e9
+
+
+class OllamaStatsClient:
+    """
+    Stand-in for the ollama.AsyncClient inside an OllamaChatCompletionClient
+    that hands the final response's statistics to the current call record.
+
+    autogen's client keeps only the token counts of a response, not the
+    prompt evaluation time.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    async def chat(self, *args, **kwargs):
+        response = await self._client.chat(*args, **kwargs)
+        if kwargs.get("stream"):
+            return self._watch(response)
+        _record_response(response)
+        return response
+
+    async def _watch(self, stream):
+        async for chunk in stream:
+            if chunk.done:
+                _record_response(chunk)
+            yield chunk
+
+
+def record_ollama_stats(client) -> None:
+    """
+    Make an OllamaChatCompletionClient report response statistics to the call records.
+
+    Clients that are not backed by an ollama.AsyncClient are left untouched.
+    """
+    inner = getattr(client, "_client", None)
+    if inner is not None and hasattr(inner, "chat") and not isinstance(inner, OllamaStatsClient):
+        client._client = OllamaStatsClient(inner)
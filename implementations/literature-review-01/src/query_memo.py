@@ -0,0 +1,126 @@
+"""
+Memo of the Researcher's query formulation.
+Maps a normalized user task to the Search_arXiv arguments the Researcher
+chose for it, so repeated tasks skip the Researcher's model turn entirely.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from config import QueryMemoConfig
+from file_lock import file_lock
+from prompts import RESEARCHER_PROMPT
+
+# Changing the Researcher's prompt can change the query it formulates,
+# so every key is scoped to the prompt it was recorded with
+PROMPT_VERSION = hashlib.sha256(RESEARCHER_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+def normalize_task(task: str) -> str:
+    """
+    Normalize a task so trivially different phrasings share a memo entry.
+
+    Args:
+        task (str): The user's research query
+
+    Returns:
+        str: Lowercased task with collapsed whitespace and no edge punctuation
+    """
+    task = " ".join(task.lower().split())
+    return re.sub(r"^[\W_]+|[\W_]+$", "", task)
+
+
+class QueryMemo:
+    """
+    Persistent (normalized task -> tool-call arguments) memo.
+
+    Shared by every team in the process; the file is loaded lazily and
+    rewritten atomically on every update, merged with the entries other
+    processes wrote since.
+    """
+
+    def __init__(self, path: str = QueryMemoConfig.PATH, max_entries: int = QueryMemoConfig.MAX_ENTRIES):
+        """
+        Args:
+            path (str): JSON file backing the memo
+            max_entries (int): Maximum number of remembered tasks
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, task: str) -> str:
+        return f"{PROMPT_VERSION}:{normalize_task(task)}"
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def get(self, task: str):
+        """
+        Look up the tool-call arguments recorded for a task.
+
+        Args:
+            task (str): The user's research query
+
+        Returns:
+            dict | None: Search_arXiv arguments, or None on a miss
+        """
+        with self._lock:
+            arguments = self._load().get(self._key(task))
+            if arguments is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return arguments
+
+    def put(self, task: str, arguments: dict) -> None:
+        """
+        Record the tool-call arguments the Researcher chose for a task.
+
+        Args:
+            task (str): The user's research query
+            arguments (dict): Search_arXiv arguments (query, max_results)
+        """
+        key = self._key(task)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.path.with_suffix(".lock")):
+            # Start from the file, which holds the entries of every process
+            entries = self._read()
+
+            # Re-insert so the entry counts as the newest one
+            entries.pop(key, None)
+            entries[key] = arguments
+            while len(entries) > self.max_entries:
+                entries.pop(next(iter(entries)))
+
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entries), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._entries = entries
+
+    def stats(self) -> dict:
+        """Hit/miss counts since the process started."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries or {}),
+            }
@@ -0,0 +1,98 @@
+"""
+Heuristic parsing of the user's research request.
+Used for pipeline decisions that should not cost a model call.
+"""
+
+import re
+
+# Default number of papers when the user does not give one (see RESEARCHER_PROMPT)
+DEFAULT_PAPER_COUNT = 3
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+_NUMBER = r"(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+
+# "3 papers", "five recent papers", "3 most relevant articles"
+_COUNT_BEFORE_NOUN = re.compile(
+    _NUMBER + r"\s+(?:[a-z-]+\s+){0,3}?(?:papers?|articles?|studies|works|publications?)\b",
+    re.IGNORECASE,
+)
+# "papers about X, 4 results"
+_COUNT_RESULTS = re.compile(_NUMBER + r"\s+results?\b", re.IGNORECASE)
+
+
+# "Find 3 papers on X", "Search for 5 recent papers about X", "Look up papers about X, 4 results"
+_TOPIC = re.compile(
+    r"(?:papers?|articles?|studies|works|publications?)\s+"
+    r"(?:on|about|regarding|related to|concerning|covering|in)\s+(?P<topic>.+)$",
+    re.IGNORECASE,
+)
+_TRAILING_COUNT = re.compile(r"[,;]?\s*" + _NUMBER + r"\s+(?:results?|papers?)\s*$", re.IGNORECASE)
+
+_STOPWORDS = {"a", "an", "and", "the", "of", "on", "in", "for", "to", "with", "about", "recent", "papers", "paper"}
+
+
+def _to_int(token: str) -> int:
+    return int(token) if token.isdigit() else _NUMBER_WORDS[token.lower()]
+
+
+def extract_paper_count(task: str, default: int = DEFAULT_PAPER_COUNT) -> int:
+    """
+    Extract the number of papers the user asked for.
+
+    Args:
+        task (str): The user's research query
+        default (int): Count used when the query does not name one
+
+    Returns:
+        int: Requested number of papers
+    """
+    for pattern in (_COUNT_BEFORE_NOUN, _COUNT_RESULTS):
+        match = pattern.search(task)
+        if match:
+            count = _to_int(match.group(1))
+            if count > 0:
+                return count
+    return default
+
+
+def extract_search_intent(task: str):
+    """
+    Guess the arXiv search the Researcher is about to make.
+
+    Args:
+        task (str): The user's research query
+
+    Returns:
+        tuple | None: (topic, requested paper count), or None if no topic is recognised
+    """
+    match = _TOPIC.search(task.strip())
+    if not match:
+        return None
+
+    topic = _TRAILING_COUNT.sub("", match.group("topic"))
+    topic = topic.strip().strip(".!?").strip().strip("'\"").strip()
+    if not topic:
+        return None
+
+    return topic, extract_paper_count(task)
+
+
+def query_terms(text: str) -> set:
+    """
+    Normalized content words of a search query or any other text.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        set: Lowercased words without stopwords, plurals folded
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    # Crude plural folding so "architectures" matches "architecture"
+    return {
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words if word not in _STOPWORDS
+    }
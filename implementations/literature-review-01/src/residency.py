@@ -0,0 +1,159 @@
+"""
+Model residency in Ollama.
+Tracks which models Ollama holds in memory, loads a model explicitly before
+a call that needs it and keeps every model loaded for its own keep_alive.
+Explicit loads make swaps visible: load/unload counts and load times are
+reported by `stats()`.
+"""
+
+import logging
+import threading
+import time
+
+from ollama import AsyncClient
+
+from config import ModelConfig, ResidencyConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(model: str) -> str:
+    # Ollama reports untagged models with their implicit tag
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelResidency:
+    """
+    Process-wide view of the models loaded in one Ollama instance.
+
+    Loads go through the LLMScheduler slot of the call that needs the model,
+    so a load never competes with a running generation. What Ollama holds is
+    cached for `state_ttl` seconds, so calls to a resident model cost no
+    round trip.
+    """
+
+    def __init__(self, host: str = ModelConfig.OLLAMA_HOST, state_ttl: float = ResidencyConfig.STATE_TTL_SECONDS):
+        """
+        Args:
+            host (str): Ollama server address
+            state_ttl (float): Seconds the list of resident models is trusted
+        """
+        self.host = host
+        self.state_ttl = state_ttl
+
+        self._lock = threading.Lock()
+        # Canonical model name -> context length it is loaded with
+        self._resident = {}
+        # monotonic time of the last refresh; None before the first one
+        self._refreshed_at = None
+        self._preloaded = False
+        self._models = {}
+
+    def keep_alive_for(self, model: str) -> str:
+        """Keep-alive duration Ollama should use for a model."""
+        return ResidencyConfig.KEEP_ALIVE.get(model, ResidencyConfig.DEFAULT_KEEP_ALIVE)
+
+    def _model_stats(self, model: str) -> dict:
+        # Called with the lock held
+        return self._models.setdefault(model, {
+            "loads": 0,
+            "unloads": 0,
+            "load_seconds": 0.0,
+            "last_load_seconds": None,
+        })
+
+    async def refresh(self) -> dict:
+        """
+        Ask Ollama which models are loaded and count the ones it unloaded.
+
+        Returns:
+            dict: Context length of each resident model, by canonical name
+        """
+        client = AsyncClient(host=self.host)
+        try:
+            response = await client.ps()
+        finally:
+            await client.close()
+
+        resident = {_canonical(m.model or m.name): m.context_length for m in response.models}
+        with self._lock:
+            for model in self._resident.keys() - resident.keys():
+                self._model_stats(model)["unloads"] += 1
+            self._resident = resident
+            self._refreshed_at = time.monotonic()
+        return resident
+
+    def _is_resident(self, model: str, num_ctx: int = None) -> bool:
+        """Whether the cached state, if still fresh, has the model loaded with the context."""
+        with self._lock:
+            if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.state_ttl:
+                return False
+            return model in self._resident and (num_ctx is None or self._resident[model] in (None, num_ctx))
+
+    async def ensure_loaded(self, model: str, num_ctx: int = None) -> None:
+        """
+        Load a model unless Ollama already holds it.
+
+        Args:
+            model (str): Ollama model name
+            num_ctx (int): Context the call needs; a model loaded with another
+                context is reloaded by Ollama, so that load is made explicit too
+        """
+        model = _canonical(model)
+        if self._is_resident(model, num_ctx):
+            return
+
+        try:
+            await self.refresh()
+            if self._is_resident(model, num_ctx):
+                return
+
+            started_at = time.perf_counter()
+            client = AsyncClient(host=self.host)
+            try:
+                # A request without a prompt only loads the model
+                await client.generate(
+                    model=model,
+                    keep_alive=self.keep_alive_for(model),
+                    options={"num_ctx": num_ctx} if num_ctx else None,
+                )
+            finally:
+                await client.close()
+        except Exception as e:
+            # The call itself reports a broken Ollama; residency is best effort
+            logger.warning("Model residency check for %s failed: %s: %s", model, type(e).__name__, e)
+            return
+
+        seconds = time.perf_counter() - started_at
+        with self._lock:
+            stats = self._model_stats(model)
+            stats["loads"] += 1
+            stats["load_seconds"] += seconds
+            stats["last_load_seconds"] = round(seconds, 3)
+            self._resident[model] = num_ctx
+
+    async def preload(self, models=ResidencyConfig.PRELOAD_MODELS) -> None:
+        """
+        Load the configured models once per process, in order.
+
+        Args:
+            models: Model names; on memory-limited hosts the last one stays loaded
+        """
+        with self._lock:
+            if self._preloaded or not ResidencyConfig.ENABLED:
+                return
+            self._preloaded = True
+
+        for model in models:
+            await self.ensure_loaded(model)
+
+    def stats(self) -> dict:
+        """Resident models with their context length and per-model load/unload counts and load time (seconds)."""
+        with self._lock:
+            return {
+                "resident": dict(sorted(self._resident.items())),
+                "models": {
+                    model: dict(stats, load_seconds=round(stats["load_seconds"], 3))
+                    for model, stats in self._models.items()
+                },
+            }
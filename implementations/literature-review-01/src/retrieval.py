@@ -0,0 +1,205 @@
+"""
+Progressive arXiv retrieval.
+A search used to pull a fixed number of results whatever the topic, so
+broad topics were over-fetched and niche ones ran short of good matches.
+Instead a small first page is fetched and scored lexically against the
+query, and further pages are fetched only until the papers the user asked
+for, plus a margin, are highly relevant. A query whose first page scores
+poorly is broadened.
+"""
+
+import math
+import re
+import threading
+
+from config import ArxivConfig, PrefetchConfig, RetrievalConfig
+from dedup import normalize_entry_id
+from request_parsing import query_terms
+
+# Filters on fields that do not describe the topic (authors, categories,
+# identifiers, comments), with their values: "cat:cs.LG", 'au:"Smith, J"'
+_FILTERS = re.compile(r'\b(?:au|cat|co|jr|rn|id):(?:"[^"]*"|\([^)]*\)|[^\s()]+)')
+
+# A filter with the operator that applies it, when that excludes its matches
+_FILTER_CLAUSES = re.compile(r"(\bANDNOT\s+)?(" + _FILTERS.pattern + ")")
+
+# Topic field prefixes and boolean operators are query syntax, not topic words
+_QUERY_SYNTAX = re.compile(r"\b(?:ti|abs|all):|\b(?:AND|OR|ANDNOT)\b")
+
+
+def _topic_text(query: str) -> str:
+    return _QUERY_SYNTAX.sub(" ", _FILTERS.sub(" ", query))
+
+# Share of the score that comes from the title alone
+_TITLE_WEIGHT = 0.3
+
+
+def topic_terms(query: str) -> set:
+    """Content words of an arXiv query, without its filters, field prefixes and operators."""
+    return query_terms(_topic_text(query))
+
+
+def relevance_score(terms: set, paper: dict) -> float:
+    """
+    Lexical relevance of a paper to a query.
+
+    Args:
+        terms (set): topic_terms of the query
+        paper (dict): Paper record
+
+    Returns:
+        float: Share of the query terms found in the title and abstract,
+            with a bonus for the ones in the title, between 0 and 1
+    """
+    if not terms:
+        return 1.0
+    title = query_terms(paper["title"])
+    text = title | query_terms(paper["abstract"])
+    return (1 - _TITLE_WEIGHT) * len(terms & text) / len(terms) + _TITLE_WEIGHT * len(terms & title) / len(terms)
+
+
+def broaden_query(query: str) -> str | None:
+    """
+    Broader form of a query: its content words joined with OR, still
+    restricted by its filters (categories, authors, ...).
+
+    Args:
+        query (str): arXiv search query
+
+    Returns:
+        str | None: Broadened query, or None if it has fewer than two content words
+    """
+    terms = topic_terms(query)
+    words = []
+    for word in re.findall(r"[a-z0-9]+", _topic_text(query).lower()):
+        if word not in words and query_terms(word) & terms:
+            words.append(word)
+    if len(words) < 2:
+        return None
+
+    filters = [f"{'ANDNOT' if negated else 'AND'} {clause}" for negated, clause in _FILTER_CLAUSES.findall(query)]
+    if not filters:
+        return " OR ".join(words)
+    return " ".join([f"({' OR '.join(words)})", *filters])
+
+
+class RetrievalStats:
+    """Process-wide counts of requested, pulled and returned candidates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"searches": 0, "requested": 0, "pulled": 0, "returned": 0, "broadened": 0}
+
+    def record(self, requested: int, pulled: int, returned: int, broadened: bool) -> None:
+        with self._lock:
+            self._stats["searches"] += 1
+            self._stats["requested"] += requested
+            self._stats["pulled"] += pulled
+            self._stats["returned"] += returned
+            self._stats["broadened"] += int(broadened)
+
+    def stats(self) -> dict:
+        """Searches, candidates requested (max_results), pulled and returned, broadened queries."""
+        with self._lock:
+            searches = self._stats["searches"]
+            return dict(
+                self._stats,
+                pulled_per_search=round(self._stats["pulled"] / searches, 1) if searches else None,
+            )
+
+
+# Shared by every search in the process
+retrieval_stats = RetrievalStats()
+
+
+class _Candidates:
+    """Scored candidates in the order they were fetched, one per arXiv entry."""
+
+    def __init__(self, terms: set):
+        self.terms = terms
+        self.scored = []
+        self.high = 0
+        self._seen = set()
+
+    def add(self, papers: list) -> int:
+        """Score a page; returns its number of highly relevant papers."""
+        high = 0
+        for paper in papers:
+            entry_id = normalize_entry_id(paper["url"])[0]
+            if entry_id in self._seen:
+                continue
+            self._seen.add(entry_id)
+            score = relevance_score(self.terms, paper)
+            self.scored.append((score, paper))
+            high += score >= RetrievalConfig.HIGH_RELEVANCE
+        self.high += high
+        return high
+
+    def select(self, count: int) -> list:
+        """Highly relevant candidates in search order, then the best of the others by score."""
+        high = [paper for score, paper in self.scored if score >= RetrievalConfig.HIGH_RELEVANCE]
+        others = sorted(
+            (pair for pair in self.scored if pair[0] < RetrievalConfig.HIGH_RELEVANCE),
+            key=lambda pair: -pair[0],
+        )
+        selected = (high + [paper for _, paper in others])[:count]
+        return [dict(paper, id=number) for number, paper in enumerate(selected, start=1)]
+
+
+def progressive_search(query: str, max_results: int, fetch, wanted: int = None) -> list:
+    """
+    Search arXiv page by page until enough relevant candidates are found.
+
+    The Researcher asks for several candidates per paper the user wants.
+    Pages are fetched only until `wanted` plus RetrievalConfig.MARGIN
+    candidates score as highly relevant, arXiv runs out of results or
+    max_results have been pulled, so a clear topic pulls far fewer
+    abstracts than max_results. The highly relevant candidates come first,
+    in arXiv's order; the best-scoring others fill up the rest.
+
+    Args:
+        query (str): arXiv search query
+        max_results (int): Number of candidates asked for, the most pulled
+        fetch: Page iterator with the signature of tools.iter_arxiv_papers
+        wanted (int): Number of papers the user asked for; without it,
+            max_results over PrefetchConfig.CANDIDATES_PER_PAPER
+
+    Returns:
+        list: At most max_results paper records, numbered from 1
+    """
+    if wanted is None:
+        wanted = math.ceil(max_results / PrefetchConfig.CANDIDATES_PER_PAPER)
+    limit = min(ArxivConfig.MAX_RESULTS, max_results)
+    target = min(limit, wanted + RetrievalConfig.MARGIN)
+    candidates = _Candidates(topic_terms(query))
+
+    first_size = min(RetrievalConfig.FIRST_PAGE_SIZE, target)
+    page = list(fetch(query, first_size, page_size=first_size))
+    pulled = offset = len(page)
+    exhausted = len(page) < first_size
+    high = candidates.add(page)
+
+    # A poor first page means the query is too narrow or phrased unlike the papers
+    broadened = False
+    if high < RetrievalConfig.BROADEN_BELOW * max(1, len(page)):
+        broader = broaden_query(query)
+        if broader is not None and pulled < limit:
+            query, broadened = broader, True
+            size = min(first_size, limit - pulled)
+            page = list(fetch(query, size, page_size=size))
+            pulled += len(page)
+            offset = len(page)
+            exhausted = len(page) < size
+            candidates.add(page)
+
+    while candidates.high < target and not exhausted and pulled < limit:
+        size = min(RetrievalConfig.PAGE_SIZE, limit - pulled)
+        page = list(fetch(query, offset + size, page_size=size, start=offset))
+        pulled += len(page)
+        offset += len(page)
+        exhausted = len(page) < size
+        candidates.add(page)
+
+    selected = candidates.select(max_results)
+    retrieval_stats.record(max_results, pulled, len(selected), broadened)
+    return selected
@@ -0,0 +1,191 @@
+"""
+Priority scheduling of LLM calls.
+Interactive (Streamlit) calls are served before background (batch) calls,
+while aging makes sure queued background work is never starved. Within a
+class, calls for the model that was used last go first, so queued calls
+from concurrent sessions are batched by model instead of swapping models
+in Ollama on every turn.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from config import SchedulerConfig
+
+
+class Priority(IntEnum):
+    """Priority classes for model calls (lower value is served first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class _Waiter:
+    """A queued call waiting for a free slot."""
+
+    def __init__(self, priority: Priority, loop: asyncio.AbstractEventLoop, model: str | None):
+        self.priority = priority
+        self.model = model
+        self.loop = loop
+        self.future = loop.create_future()
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+    def effective_priority(self, now: float, aging_seconds: float) -> float:
+        # Every `aging_seconds` spent in the queue promotes the call by one class
+        return self.priority - (now - self.enqueued_at) / aging_seconds
+
+
+class LLMScheduler:
+    """
+    Admits model calls to a fixed number of slots in priority order.
+
+    The scheduler is shared by every team in the process. Streamlit runs each
+    session on its own thread and event loop, so the queue is guarded by a
+    thread lock and waiters are woken on the loop they are waiting on.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = SchedulerConfig.MAX_CONCURRENT_CALLS,
+        aging_seconds: float = SchedulerConfig.AGING_SECONDS,
+    ):
+        """
+        Args:
+            max_concurrent (int): Number of calls allowed to run at once
+            aging_seconds (float): Queue time that promotes a call by one class
+        """
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be at least 1. Found value: {max_concurrent}")
+
+        self.max_concurrent = max_concurrent
+        self.aging_seconds = aging_seconds
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting: list[_Waiter] = []
+        self._wait_times = {
+            priority: deque(maxlen=SchedulerConfig.WAIT_STATS_WINDOW)
+            for priority in Priority
+        }
+
+        # Model of the most recently admitted call and how often it changed
+        self._last_model = None
+        self._model_switches = 0
+
+    async def acquire(self, priority: Priority, model: str | None = None) -> None:
+        """
+        Wait until a slot is granted to a call of the given priority.
+
+        Args:
+            priority (Priority): Scheduling class of the call
+            model (str | None): Model the call runs on, used to batch calls by model
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            # Fast path: free slot and nobody queued ahead of us
+            if self._running < self.max_concurrent and not self._waiting:
+                self._running += 1
+                self._wait_times[priority].append(0.0)
+                self._admit_model(model)
+                return
+
+            waiter = _Waiter(priority, loop, model)
+            self._waiting.append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiting.remove(waiter)
+            # The slot was handed over just before cancellation, pass it on
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot and hand it to the most urgent queued call."""
+        with self._lock:
+            self._running -= 1
+            if not self._waiting:
+                return
+
+            now = time.monotonic()
+            waiter = min(self._waiting, key=lambda w: (self._rank(w, now), w.enqueued_at))
+            self._waiting.remove(waiter)
+            waiter.granted = True
+            self._running += 1
+            self._wait_times[waiter.priority].append(now - waiter.enqueued_at)
+            self._admit_model(waiter.model)
+
+        waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _rank(self, waiter: _Waiter, now: float) -> float:
+        # Called with the lock held
+        rank = waiter.effective_priority(now, self.aging_seconds)
+        if waiter.model and self._last_model and waiter.model != self._last_model:
+            rank += SchedulerConfig.MODEL_SWITCH_PENALTY
+        return rank
+
+    def _admit_model(self, model: str | None) -> None:
+        # Called with the lock held
+        if model is None:
+            return
+        if self._last_model is not None and model != self._last_model:
+            self._model_switches += 1
+        self._last_model = model
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, model: str | None = None):
+        """Hold a slot for the duration of the `async with` block."""
+        await self.acquire(priority, model)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        """
+        Report queue state and wait-time statistics per priority class.
+
+        Returns:
+            dict: Running/queued counts, model switches and wait percentiles (seconds) per class
+        """
+        with self._lock:
+            report = {
+                "running": self._running,
+                "queued": len(self._waiting),
+                "last_model": self._last_model,
+                "model_switches": self._model_switches,
+                "classes": {},
+            }
+            for priority, waits in self._wait_times.items():
+                samples = sorted(waits)
+                report["classes"][priority.name.lower()] = {
+                    "calls": len(samples),
+                    "queued": sum(1 for w in self._waiting if w.priority == priority),
+                    "mean_wait": sum(samples) / len(samples) if samples else 0.0,
+                    "p50_wait": _percentile(samples, 50),
+                    "p95_wait": _percentile(samples, 95),
+                    "max_wait": samples[-1] if samples else 0.0,
+                }
+        return report
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _percentile(samples: list, percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(percent / 100 * len(samples)) - 1))
+    return samples[rank]
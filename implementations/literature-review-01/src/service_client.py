@@ -0,0 +1,95 @@
+"""
+Client for the standalone review service (service.py).
+Uses only the standard library so the Streamlit app needs no extra
+dependency to run as a thin client.
+"""
+
+import json
+import urllib.request
+
+from config import SessionConfig
+
+
+def _request(url: str, body: dict = None, method: str = "GET", timeout: float = 30.0) -> dict:
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def submit_review(base_url: str, query: str, session: str = None, carry_over: str = SessionConfig.CARRY_OVER) -> str:
+    """
+    Queue a literature review on the service.
+
+    Args:
+        base_url (str): Service address, e.g. http://127.0.0.1:8765
+        query (str): The user's research query
+        session (str): Optional session id; a session's jobs share one team and its carry-over
+        carry_over (str): One of SessionConfig.CARRY_OVER_MODES
+
+    Returns:
+        str: Job id
+    """
+    body = {"query": query, "session": session, "carry_over": carry_over}
+    return _request(f"{base_url}/reviews", body, method="POST")["id"]
+
+
+def get_review(base_url: str, job_id: str) -> dict:
+    """
+    Fetch a job's status, and its review once finished.
+
+    Args:
+        base_url (str): Service address
+        job_id (str): Job id returned by submit_review
+
+    Returns:
+        dict: Job status
+    """
+    return _request(f"{base_url}/reviews/{job_id}")
+
+
+def cancel_review(base_url: str, job_id: str) -> dict:
+    """
+    Cancel a queued or running job.
+
+    Args:
+        base_url (str): Service address
+        job_id (str): Job id returned by submit_review
+
+    Returns:
+        dict: Job id and status at the time of the request
+    """
+    return _request(f"{base_url}/reviews/{job_id}/cancel", {}, method="POST")
+
+
+def stream_review(base_url: str, job_id: str, last_event_id: int = None, timeout: float = 60.0):
+    """
+    Follow a job's deltas as they arrive.
+
+    Args:
+        base_url (str): Service address
+        job_id (str): Job id returned by submit_review
+        last_event_id (int): Resume after this event instead of from the start
+        timeout (float): Seconds without any data (including keepalives) before giving up
+
+    Yields:
+        dict: Deltas in the format of ResearchTeam.stream_chat, ending with
+            "done", "cancelled" or "error"
+    """
+    headers = {"Accept": "text/event-stream"}
+    if last_event_id is not None:
+        headers["Last-Event-ID"] = str(last_event_id)
+
+    request = urllib.request.Request(f"{base_url}/reviews/{job_id}/events", headers=headers)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        data = []
+        for raw_line in response:
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+
+            # A blank line ends an event; comment lines are keepalives
+            if not line:
+                if data:
+                    yield json.loads("\n".join(data))
+                    data = []
+            elif line.startswith("data:"):
+                data.append(line[5:].lstrip())
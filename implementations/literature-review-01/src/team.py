@@ -3,9 +3,54 @@ Team coordination and workflow management.
 Defines how agents work together to complete the literature review task.
 """
 
-from autogen_agentchat.teams import RoundRobinGroupChat
-from agents import create_researcher_agent, create_reviewer_agent, create_writer_agent
-from config import AgentConfig
+import asyncio
+import json
+import time
+import uuid
+
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.conditions import (
+    FunctionalTermination,
+    TextMentionTermination,
+    TimeoutTermination,
+    TokenUsageTermination,
+)
+from autogen_agentchat.messages import BaseChatMessage, StructuredMessage, TextMessage, ToolCallSummaryMessage
+from autogen_agentchat.teams import SelectorGroupChat
+from autogen_core import CancellationToken, FunctionCall
+from autogen_core.models import FunctionExecutionResult
+from agents import (
+    create_researcher_agent,
+    create_reviewer_agent,
+    create_section_writer,
+    create_selector_client,
+    create_writer_agent,
+    context_sizer,
+    model_residency,
+    prompt_cache_stats,
+)
+from config import (
+    AgentConfig,
+    DistributedConfig,
+    EventLogConfig,
+    ProfilerConfig,
+    QueryMemoConfig,
+    RunBudgetConfig,
+    SessionConfig,
+)
+from scheduler import Priority
+from event_log import EventLog, record_run
+from paper_store import paper_store
+from prefetch import SpeculativeSearch
+from profiling import profile_run
+from query_memo import QueryMemo
+from papers import ReviewerSelection, format_selection, parse_papers, rehydrate_selection
+from request_parsing import DEFAULT_PAPER_COUNT, extract_paper_count
+from retrieval import retrieval_stats
+
+# Shared by every team in the process
+query_memo = QueryMemo()
+event_log = EventLog()
 
 
 class ResearchTeam:
@@ -16,21 +61,114 @@ class ResearchTeam:
     1. Researcher finds relevant papers
     2. Reviewer validates the selection
     3. Writer creates the literature review
+    
+    With AgentConfig.WRITER_MODE set to "sections" the group chat stops after
+    the Reviewer and a SectionWriter writes the review section by section.
+    
+    Every run is bounded by RunBudgetConfig (wall-clock time, tokens, turns).
+    The Reviewer is skipped when the search returned no more papers than the
+    user asked for, since there is nothing to select.
+    
+    The arXiv search the Researcher is expected to make is started
+    speculatively at the beginning of each run, overlapping the network
+    round trip with the Researcher's first model turn. Tasks seen before
+    skip the Researcher's model turn entirely: the remembered Search_arXiv
+    call is replayed from the query memo.
+    
+    Each query starts from an empty group chat history, so prompts do not
+    grow as a session ages. Optionally a compact carry-over (the previously
+    selected papers or a short summary) is prepended to the next query,
+    bounded by SessionConfig.MAX_CARRY_OVER_TOKENS.
+    
+    In distributed mode the agents run in role workers (see
+    src/distributed_runtime.py) and only the group chat manager runs here.
     """
     
-    def __init__(self):
-        """Initialize the research team with all necessary agents."""
+    def __init__(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        carry_over: str = SessionConfig.CARRY_OVER,
+        max_carry_over_tokens: int = SessionConfig.MAX_CARRY_OVER_TOKENS,
+        distributed: bool = DistributedConfig.ENABLED,
+    ):
+        """
+        Initialize the research team with all necessary agents.
+        
+        Args:
+            priority (Priority): Scheduling class for the team's model calls.
+                Use Priority.BACKGROUND for batch jobs so interactive users
+                are served first.
+            carry_over (str): What earlier queries pass on to the next one,
+                one of SessionConfig.CARRY_OVER_MODES
+            max_carry_over_tokens (int): Cap on the carried-over context
+            distributed (bool): Run the agents in the role workers of the
+                distributed runtime. Their model calls are scheduled by the
+                workers, at interactive priority.
+        """
+        self.priority = priority
+        self.distributed = distributed
+        self.carry_over = carry_over
+        self.max_carry_over_tokens = max_carry_over_tokens
+        
+        # Compact context of earlier queries, oldest first
+        self._session_context = []
+        
+        self.speculative_search = SpeculativeSearch()
+        
         # Create specialized agents
-        self.researcher = create_researcher_agent()
-        self.reviewer = create_reviewer_agent()
-        self.writer = create_writer_agent()
-        
-        # Create the team with round-robin coordination
-        # Each agent speaks once in sequence
-        self.team = RoundRobinGroupChat(
-            participants=[self.researcher, self.reviewer, self.writer],
-            max_turns=AgentConfig.MAX_TURNS_SEQUENTIAL
+        self.researcher = create_researcher_agent(priority, self.speculative_search.as_tool())
+        self.reviewer = create_reviewer_agent(priority)
+        
+        if AgentConfig.WRITER_MODE == "sections":
+            self.writer = None
+            self.section_writer = create_section_writer(priority)
+            participants = [self.researcher, self.reviewer]
+        else:
+            self.writer = create_writer_agent(priority)
+            self.section_writer = None
+            participants = [self.researcher, self.reviewer, self.writer]
+        
+        # Number of papers the user asked for in the current run
+        self._requested_papers = DEFAULT_PAPER_COUNT
+        
+        # Set by the termination checks once the pipeline's last step is done
+        self._pipeline_finished = False
+        self.termination = self._build_termination()
+        
+        # Each agent speaks at most once, in pipeline order. Speakers are
+        # chosen by _select_next_speaker, so no model call is spent on it.
+        team_options = dict(
+            model_client=create_selector_client(priority),
+            selector_func=self._select_next_speaker,
+            termination_condition=self.termination,
+            # The Reviewer's structured selection must be registered with the team
+            custom_message_types=[StructuredMessage[ReviewerSelection]],
+            max_turns=min(AgentConfig.MAX_TURNS_SEQUENTIAL, len(participants))
         )
+        if distributed:
+            # grpcio is only needed in distributed mode
+            from distributed_runtime import DistributedSelectorGroupChat, coordinator
+            self.team = DistributedSelectorGroupChat(participants, coordinator=coordinator, **team_options)
+        else:
+            self.team = SelectorGroupChat(participants=participants, **team_options)
+        
+        # Timing and token statistics of the most recent run_chat call
+        self.last_run_stats = {}
+        
+        # Paper records found and selected during the most recent run
+        self.last_papers = []
+        self.last_selection = []
+        
+        # Arguments of the Researcher's first Search_arXiv call in the current run
+        self._formulated_query = None
+        
+        # Profile the next runs (see src/profiling.py); the summary lands in
+        # last_run_stats["profile"]
+        self.profile = False
+        
+        # Cancels the run in progress, see cancel()
+        self._cancellation_token = None
+        self._cancel_requested = False
     
     async def run_chat(self, task: str) -> str:
         """
@@ -42,7 +180,58 @@ class ResearchTeam:
         Returns:
             str: Formatted conversation log showing the team's work
         """
-        stream = self.team.run_stream(task=task)
+        async for delta in self.stream_chat(task):
+            if delta["event"] == "done":
+                review = delta["content"]
+        return review
+    
+    def stream_chat(self, task: str):
+        """
+        Execute a literature review task, yielding the conversation as it grows.
+        
+        Deltas are plain dicts so they can be serialized as they are:
+        - {"event": "entry", "index", "source", "type", ...}: a new log entry
+          (the same fields as the conversation log, see _format_conversation)
+        - {"event": "chunk", "index", "content"}: text appended to entry `index`
+        - {"event": "done", "content", "stats"}: the formatted conversation and
+          last_run_stats; always the final delta
+        
+        The run is profiled when self.profile or ProfilerConfig.ENABLED is set;
+        otherwise no profiling code runs at all. With EventLogConfig.ENABLED
+        the deltas are also appended to the event log for replay.
+        
+        Args:
+            task (str): The user's research query
+            
+        Returns:
+            AsyncIterator[dict]: Conversation deltas
+        """
+        # Keys the run in last_run_stats, the profiler and the event log
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        
+        deltas = self._stream_chat(task, run_id)
+        if self.profile or ProfilerConfig.ENABLED:
+            deltas = profile_run(deltas, task, run_id)
+        if EventLogConfig.ENABLED:
+            deltas = record_run(deltas, event_log, task, run_id)
+        return deltas
+    
+    async def _stream_chat(self, task: str, run_id: str):
+        """Run the team for one task, see stream_chat."""
+        started_at = time.perf_counter()
+        self._requested_papers = extract_paper_count(task)
+        
+        # Created before the first await so cancel() works from the start
+        cancellation_token = CancellationToken()
+        self._cancellation_token = cancellation_token
+        self._cancel_requested = False
+        
+        # Every query starts from an empty history; only the bounded
+        # carry-over below is passed on from earlier queries
+        await self.team.reset()
+        
+        # The timeout counts from reset, not from when the team was created
+        await self.termination.reset()
         
         # Build a structured conversation log
         conversation_flow = [{
@@ -51,51 +240,498 @@ class ResearchTeam:
             "type": "text"
         }]
         
-        # Process the event stream
-        async for event in stream:
-            event_type = getattr(event, 'type', '')
-            source = getattr(event, 'source', 'system')
-            
-            # Handle tool call requests
-            if event_type == 'ToolCallRequestEvent':
-                tool_calls = getattr(event, 'content', [])
-                for call in tool_calls:
-                    conversation_flow.append({
-                        "source": source,
-                        "type": "tool_request",
-                        "tool_name": call.name,
-                        "arguments": call.arguments
-                    })
-            
-            # Handle tool execution results
-            elif event_type == 'ToolCallExecutionEvent':
+        # Length of each entry's content already handed out as deltas
+        sent_lengths = []
+        
+        # Per-agent timing: a turn ends with the agent's last event
+        agent_stats = {}
+        
+        self.last_papers = []
+        self.last_selection = []
+        self._formulated_query = None
+        
+        stop_reason = None
+        stopped_early = False
+        self._pipeline_finished = False
+        memo_outcome = "off"
+        hard_stop = None
+        
+        try:
+            # Remote Researchers search on their own, so nothing would use the prefetch
+            if not self.distributed:
+                self.speculative_search.start(task)
+            
+            # Hard stop for a model call still running past the wall-clock budget
+            hard_stop = asyncio.get_running_loop().call_later(
+                RunBudgetConfig.MAX_SECONDS + RunBudgetConfig.HARD_STOP_GRACE_SECONDS,
+                cancellation_token.cancel,
+            )
+            
+            task_messages, memo_outcome = await self._start_messages(task, conversation_flow)
+            stream = self.team.run_stream(
+                task=task_messages,
+                cancellation_token=cancellation_token,
+                output_task_messages=False
+            )
+            
+            # Process the event stream
+            for delta in self._flow_deltas(conversation_flow, sent_lengths):
+                yield delta
+            
+            async for event in stream:
+                if isinstance(event, TaskResult):
+                    stop_reason = event.stop_reason
+                    stopped_early = self._stopped_early(stop_reason)
+                    continue
+                
+                self._process_event(event, conversation_flow, agent_stats)
+                for delta in self._flow_deltas(conversation_flow, sent_lengths):
+                    yield delta
+        except asyncio.CancelledError:
+            # Only swallow our own hard stop or cancel(), not cancellation from the caller
+            if not cancellation_token.is_cancelled():
+                raise
+            if self._cancel_requested:
+                stop_reason = "Cancelled by request"
+            else:
+                stop_reason = f"Hard stop after {RunBudgetConfig.MAX_SECONDS} second budget"
+                stopped_early = True
+            await self.team.reset()
+        finally:
+            if hard_stop is not None:
+                hard_stop.cancel()
+            self._cancellation_token = None
+            prefetch_outcome = self.speculative_search.last_outcome
+            self.speculative_search.discard()
+        
+        if self._cancel_requested:
+            conversation_flow.append({
+                "source": "system",
+                "content": "🛑 Run cancelled",
+                "type": "text"
+            })
+        elif stopped_early:
+            conversation_flow.append({
+                "source": "system",
+                "content": f"⏱️ Run stopped early: {stop_reason}",
+                "type": "text"
+            })
+        elif self.section_writer is not None:
+            conversation_flow.append(await self._write_sections(task, agent_stats))
+        
+        for delta in self._flow_deltas(conversation_flow, sent_lengths):
+            yield delta
+        
+        self.last_run_stats = self._summarize_run(started_at, agent_stats)
+        self.last_run_stats["run_id"] = run_id
+        self.last_run_stats["stop_reason"] = stop_reason
+        self.last_run_stats["prefetch"] = prefetch_outcome
+        self.last_run_stats["query_memo"] = memo_outcome
+        self.last_run_stats["residency"] = model_residency.stats()
+        self.last_run_stats["context"] = context_sizer.stats()
+        self.last_run_stats["prompt_cache"] = prompt_cache_stats.stats()
+        self.last_run_stats["paper_store"] = paper_store.stats()
+        self.last_run_stats["retrieval"] = retrieval_stats.stats()
+        
+        self._remember_query(task, conversation_flow)
+        
+        # Remember how the Researcher turned this task into a successful search
+        if memo_outcome == "miss" and self._formulated_query and self.last_papers:
+            query_memo.put(task, self._formulated_query)
+        
+        # Format the conversation for display
+        yield {
+            "event": "done",
+            "content": self._format_conversation(conversation_flow),
+            "stats": self.last_run_stats,
+        }
+    
+    async def close(self) -> None:
+        """
+        Release what the team holds outside this object.
+        
+        In distributed mode the role workers drop the team's agents and
+        subscriptions, which they would otherwise keep for the worker's
+        lifetime. The team cannot run afterwards.
+        """
+        if self.distributed:
+            await self.team.leave()
+    
+    def cancel(self) -> None:
+        """Cancel the run in progress, if any. The run still ends with a "done" delta."""
+        if self._cancellation_token is not None:
+            self._cancel_requested = True
+            self._cancellation_token.cancel()
+    
+    def _flow_deltas(self, conversation_flow: list, sent_lengths: list) -> list:
+        """
+        Compute the deltas for everything added to the conversation log since the last call.
+        
+        Args:
+            conversation_flow (list): Conversation log
+            sent_lengths (list): Content length already sent per entry, updated in place
+            
+        Returns:
+            list: "entry" and "chunk" deltas in log order
+        """
+        deltas = []
+        
+        # Streaming chunks only ever extend existing text entries
+        for index, sent in enumerate(sent_lengths):
+            content = conversation_flow[index].get("content", "")
+            if len(content) > sent:
+                deltas.append({"event": "chunk", "index": index, "content": content[sent:]})
+                sent_lengths[index] = len(content)
+        
+        for index in range(len(sent_lengths), len(conversation_flow)):
+            deltas.append({"event": "entry", "index": index, **conversation_flow[index]})
+            sent_lengths.append(len(conversation_flow[index].get("content", "")))
+        
+        return deltas
+    
+    async def _start_messages(self, task: str, conversation_flow: list):
+        """
+        Build the messages the team starts from.
+        
+        On a query memo hit the remembered Search_arXiv call is executed here
+        and handed to the team as the Researcher's turn, so the Researcher's
+        model call is skipped.
+        
+        Args:
+            task (str): The user's research query
+            conversation_flow (list): Conversation log, updated in place
+            
+        Returns:
+            tuple: (start messages, memo outcome "hit", "miss" or "off")
+        """
+        user_message = TextMessage(content=self._with_session_context(task), source="user")
+        if not QueryMemoConfig.ENABLED:
+            return [user_message], "off"
+        
+        arguments = query_memo.get(task)
+        if arguments is None:
+            return [user_message], "miss"
+        
+        try:
+            result = await self.speculative_search.search(**arguments)
+        except Exception:
+            # Let the Researcher formulate a new query instead
+            return [user_message], "miss"
+        
+        call = FunctionCall(id="query-memo", name="Search_arXiv", arguments=json.dumps(arguments))
+        conversation_flow.append({
+            "source": AgentConfig.RESEARCHER_NAME,
+            "type": "tool_request",
+            "tool_name": call.name,
+            "arguments": call.arguments
+        })
+        conversation_flow.append({
+            "source": AgentConfig.RESEARCHER_NAME,
+            "type": "tool_execution"
+        })
+        self.last_papers = parse_papers(result)
+        
+        researcher_turn = ToolCallSummaryMessage(
+            source=AgentConfig.RESEARCHER_NAME,
+            content=result,
+            tool_calls=[call],
+            results=[FunctionExecutionResult(call_id=call.id, name=call.name, content=result, is_error=False)],
+        )
+        return [user_message, researcher_turn], "hit"
+    
+    def _with_session_context(self, task: str) -> str:
+        """
+        Prepend the carried-over context of earlier queries to the task.
+        
+        Args:
+            task (str): The user's research query
+            
+        Returns:
+            str: Task text handed to the team
+        """
+        if self.carry_over == "none" or not self._session_context:
+            return task
+        
+        context = "\n\n".join(self._session_context)
+        return f"Context from earlier in this session:\n{context}\n\nNew request: {task}"
+    
+    def _remember_query(self, task: str, conversation_flow: list) -> None:
+        """
+        Keep a compact record of this query for the next ones, within the token cap.
+        
+        Args:
+            task (str): The user's research query
+            conversation_flow (list): Conversation log of the finished run
+        """
+        if self.carry_over == "none":
+            self._session_context = []
+            return
+        
+        papers = self.last_selection or self.last_papers
+        titles = "\n".join(f"- {paper['title']} ({paper['url']})" for paper in papers)
+        entry = f"Previously selected papers for \"{task}\":\n{titles}" if titles else ""
+        
+        if self.carry_over == "summary":
+            review = next(
+                (
+                    item["content"] for item in reversed(conversation_flow)
+                    if item["type"] == "text" and item["source"] == AgentConfig.WRITER_NAME
+                ),
+                "",
+            ).strip()[:SessionConfig.SUMMARY_REVIEW_CHARS]
+            entry = f"Previous request: {task}\n{entry}\nOpening of the previous review:\n{review}"
+        
+        if entry:
+            self._session_context.append(entry.strip())
+        
+        # Drop the oldest context first until the session fits its cap
+        max_chars = self.max_carry_over_tokens * 4
+        while self._session_context and sum(len(c) for c in self._session_context) > max_chars:
+            if len(self._session_context) == 1:
+                self._session_context[0] = self._session_context[0][:max_chars]
+                break
+            self._session_context.pop(0)
+    
+    def _build_termination(self):
+        """
+        Build the budget and short-circuit conditions shared by every run.
+        
+        Returns:
+            TerminationCondition: Stops on time, token or end-marker conditions,
+                or once the last agent of the pipeline has answered
+        """
+        termination = (
+            TimeoutTermination(RunBudgetConfig.MAX_SECONDS)
+            | TokenUsageTermination(max_total_token=RunBudgetConfig.MAX_TOTAL_TOKENS)
+            | TextMentionTermination(RunBudgetConfig.WRITER_END_MARKER, sources=[AgentConfig.WRITER_NAME])
+        )
+        
+        # The last agent's message ends the pipeline: the Writer's even without
+        # the end marker, which small models often leave out, and the Reviewer's
+        # without a Writer in the chat. Neither is asked a second time, also when
+        # a query memo hit replayed the Researcher's turn and left a turn over.
+        termination = termination | FunctionalTermination(self._pipeline_done)
+        
+        # Without a Writer in the chat, skipping the Reviewer means stopping
+        if self.writer is None and RunBudgetConfig.SKIP_REVIEWER_WHEN_FEW_CANDIDATES:
+            termination = termination | FunctionalTermination(self._nothing_to_review)
+        
+        return termination
+    
+    def _select_next_speaker(self, thread) -> str | None:
+        """
+        Pick the next speaker deterministically: Researcher, Reviewer, Writer.
+        
+        The Reviewer is skipped when there is nothing to select from.
+        
+        Args:
+            thread: Messages and events of the current run so far
+            
+        Returns:
+            str | None: Name of the next speaker
+        """
+        participant_names = {AgentConfig.RESEARCHER_NAME, AgentConfig.REVIEWER_NAME, AgentConfig.WRITER_NAME}
+        last_speaker = next(
+            (
+                message.source for message in reversed(thread)
+                if isinstance(message, BaseChatMessage) and message.source in participant_names
+            ),
+            None,
+        )
+        
+        if last_speaker is None:
+            return AgentConfig.RESEARCHER_NAME
+        
+        if last_speaker == AgentConfig.RESEARCHER_NAME:
+            if self.writer is not None and self._has_few_candidates(thread):
+                return AgentConfig.WRITER_NAME
+            return AgentConfig.REVIEWER_NAME
+        
+        return AgentConfig.WRITER_NAME if self.writer is not None else AgentConfig.REVIEWER_NAME
+    
+    def _pipeline_done(self, messages) -> bool:
+        """Check whether a batch of messages holds the answer of the pipeline's last agent."""
+        last_agent = AgentConfig.WRITER_NAME if self.writer is not None else AgentConfig.REVIEWER_NAME
+        done = any(
+            isinstance(message, BaseChatMessage) and message.source == last_agent
+            for message in messages
+        )
+        self._pipeline_finished |= done
+        return done
+    
+    def _nothing_to_review(self, messages) -> bool:
+        """Termination check of a Writer-less chat: the search left nothing to select."""
+        done = self._has_few_candidates(messages)
+        self._pipeline_finished |= done
+        return done
+    
+    def _stopped_early(self, stop_reason: str | None) -> bool:
+        """
+        Check whether a termination other than the pipeline's own ended the run.
+        
+        All conditions are checked on every message, so a run whose last
+        message also crossed the time or token budget still counts as
+        finished. The Writer's end marker comes with its message, which
+        _pipeline_done also sees.
+        """
+        return stop_reason is not None and not self._pipeline_finished
+    
+    def _has_few_candidates(self, messages) -> bool:
+        """
+        Check whether the Researcher's latest search returned no more papers than requested.
+        
+        Args:
+            messages: Messages to inspect (the full thread or a new batch)
+            
+        Returns:
+            bool: True if reviewing the candidates would be pointless
+        """
+        if not RunBudgetConfig.SKIP_REVIEWER_WHEN_FEW_CANDIDATES:
+            return False
+        
+        for message in reversed(messages):
+            if isinstance(message, BaseChatMessage) and message.source == AgentConfig.RESEARCHER_NAME:
+                found = len(parse_papers(message.to_model_text()))
+                return 0 < found <= self._requested_papers
+        return False
+    
+    
+    def _process_event(self, event, conversation_flow: list, agent_stats: dict) -> None:
+        """
+        Fold one stream event into the conversation log and run statistics.
+        
+        Args:
+            event: Event or message yielded by the team stream
+            conversation_flow (list): Conversation log, updated in place
+            agent_stats (dict): Per-agent statistics, updated in place
+        """
+        event_type = getattr(event, 'type', '')
+        source = getattr(event, 'source', 'system')
+        
+        if event_type and source != "user":
+            stats = agent_stats.setdefault(source, {
+                "seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            })
+            stats["ended_at"] = time.perf_counter()
+            usage = getattr(event, 'models_usage', None)
+            if usage is not None:
+                stats["prompt_tokens"] += usage.prompt_tokens
+                stats["completion_tokens"] += usage.completion_tokens
+        
+        # Handle tool call requests
+        if event_type == 'ToolCallRequestEvent':
+            tool_calls = getattr(event, 'content', [])
+            for call in tool_calls:
+                if (source == AgentConfig.RESEARCHER_NAME and call.name == "Search_arXiv"
+                        and self._formulated_query is None):
+                    try:
+                        self._formulated_query = json.loads(call.arguments)
+                    except json.JSONDecodeError:
+                        pass
                 conversation_flow.append({
                     "source": source,
-                    "type": "tool_execution"
+                    "type": "tool_request",
+                    "tool_name": call.name,
+                    "arguments": call.arguments
                 })
+        
+        # Handle tool execution results
+        elif event_type == 'ToolCallExecutionEvent':
+            for result in getattr(event, 'content', []):
+                papers = [] if result.is_error else parse_papers(result.content)
+                # Paper numbers restart with every search, keep the latest one
+                if papers:
+                    self.last_papers = papers
+            conversation_flow.append({
+                "source": source,
+                "type": "tool_execution"
+            })
+        
+        # Handle the Reviewer's structured selection: rehydrate the
+        # full paper records locally instead of having the model write them
+        elif isinstance(event, StructuredMessage):
+            self.last_selection = rehydrate_selection(self.last_papers, event.content)
+            conversation_flow.append({
+                "source": source,
+                "content": format_selection(self.last_selection, event.content.rationale),
+                "type": "text"
+            })
+        
+        # Handle streaming text chunks
+        elif event_type == 'ModelClientStreamingChunkEvent':
+            content_chunk = getattr(event, 'content', '')
             
-            # Handle streaming text chunks
-            elif event_type == 'ModelClientStreamingChunkEvent':
-                content_chunk = getattr(event, 'content', '')
-                
-                # Find existing text entry for this source or create new one
-                found = False
-                for i in range(len(conversation_flow) - 1, -1, -1):
-                    if (conversation_flow[i].get("source") == source and 
-                        conversation_flow[i].get("type") == "text"):
-                        conversation_flow[i]["content"] += content_chunk
-                        found = True
-                        break
-                
-                if not found:
-                    conversation_flow.append({
-                        "source": source,
-                        "content": content_chunk,
-                        "type": "text"
-                    })
+            # Find existing text entry for this source or create new one
+            found = False
+            for i in range(len(conversation_flow) - 1, -1, -1):
+                if (conversation_flow[i].get("source") == source and 
+                    conversation_flow[i].get("type") == "text"):
+                    conversation_flow[i]["content"] += content_chunk
+                    found = True
+                    break
+            
+            if not found:
+                conversation_flow.append({
+                    "source": source,
+                    "content": content_chunk,
+                    "type": "text"
+                })
+    
+    async def _write_sections(self, task: str, agent_stats: dict) -> dict:
+        """
+        Write the review with the SectionWriter from the selected papers.
         
-        # Format the conversation for display
-        return self._format_conversation(conversation_flow)
+        Args:
+            task (str): The user's research query
+            agent_stats (dict): Per-agent statistics, updated with the Writer's
+            
+        Returns:
+            dict: Conversation entry holding the Writer's review
+        """
+        # Fall back to every search result if the Reviewer's selection is unavailable
+        papers = self.last_selection or self.last_papers
+        if not papers:
+            review = "No papers were found to review."
+        else:
+            review = await self.section_writer.write(task, papers)
+        
+        agent_stats[AgentConfig.WRITER_NAME] = {
+            "seconds": 0.0,
+            **self.section_writer.last_usage,
+            "ended_at": time.perf_counter(),
+        }
+        
+        return {
+            "source": AgentConfig.WRITER_NAME,
+            "content": review,
+            "type": "text"
+        }
+    
+    def _summarize_run(self, started_at: float, agent_stats: dict) -> dict:
+        """
+        Turn raw per-agent timestamps into turn durations.
+        
+        Args:
+            started_at (float): perf_counter value when the run started
+            agent_stats (dict): Per-source token counts and last event time
+            
+        Returns:
+            dict: Total elapsed seconds, tokens and per-agent breakdown
+        """
+        previous_end = started_at
+        for stats in sorted(agent_stats.values(), key=lambda s: s["ended_at"]):
+            ended_at = stats.pop("ended_at")
+            stats["seconds"] = round(ended_at - previous_end, 3)
+            previous_end = ended_at
+        
+        return {
+            "elapsed_seconds": round(time.perf_counter() - started_at, 3),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in agent_stats.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in agent_stats.values()),
+            "agents": agent_stats,
+        }
     
     def _format_conversation(self, conversation_flow: list) -> str:
         """
@@ -114,7 +750,9 @@ class ResearchTeam:
             source = item["source"]
             
             if item_type == "text":
-                content = item.get("content", "").strip()
+                content = item.get("content", "").replace(
+                    f"--- {RunBudgetConfig.WRITER_END_MARKER} ---", ""
+                ).strip()
                 if content:
                     formatted_log.append(f"**{source.title()}**:\n\n{content}")
             
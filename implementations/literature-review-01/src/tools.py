@@ -1,59 +1,272 @@
+import logging
+import math
 import subprocess
-import sys 
+import sys
+import threading
+import time
 
+from citation_index import CitationIndex
+from config import ArxivConfig, CitationIndexConfig, DedupConfig, PaperStoreConfig, RetrievalConfig
+from dedup import collapse_near_duplicates
+from paper_store import paper_store
+from papers import format_papers
+from retrieval import progressive_search
 
-def Search_arXiv(query: str, max_results: int)-> str: 
+logger = logging.getLogger(__name__)
+
+
+# Memory-mapped lazily, shared by every search in the process
+citation_index = CitationIndex()
+
+
+def Search_arXiv(query: str, max_results: int)-> str:
     """
-    Get arxiv papers metadata    
-    :param query: the topic related to the papers retrieved 
+    Get arxiv papers metadata
+    :param query: the topic related to the papers retrieved
     :param max_results: The number of required papers
     :returns: The found papers related to the query in strig format
     """
-    # Ensure that the arxiv library is imported 
+    return search_arxiv_text(query, max_results)
+
+
+def search_arxiv_text(query: str, max_results: int, wanted: int = None) -> str:
+    """
+    Search_arXiv for a caller that knows how many papers the user asked for
+    :param query: the topic related to the papers retrieved
+    :param max_results: The number of required papers
+    :param wanted: The number of papers the user asked for, see retrieval.progressive_search
+    :returns: The found papers related to the query in strig format
+    """
+    papers = []
+    size = 0
+
+    # Stop pulling pages as soon as the next paper would break the output cap
+    for paper in _iter_search(query, max_results, wanted=wanted):
+        block_size = len(format_papers([paper]).encode("utf-8")) + 1
+        if papers and (
+            size + block_size > ArxivConfig.MAX_RESULT_BYTES
+            or (size + block_size) // 4 > ArxivConfig.MAX_RESULT_TOKENS
+        ):
+            break
+        papers.append(paper)
+        size += block_size
+
+    if not papers:
+        raise ValueError("No papers found related to the search query")
+
+    return format_papers(papers)
+
+
+def fetch_arxiv_papers(query: str, max_results: int, ranked: bool = True, wanted: int = None) -> list:
+    """
+    Get arxiv papers as records
+    :param query: the topic related to the papers retrieved
+    :param max_results: The number of required papers
+    :param ranked: Order by citation prior; otherwise the records stay in search order
+        and any prefix of them can be ranked with rank_papers
+    :param wanted: The number of papers the user asked for, see retrieval.progressive_search
+    :returns: One dict per paper with id, title, authors, published, url and abstract
+    """
+    papers = list(_iter_search(query, max_results, ranked, wanted))
+
+    if not papers:
+        raise ValueError("No papers found related to the search query")
+
+    return papers
+
+
+def rank_papers(papers: list) -> list:
+    """
+    Order search results by citation prior, if the citation index is available
+    :param papers: Paper records in search order
+    :returns: The records, ranked and renumbered, or unchanged without an index
+    """
+    if CitationIndexConfig.ENABLED and citation_index.available():
+        return citation_index.rank(papers)
+    return papers
+
+
+def _iter_search(query: str, max_results: int, ranked: bool = True, wanted: int = None):
+    dedup = DedupConfig.ENABLED
+    rank = ranked and CitationIndexConfig.ENABLED and citation_index.available()
+    valid = isinstance(query, str) and query and isinstance(max_results, int) and max_results >= 1
+    store = PaperStoreConfig.ENABLED and valid
+
+    # Searches already run by any process are read from the shared store.
+    # Papers are stored before ranking, so the current index is applied.
+    if store:
+        papers = paper_store.search(query, max_results)
+        if papers is not None:
+            return iter(rank_papers(papers) if rank else papers)
+
+    if RetrievalConfig.PROGRESSIVE and valid:
+        # Pages are pulled only until enough relevant candidates are found;
+        # a later search for more papers may still find others
+        papers = progressive_search(query, max_results, iter_arxiv_papers, wanted)
+        exhausted = False
+
+    # Without deduplication or ranking pages are still pulled lazily
+    elif not (dedup or rank) or not valid:
+        papers = iter_arxiv_papers(query, max_results)
+        return _stored(query, max_results, papers) if store else papers
+
+    else:
+        # Over-fetch so that collapsing versions and variants still leaves max_results papers
+        fetch = max_results + math.ceil(max_results * DedupConfig.OVERFETCH_RATIO) if dedup else max_results
+        papers = list(iter_arxiv_papers(query, fetch))
+        exhausted = len(papers) < min(fetch, ArxivConfig.MAX_RESULTS)
+
+    if dedup:
+        papers = collapse_near_duplicates(papers)
+    papers = papers[:max_results]
+
+    if store and papers:
+        paper_store.put(query, max_results, papers, exhausted)
+    if rank:
+        papers = rank_papers(papers)
+    return iter(papers)
+
+
+def _stored(query: str, max_results: int, papers):
+    """Pass papers through, storing them once the search has been read to the end."""
+    fetched = []
+    for paper in papers:
+        fetched.append(paper)
+        yield paper
+
+    # A caller that stopped early (Search_arXiv's output cap) leaves the result partial
+    if fetched:
+        paper_store.put(query, max_results, fetched, len(fetched) < min(max_results, ArxivConfig.MAX_RESULTS))
+
+
+def collect_arxiv_papers(query: str, max_results: int, accept=None, limit: int = None) -> list:
+    """
+    Get arxiv papers that pass a filter, stopping early once enough are found
+    :param query: the topic related to the papers retrieved
+    :param max_results: The maximum number of papers to pull from arXiv
+    :param accept: Optional predicate on a paper record
+    :param limit: Stop after this many accepted papers
+    :returns: Accepted paper records in relevance order
+    """
+    accepted = []
+
+    for paper in iter_arxiv_papers(query, max_results):
+        if accept is None or accept(paper):
+            accepted.append(paper)
+            if limit is not None and len(accepted) >= limit:
+                # Closing the generator means no further pages are requested
+                break
+
+    return accepted
+
+
+def _import_arxiv():
+    # Ensure that the arxiv library is imported
     try:
         import arxiv
-    except ModuleNotFoundError: 
+    except ModuleNotFoundError:
         try:
             subprocess.check_call([sys.executable, "-m", "pip", "install", "arxiv"])
-            
+
         except Exception as install_error:
-            print(f"Details: {install_error}")
+            logger.warning("Could not install the arxiv package: %s", install_error)
+
+        import arxiv
+
+    return arxiv
+
+
+# arXiv's request spacing applies per client machine, not per arxiv.Client,
+# so concurrent searches from different teams share one gate
+_request_gate = threading.Lock()
+_last_request_at = 0.0
+
+
+def _wait_for_request_slot() -> None:
+    global _last_request_at
+
+    with _request_gate:
+        wait = _last_request_at + ArxivConfig.REQUEST_SPACING_SECONDS - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request_at = time.monotonic()
+
+
+def _is_transient(arxiv, error: Exception) -> bool:
+    if isinstance(error, arxiv.HTTPError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, arxiv.UnexpectedEmptyPageError)
+
+
+def iter_arxiv_papers(query: str, max_results: int, page_size: int = ArxivConfig.PAGE_SIZE, start: int = 0):
+    """
+    Stream arxiv papers page by page, retrying transient failures
+    :param query: the topic related to the papers retrieved
+    :param max_results: The maximum number of papers to yield (clamped to ArxivConfig.MAX_RESULTS)
+    :param page_size: The number of papers requested per arXiv API call
+    :param start: The number of leading results to skip; they count towards max_results
+    :returns: A generator of paper records; pages are only fetched as they are consumed
+    """
+    arxiv = _import_arxiv()
 
     # Handles in case the query is not a string or max_results a integer
-    if not query or not isinstance(query, str): 
+    if not query or not isinstance(query, str):
         raise ValueError(f"Query must be a nom-empty string. Found value: {query}")
-    
-    if not isinstance(max_results, int) and max_results>1000 or max_results<=1:
-            raise ValueError(f"must be a integer between 1 and 1000. Found value: {max_results}")
-    
 
-    try:
+    if not isinstance(max_results, int) or max_results < 1:
+        raise ValueError(f"must be a positive integer. Found value: {max_results}")
+
+    max_results = min(max_results, ArxivConfig.MAX_RESULTS)
+    if start >= max_results:
+        return
+
+    # Retries are handled here with exponential backoff instead of the
+    # client's fixed delay, and requests are spaced by the process-wide gate
+    client = arxiv.Client(delay_seconds=0, num_retries=0)
+
+    yielded = start
+    attempt = 0
+
+    while yielded < max_results:
+        # One request per page, so every page passes the gate
+        size = min(page_size, max_results - yielded)
+        client.page_size = size
         search = arxiv.Search(
             query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance 
+            max_results=yielded + size,
+            sort_by=arxiv.SortCriterion.Relevance
         )
-        
-        results = list(search.results())
 
-        if not results:
-            raise ValueError("No papers found related to the search query")
+        _wait_for_request_slot()
+        try:
+            # Resume after the last paper already handed out
+            page = list(client.results(search, offset=yielded))
+        except arxiv.ArxivError as e:
+            if not _is_transient(arxiv, e) or attempt >= ArxivConfig.MAX_RETRIES:
+                raise arxiv.ArxivError(e.url, e.retry, f"arXiv API error: {str(e)}") from e
 
-        paper_details = []
+            backoff = min(
+                ArxivConfig.BACKOFF_MAX_SECONDS,
+                max(ArxivConfig.REQUEST_SPACING_SECONDS, ArxivConfig.BACKOFF_BASE_SECONDS * 2 ** attempt),
+            )
+            attempt += 1
+            time.sleep(backoff)
+            continue
 
-        for i, result in enumerate(results):
-            summary = result.summary.replace('\n', ' ')
-            authors = ", ".join(author.name for author in result.authors)
+        attempt = 0
+        for result in page:
+            yielded += 1
+            yield {
+                "id": yielded,
+                "title": " ".join(result.title.split()),
+                "authors": ", ".join(author.name for author in result.authors),
+                "published": result.published.date().isoformat(),
+                # Date of the returned version; published is always the v1 date
+                "updated": result.updated.date().isoformat(),
+                "url": result.entry_id,
+                "abstract": result.summary.replace('\n', ' '),
+            }
 
-            paper_details.append(
-                f"Paper {i+1}:\n"
-                f"  Title: {result.title}\n"
-                f"  Authors: {authors}\n"
-                f"  URL: {result.entry_id}\n"
-                f"  Abstract: {summary}...\n"
-            )
-            
-        return "\n".join(paper_details)
-    
-    except arxiv.ArxivError as e: 
-        raise arxiv.ArxivError(f"arXiv API error: {str(e)}") from e 
+        # A short page is the end of the results
+        if len(page) < size:
+            return
@@ -0,0 +1,98 @@
+"""
+Section-parallel literature review writer.
+The independent body sections are generated concurrently from the same paper
+context, the introduction and conclusion are written from those sections, and
+the paper list is rendered from the records without the model.
+"""
+
+import asyncio
+
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+
+from papers import format_paper_context, render_paper_list
+from prompts import WRITER_FRAMING_INSTRUCTIONS, WRITER_SECTION_INSTRUCTIONS, WRITER_SECTION_PROMPT
+
+
+class SectionWriter:
+    """
+    Writes a literature review section by section.
+
+    Wall-clock time is roughly the longest body section plus the longer of the
+    introduction and conclusion, instead of one long sequential generation.
+    """
+
+    def __init__(self, model_client: ChatCompletionClient):
+        """
+        Args:
+            model_client (ChatCompletionClient): Client used for every section
+        """
+        self.model_client = model_client
+
+        # Token usage of the most recent write() call
+        self.last_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+    async def write(self, task: str, papers: list) -> str:
+        """
+        Write the full literature review.
+
+        Args:
+            task (str): The user's research query
+            papers (list): Selected paper records
+
+        Returns:
+            str: Markdown literature review ending with the reviewed papers
+        """
+        self.last_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        paper_context = format_paper_context(papers)
+
+        body = await self._write_sections(task, paper_context, WRITER_SECTION_INSTRUCTIONS)
+
+        # Introduction and conclusion frame the body, so they see it
+        body_text = "\n\n".join(f"### {title}\n\n{text}" for title, text in body.items())
+        framing = await self._write_sections(
+            task,
+            paper_context,
+            {
+                title: f"{instruction}\nThe body of the review reads:\n\n{body_text}"
+                for title, instruction in WRITER_FRAMING_INSTRUCTIONS.items()
+            },
+        )
+
+        sections = {
+            "Introduction & Scope": framing["Introduction & Scope"],
+            **body,
+            "Conclusion & Future Directions": framing["Conclusion & Future Directions"],
+            "Reviewed Papers": render_paper_list(papers),
+        }
+        return "\n\n".join(f"### {title}\n\n{text}" for title, text in sections.items())
+
+    async def _write_sections(self, task: str, paper_context: str, instructions: dict) -> dict:
+        """
+        Generate several sections concurrently.
+
+        Args:
+            task (str): The user's research query
+            paper_context (str): Shared paper block
+            instructions (dict): Section title -> section instruction
+
+        Returns:
+            dict: Section title -> generated text, in the order given
+        """
+        texts = await asyncio.gather(
+            *(self._write_section(task, paper_context, instruction) for instruction in instructions.values())
+        )
+        return dict(zip(instructions.keys(), texts))
+
+    async def _write_section(self, task: str, paper_context: str, instruction: str) -> str:
+        # Stable content first (system prompt, papers), variable text last
+        messages = [
+            SystemMessage(content=WRITER_SECTION_PROMPT),
+            UserMessage(
+                content=f"Papers:\n\n{paper_context}\n\nUser request: {task}\n\n{instruction}",
+                source="user",
+            ),
+        ]
+        result = await self.model_client.create(messages)
+        self.last_usage["prompt_tokens"] += result.usage.prompt_tokens
+        self.last_usage["completion_tokens"] += result.usage.completion_tokens
+        return str(result.content).strip()
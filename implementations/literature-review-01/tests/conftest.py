@@ -0,0 +1,9 @@
+"""
+Test setup: the modules in src import each other by bare name (as the
+agent workers do), so src is put on the import path.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,75 @@
+from datetime import date
+
+import pytest
+
+from citation_index import CitationIndex, build_index
+
+
+@pytest.fixture
+def index(tmp_path):
+    index_path, venues_path = tmp_path / "index.npy", tmp_path / "venues.json"
+    build_index([
+        {"arxiv_id": "2001.00001v2", "citations": 10, "venue": "Workshop", "venue_tier": 1},
+        {"arxiv_id": "2001.00002", "citations": 1000, "influential_citations": 50, "venue": "NeurIPS", "venue_tier": 3},
+        {"arxiv_id": "2001.00001", "citations": 20, "venue": "Workshop", "venue_tier": 1},
+        {"arxiv_id": "hep-th/9901001", "citations": 5, "venue_tier": 7},
+    ], index_path, venues_path)
+    return CitationIndex(index_path, venues_path)
+
+
+def paper(arxiv_id):
+    return {"id": 0, "title": arxiv_id, "authors": "", "published": "2020-01-01",
+            "url": f"http://arxiv.org/abs/{arxiv_id}", "abstract": ""}
+
+
+def test_unavailable_without_index_file(tmp_path):
+    assert not CitationIndex(tmp_path / "missing.npy", tmp_path / "missing.json").available()
+
+
+def test_lookup_ignores_versions_and_reports_missing_papers(index):
+    rows, found = index.lookup([
+        "http://arxiv.org/abs/2001.00002v3",
+        "2001.00001",
+        "http://arxiv.org/abs/2999.99999v1",
+        "hep-th/9901001v1",
+    ])
+    assert found.tolist() == [True, True, False, True]
+    assert rows["citations"].tolist() == [1000, 20, 0, 5]
+    # Venue tiers are clamped to 0-3
+    assert rows["venue_tier"].tolist() == [3, 1, 0, 3]
+    assert index.venue_name(int(rows["venue"][0])) == "NeurIPS"
+    assert index.venue_name(int(rows["venue"][3])) is None
+
+
+def test_last_record_of_a_paper_wins(index):
+    rows, _ = index.lookup(["2001.00001"])
+    assert rows["citations"][0] == 20
+
+
+def test_lookup_in_empty_index(tmp_path):
+    build_index([], tmp_path / "index.npy", tmp_path / "venues.json")
+    rows, found = CitationIndex(tmp_path / "index.npy", tmp_path / "venues.json").lookup(["2001.00001"])
+    assert not found.any()
+    assert len(rows) == 1
+
+
+def test_rank_puts_well_cited_papers_first(index):
+    ranked = index.rank([paper("2999.00001v1"), paper("2001.00002v1")], today=date(2021, 1, 1))
+    assert [p["url"] for p in ranked] == ["http://arxiv.org/abs/2001.00002v1", "http://arxiv.org/abs/2999.00001v1"]
+    assert [p["id"] for p in ranked] == [1, 2]
+    assert ranked[0]["citations"] == 1000
+    assert ranked[0]["influential_citations"] == 50
+    assert ranked[0]["venue"] == "NeurIPS"
+    assert ranked[0]["prior_score"] > ranked[1]["prior_score"]
+    assert "citations" not in ranked[1]
+
+
+def test_rank_keeps_search_order_for_papers_not_in_the_index(index):
+    papers = [paper("2999.00001"), paper("2999.00002"), paper("2999.00003")]
+    ranked = index.rank(papers, today=date(2021, 1, 1))
+    assert [p["title"] for p in ranked] == ["2999.00001", "2999.00002", "2999.00003"]
+    assert all("citations" not in p for p in ranked)
+
+
+def test_rank_of_no_papers(index):
+    assert index.rank([]) == []
@@ -0,0 +1,82 @@
+import pytest
+
+from dedup import collapse_near_duplicates, estimated_similarity, minhash_signature, normalize_entry_id
+
+
+def paper(url, title, abstract="", published="2024-01-01", updated=None):
+    record = {"id": 0, "title": title, "authors": "A. Author", "published": published, "url": url, "abstract": abstract}
+    if updated is not None:
+        record["updated"] = updated
+    return record
+
+
+@pytest.mark.parametrize("url, entry_id", [
+    ("http://arxiv.org/abs/2401.01234v2", ("2401.01234", 2)),
+    ("https://arxiv.org/abs/2401.01234", ("2401.01234", 0)),
+    ("2401.01234v11", ("2401.01234", 11)),
+    ("http://arxiv.org/abs/hep-th/9901001v1", ("hep-th/9901001", 1)),
+])
+def test_normalize_entry_id(url, entry_id):
+    assert normalize_entry_id(url) == entry_id
+
+
+def test_similarity_of_identical_and_unrelated_texts():
+    text = minhash_signature("graph neural networks for molecule property prediction")
+    other = minhash_signature("a survey of reinforcement learning from human feedback")
+    assert estimated_similarity(text, text) == 1.0
+    assert estimated_similarity(text, other) == 0.0
+    assert estimated_similarity(set(), text) == 0.0
+
+
+def test_versions_collapse_to_the_highest_version():
+    papers = [
+        paper("http://arxiv.org/abs/2401.00001v1", "First title"),
+        paper("http://arxiv.org/abs/2402.00002v1", "Other paper"),
+        paper("http://arxiv.org/abs/2401.00001v3", "Revised title"),
+    ]
+    unique = collapse_near_duplicates(papers)
+    assert [p["url"] for p in unique] == [
+        "http://arxiv.org/abs/2401.00001v3",
+        "http://arxiv.org/abs/2402.00002v1",
+    ]
+    assert [p["id"] for p in unique] == [1, 2]
+
+
+def test_variants_collapse_to_the_latest_update_not_the_first_publication():
+    abstract = "We propose a scalable method for training sparse mixture of experts models on long sequences."
+    papers = [
+        # The workshop paper was published first but the journal version was updated later
+        paper("http://arxiv.org/abs/2301.00001v1", "Sparse Mixture of Experts at Scale", abstract,
+              published="2023-01-01", updated="2023-01-01"),
+        paper("http://arxiv.org/abs/2301.00009v2", "Sparse Mixture of Experts at Scale", abstract,
+              published="2023-01-02", updated="2024-06-01"),
+        paper("http://arxiv.org/abs/2201.00005v4", "Sparse Mixture of Experts at Scale", abstract,
+              published="2022-01-01", updated="2023-03-01"),
+    ]
+    unique = collapse_near_duplicates(papers)
+    assert len(unique) == 1
+    assert unique[0]["url"] == "http://arxiv.org/abs/2301.00009v2"
+
+
+def test_group_keeps_the_rank_of_its_best_member():
+    abstract = "An empirical study of retrieval augmented generation for question answering."
+    papers = [
+        paper("http://arxiv.org/abs/2401.00001v1", "Unrelated first result", "Completely different content here."),
+        paper("http://arxiv.org/abs/2401.00002v1", "RAG for QA", abstract),
+        paper("http://arxiv.org/abs/2401.00003v1", "Something else", "Yet another unrelated abstract text."),
+        paper("http://arxiv.org/abs/2401.00002v2", "RAG for QA", abstract),
+    ]
+    unique = collapse_near_duplicates(papers)
+    assert [p["url"] for p in unique] == [
+        "http://arxiv.org/abs/2401.00001v1",
+        "http://arxiv.org/abs/2401.00002v2",
+        "http://arxiv.org/abs/2401.00003v1",
+    ]
+
+
+def test_distinct_papers_are_kept():
+    papers = [
+        paper(f"http://arxiv.org/abs/2401.0000{i}v1", f"Title number {i}", f"Abstract about topic {i} and nothing else {i}")
+        for i in range(5)
+    ]
+    assert len(collapse_near_duplicates(papers)) == 5
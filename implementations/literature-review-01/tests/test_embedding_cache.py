@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import sys
+
+import numpy as np
+import pytest
+
+from embedding_cache import EmbeddingCache
+
+
+def vector_of(text: str, dim: int = 4) -> np.ndarray:
+    """Deterministic fake embedding: every component is the number at the end of the text."""
+    return np.full(dim, float(text.rsplit(" ", 1)[-1]), dtype=np.float32)
+
+
+class Embedder:
+    """Fake embedding model that records the texts it was asked to embed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [vector_of(text) for text in texts]
+
+
+def test_only_missing_texts_are_computed(tmp_path):
+    cache, compute = EmbeddingCache(tmp_path), Embedder()
+    first = cache.embed("model", ["text 1", "text 2"], compute)
+    second = cache.embed("model", ["text 2", "text 3", "text 1"], compute)
+
+    assert compute.calls == [["text 1", "text 2"], ["text 3"]]
+    np.testing.assert_array_equal(first, np.stack([vector_of("text 1"), vector_of("text 2")]))
+    np.testing.assert_array_equal(second, np.stack([vector_of(t) for t in ["text 2", "text 3", "text 1"]]))
+    assert cache.stats()["hits"] == 2
+
+
+def test_identical_texts_in_a_batch_are_embedded_once(tmp_path):
+    cache, compute = EmbeddingCache(tmp_path), Embedder()
+    vectors = cache.embed("model", ["text 5", "text 5", "text 6"], compute)
+    assert compute.calls == [["text 5", "text 6"]]
+    assert vectors.shape == (3, 4)
+
+
+def test_async_embed(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+
+    async def compute(texts):
+        return [vector_of(text) for text in texts]
+
+    vectors = asyncio.run(cache.aembed("model", ["text 7"], compute))
+    np.testing.assert_array_equal(vectors[0], vector_of("text 7"))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache, compute = EmbeddingCache(tmp_path, capacity=2), Embedder()
+    cache.embed("model", ["text 1", "text 2"], compute)
+    cache.embed("model", ["text 1"], compute)
+    cache.embed("model", ["text 3"], compute)
+
+    _, missing = cache.lookup("model", ["text 1", "text 2", "text 3"])
+    assert missing == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_models_are_cached_separately(tmp_path):
+    cache, compute = EmbeddingCache(tmp_path), Embedder()
+    cache.embed("model-a", ["text 1"], compute)
+    _, missing = cache.lookup("model-b", ["text 1"])
+    assert missing == [0]
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    cache.store("model", ["text 1"], [vector_of("text 1", dim=4)])
+    with pytest.raises(ValueError):
+        cache.store("model", ["text 2"], [vector_of("text 2", dim=8)])
+
+
+def test_row_reused_by_another_process_is_not_returned(tmp_path):
+    # Two caches on one directory stand for two processes
+    first, second = EmbeddingCache(tmp_path, capacity=1), EmbeddingCache(tmp_path, capacity=1)
+    first.embed("model", ["text 1"], Embedder())
+
+    # The other process evicts the entry and stores its own in the same row
+    second.embed("model", ["text 2"], Embedder())
+
+    vectors, missing = first.lookup("model", ["text 1", "text 2"])
+    assert missing == [0]
+    np.testing.assert_array_equal(vectors[1], vector_of("text 2"))
+
+
+def test_entries_stored_by_another_process_are_found(tmp_path):
+    first, second = EmbeddingCache(tmp_path), EmbeddingCache(tmp_path)
+    first.embed("model", ["text 0"], Embedder())
+    second.embed("model", ["text 1"], Embedder())
+
+    compute = Embedder()
+    vectors = first.embed("model", ["text 1", "text 0"], compute)
+    assert compute.calls == []
+    np.testing.assert_array_equal(vectors, np.stack([vector_of("text 1"), vector_of("text 0")]))
+
+
+def _embed_in_worker(directory: str, worker: int, errors) -> None:
+    cache = EmbeddingCache(directory, capacity=16)
+    wrong = 0
+    for round_ in range(30):
+        texts = [f"text {worker * 1000 + round_ * 10 + i}" for i in range(5)] + ["text 1"]
+        vectors = cache.embed("model", texts, lambda pending: [vector_of(text) for text in pending])
+        wrong += sum(not np.array_equal(vector, vector_of(text)) for text, vector in zip(texts, vectors))
+    errors.put(wrong)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test_concurrent_processes_get_their_own_vectors(tmp_path):
+    context = multiprocessing.get_context("fork")
+    errors = context.Queue()
+    workers = [context.Process(target=_embed_in_worker, args=(str(tmp_path), worker, errors)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+
+    assert [process.exitcode for process in workers] == [0] * 4
+    assert [errors.get(timeout=5) for _ in workers] == [0] * 4
@@ -0,0 +1,101 @@
+import time
+
+import paper_store
+from paper_store import PaperStore, entry_key, normalize_query
+
+
+def paper(number: int, version: int = 1) -> dict:
+    return {
+        "id": number,
+        "title": f"Paper title {number} – ünïcode",
+        "authors": "A. Author, B. Author",
+        "published": "2024-01-01",
+        "updated": "2024-02-01",
+        "url": f"http://arxiv.org/abs/2401.{number:05d}v{version}",
+        "abstract": f"Abstract of paper {number}.",
+    }
+
+
+def without_id(record: dict) -> dict:
+    return {key: value for key, value in record.items() if key != "id"}
+
+
+def test_entry_key_and_query_normalization():
+    assert entry_key(paper(3, version=2)) == "2401.00003v2"
+    assert entry_key({"url": "2401.00003"}) == "2401.00003"
+    assert normalize_query("  Graph   Neural\tNetworks ") == "graph neural networks"
+
+
+def test_stored_search_is_read_back(tmp_path):
+    store = PaperStore(tmp_path)
+    papers = [paper(i) for i in range(1, 4)]
+    store.put("graph networks", 3, papers)
+
+    found = store.search("Graph  networks", 3)
+    assert [without_id(p) for p in found] == [without_id(p) for p in papers]
+    assert [p["id"] for p in found] == [1, 2, 3]
+    assert store.stats()["hits"] == 1
+
+
+def test_smaller_request_is_served_from_a_larger_result(tmp_path):
+    store = PaperStore(tmp_path)
+    store.put("graph networks", 5, [paper(i) for i in range(1, 6)])
+    assert [p["url"] for p in store.search("graph networks", 2)] == [paper(1)["url"], paper(2)["url"]]
+
+
+def test_larger_request_misses_unless_the_search_was_exhausted(tmp_path):
+    store = PaperStore(tmp_path)
+    store.put("graph networks", 3, [paper(i) for i in range(1, 4)])
+    store.put("rare topic", 3, [paper(9)], exhausted=True)
+
+    assert store.search("graph networks", 10) is None
+    assert len(store.search("rare topic", 10)) == 1
+    assert store.search("unknown", 1) is None
+
+
+def test_results_expire(tmp_path):
+    store = PaperStore(tmp_path, ttl_seconds=0.05)
+    store.put("graph networks", 1, [paper(1)])
+    time.sleep(0.1)
+    assert store.search("graph networks", 1) is None
+
+
+def test_another_process_reads_the_stored_papers(tmp_path):
+    writer, reader = PaperStore(tmp_path), PaperStore(tmp_path)
+    writer.put("graph networks", 2, [paper(1), paper(2)])
+
+    assert [p["url"] for p in reader.search("graph networks", 2)] == [paper(1)["url"], paper(2)["url"]]
+    assert reader.get([entry_key(paper(2)), "2999.99999v1"]) == [without_id(paper(2)), None]
+
+
+def test_papers_are_written_once(tmp_path):
+    store = PaperStore(tmp_path)
+    store.put("first query", 2, [paper(1), paper(2)])
+    store.put("second query", 2, [paper(2), paper(3)])
+    assert store.stats()["stored_papers"] == 3
+    assert store.stats()["papers"] == 3
+
+
+def test_compaction_keeps_fresh_results(tmp_path):
+    store = PaperStore(tmp_path, compact_after=2)
+    for number in range(1, 5):
+        store.put(f"query {number}", 1, [paper(number)])
+
+    stats = store.stats()
+    assert stats["compactions"] >= 1
+    assert stats["segments"] < 4
+    for number in range(1, 5):
+        assert store.search(f"query {number}", 1)[0]["url"] == paper(number)["url"]
+
+    # A process that attached the removed segments starts over from the listing
+    assert PaperStore(tmp_path).search("query 1", 1)[0]["url"] == paper(1)["url"]
+
+
+def test_segments_without_updated_are_still_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(paper_store, "FIELDS", paper_store.FIELDS[:-1])
+    PaperStore(tmp_path).put("graph networks", 2, [paper(1), paper(2)])
+    monkeypatch.undo()
+
+    found = PaperStore(tmp_path).search("graph networks", 2)
+    assert [p["abstract"] for p in found] == ["Abstract of paper 1.", "Abstract of paper 2."]
+    assert "updated" not in found[0]
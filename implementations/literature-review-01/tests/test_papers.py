@@ -0,0 +1,65 @@
+from papers import PaperScore, ReviewerSelection, format_papers, parse_papers, rehydrate_selection
+
+
+def records():
+    return [
+        {
+            "id": 1,
+            "title": "Attention Is All You Need",
+            "authors": "A. Vaswani, N. Shazeer",
+            "published": "2017-06-12",
+            "url": "http://arxiv.org/abs/1706.03762v7",
+            "abstract": "The dominant sequence transduction models are based on recurrent networks.",
+        },
+        {
+            "id": 2,
+            "title": "BERT: Pre-training of Deep Bidirectional Transformers",
+            "authors": "J. Devlin",
+            "published": "2018-10-11",
+            "url": "http://arxiv.org/abs/1810.04805v2",
+            "abstract": "We introduce a new language representation model.",
+        },
+    ]
+
+
+def test_parse_papers_reads_back_format_papers():
+    assert parse_papers(format_papers(records())) == records()
+
+
+def test_parse_papers_skips_citation_features():
+    ranked = [
+        dict(paper, citations=120, citations_per_year=17.1, influential_citations=9,
+             venue="NeurIPS", venue_tier=3, prior_score=0.8)
+        for paper in records()
+    ]
+    text = format_papers(ranked)
+    assert "Citations: 120 (17.1/year, 9 influential)" in text
+    assert "Venue: NeurIPS (tier 3 of 3)" in text
+    assert parse_papers(text) == records()
+
+
+def test_parse_papers_of_text_without_papers():
+    assert parse_papers("No papers found") == []
+
+
+def test_rehydrate_selection_keeps_the_reviewer_order():
+    selection = ReviewerSelection(rationale="Both matter.", selected=[
+        PaperScore(id=2, score="High", rationale="Pre-training."),
+        PaperScore(id=1, score="Medium", rationale="Architecture."),
+    ])
+    selected = rehydrate_selection(records(), selection)
+    assert [paper["id"] for paper in selected] == [2, 1]
+    assert selected[0]["title"] == records()[1]["title"]
+    assert selected[0]["score"] == "High"
+    assert selected[0]["score_rationale"] == "Pre-training."
+
+
+def test_rehydrate_selection_drops_unknown_and_repeated_ids():
+    selection = ReviewerSelection(rationale="", selected=[
+        PaperScore(id=9, score="High", rationale="Invented."),
+        PaperScore(id=1, score="High", rationale="First."),
+        PaperScore(id=1, score="Low", rationale="Again."),
+    ])
+    selected = rehydrate_selection(records(), selection)
+    assert len(selected) == 1
+    assert selected[0]["score_rationale"] == "First."
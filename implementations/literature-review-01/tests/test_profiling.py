@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from profiling import RunProfiler
+
+
+def busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+async def profiled_run(run_id: str, output_dir) -> dict:
+    profiler = RunProfiler(run_id, mode="deterministic", output_dir=output_dir, top_n=5)
+    profiler.start()
+    try:
+        for _ in range(3):
+            busy(20000)
+            await asyncio.sleep(0.02)
+        return profiler.write(task=run_id)
+    finally:
+        profiler.stop()
+
+
+def test_overlapping_deterministic_runs(tmp_path):
+    async def main():
+        return await asyncio.gather(profiled_run("first", tmp_path), profiled_run("second", tmp_path))
+
+    first, second = asyncio.run(main())
+
+    # Only one run can hold cProfile; the other one is sampled
+    assert sorted([first["mode"], second["mode"]]) == ["deterministic", "sampling"]
+    for summary in (first, second):
+        assert (tmp_path / summary["profile"].split("/")[-1]).exists()
+    lines = (tmp_path / "summaries.jsonl").read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["run_id"] for line in lines) == ["first", "second"]
+
+    # Released once the run is done
+    assert asyncio.run(profiled_run("third", tmp_path))["mode"] == "deterministic"
+
+
+def test_deterministic_profile_has_hotspots(tmp_path):
+    summary = asyncio.run(profiled_run("only", tmp_path))
+    assert summary["mode"] == "deterministic"
+    assert summary["profile"].endswith("only.prof")
+    assert any("busy" in row["function"] or "genexpr" in row["function"] for row in summary["hotspots"])
+
+
+def test_stop_is_idempotent(tmp_path):
+    profiler = RunProfiler("twice", mode="deterministic", output_dir=tmp_path)
+    profiler.start()
+    profiler.stop()
+    profiler.stop()
+    assert asyncio.run(profiled_run("after", tmp_path))["mode"] == "deterministic"
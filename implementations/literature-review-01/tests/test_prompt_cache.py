@@ -0,0 +1,68 @@
+import os
+
+from autogen_core.models import AssistantMessage, SystemMessage, UserMessage
+
+from papers import format_papers
+from prompt_cache import assemble_prompt, prompt_text
+from prompts import REVIEWER_SELECTION_PROMPT, SEARCH_RESULTS_MOVED, SHARED_PREAMBLE, WRITER_PROMPT
+
+PAPERS = format_papers([
+    {"id": i, "title": f"Title {i}", "authors": "A. Author", "published": "2024-01-01",
+     "url": f"http://arxiv.org/abs/2401.0000{i}v1", "abstract": f"Abstract {i}."}
+    for i in range(1, 4)
+])
+
+
+def reviewer_prompt(task: str) -> list:
+    return [
+        SystemMessage(content=REVIEWER_SELECTION_PROMPT),
+        UserMessage(content=task, source="user"),
+        UserMessage(content=PAPERS, source="Researcher"),
+    ]
+
+
+def writer_prompt(task: str) -> list:
+    return [
+        SystemMessage(content=WRITER_PROMPT),
+        UserMessage(content=task, source="user"),
+        UserMessage(content=PAPERS, source="Researcher"),
+        UserMessage(content='{"rationale": "r", "selected": []}', source="Reviewer"),
+    ]
+
+
+def test_paper_block_follows_the_shared_preamble():
+    assembled = assemble_prompt(reviewer_prompt("Find 3 papers on graphs"))
+
+    system = assembled[0].content
+    assert system.startswith(SHARED_PREAMBLE.strip())
+    assert system.index(PAPERS.strip()) < system.index(REVIEWER_SELECTION_PROMPT.strip())
+    assert [type(message) for message in assembled] == [SystemMessage, UserMessage, UserMessage]
+    assert assembled[1].content == "Find 3 papers on graphs"
+    # The papers are sent once
+    assert assembled[2].content == SEARCH_RESULTS_MOVED
+    assert assembled[2].source == "Researcher"
+
+
+def test_reviewer_and_writer_share_the_paper_block_prefix():
+    reviewer = prompt_text(assemble_prompt(reviewer_prompt("Find 3 papers on graphs")))
+    writer = prompt_text(assemble_prompt(writer_prompt("Find 3 papers on graphs")))
+    shared = len(os.path.commonprefix([reviewer, writer]))
+    assert shared > reviewer.index(PAPERS.strip()) + len(PAPERS.strip())
+
+    # Without the assembly the prompts part at the system prompt
+    before = os.path.commonprefix([prompt_text(reviewer_prompt("x")), prompt_text(writer_prompt("x"))])
+    assert len(before) < len(PAPERS)
+
+
+def test_prompts_without_papers_are_unchanged():
+    messages = [
+        SystemMessage(content="You are a research assistant."),
+        UserMessage(content="Find 3 papers on graphs", source="user"),
+        AssistantMessage(content="Searching", source="Researcher"),
+    ]
+    assert assemble_prompt(messages) == messages
+
+
+def test_papers_pasted_by_the_user_stay_in_place():
+    messages = [SystemMessage(content="System"), UserMessage(content=PAPERS, source="user")]
+    assert assemble_prompt(messages) == messages
@@ -0,0 +1,42 @@
+import pytest
+
+from request_parsing import DEFAULT_PAPER_COUNT, extract_paper_count, extract_search_intent, query_terms
+
+
+@pytest.mark.parametrize("task, count", [
+    ("Find 3 papers on graph neural networks", 3),
+    ("Search for five recent papers about diffusion models", 5),
+    ("Give me 7 most relevant articles on RLHF", 7),
+    ("Look up papers about quantum error correction, 4 results", 4),
+    ("Papers about transformers", DEFAULT_PAPER_COUNT),
+    ("Find 0 papers on nothing", DEFAULT_PAPER_COUNT),
+])
+def test_extract_paper_count(task, count):
+    assert extract_paper_count(task) == count
+
+
+def test_extract_paper_count_default():
+    assert extract_paper_count("Summarize the field", default=8) == 8
+
+
+@pytest.mark.parametrize("task, intent", [
+    ("Find 3 papers on graph neural networks.", ("graph neural networks", 3)),
+    ("Search for 5 recent papers about 'diffusion models'", ("diffusion models", 5)),
+    ("Look up papers about protein folding, 4 results", ("protein folding", 4)),
+    ("Papers related to sparse attention", ("sparse attention", DEFAULT_PAPER_COUNT)),
+])
+def test_extract_search_intent(task, intent):
+    assert extract_search_intent(task) == intent
+
+
+@pytest.mark.parametrize("task", ["Write a poem", "Find papers on ?"])
+def test_extract_search_intent_without_topic(task):
+    assert extract_search_intent(task) is None
+
+
+def test_query_terms_drops_stopwords_and_folds_plurals():
+    assert query_terms("Recent papers on the Architectures of Transformers") == {"architecture", "transformer"}
+
+
+def test_query_terms_keeps_short_words_and_double_s():
+    assert query_terms("gas loss class") == {"gas", "loss", "class"}
@@ -0,0 +1,125 @@
+import pytest
+
+from config import ArxivConfig, RetrievalConfig
+from retrieval import broaden_query, progressive_search, relevance_score, topic_terms
+
+
+class FakeArxiv:
+    """
+    Page iterator with the signature of tools.iter_arxiv_papers over a fixed
+    result list per query, recording the papers pulled.
+    """
+
+    def __init__(self, results: dict):
+        self.results = results
+        self.pulled = 0
+        self.queries = []
+
+    def __call__(self, query, max_results, page_size=10, start=0):
+        self.queries.append(query)
+        for paper in self.results.get(query, [])[start:max_results]:
+            self.pulled += 1
+            yield paper
+
+
+def papers(count: int, title: str, prefix: str = "2401") -> list:
+    return [
+        {"id": i + 1, "title": f"{title} {i}", "authors": "", "published": "2024-01-01",
+         "url": f"http://arxiv.org/abs/{prefix}.{i:05d}v1", "abstract": ""}
+        for i in range(count)
+    ]
+
+
+def test_topic_terms_drop_filters_with_their_values():
+    query = 'ti:"graph networks" AND cat:cs.LG AND au:"Smith, J" ANDNOT id:2401.00001'
+    assert topic_terms(query) == {"graph", "network"}
+
+
+def test_broaden_query_keeps_filters():
+    query = "all:graph AND all:networks AND cat:cs.LG ANDNOT au:smith"
+    assert broaden_query(query) == "(graph OR networks) AND cat:cs.LG ANDNOT au:smith"
+    assert broaden_query("graph networks") == "graph OR networks"
+    assert broaden_query("graphs cat:cs.LG") is None
+
+
+def test_relevance_score_weights_the_title():
+    terms = topic_terms("graph networks")
+    in_title = {"title": "Graph networks", "abstract": ""}
+    in_abstract = {"title": "A study", "abstract": "graph networks"}
+    assert relevance_score(terms, in_title) == pytest.approx(1.0)
+    assert relevance_score(terms, in_abstract) == pytest.approx(0.7)
+    assert relevance_score(set(), in_abstract) == 1.0
+
+
+@pytest.mark.parametrize("wanted", [2, 3, 5, 10])
+def test_clear_topic_pulls_fewer_abstracts_than_requested(wanted):
+    # The Researcher asks for three candidates per paper the user wants
+    max_results = 3 * wanted
+    fetch = FakeArxiv({"graph networks": papers(200, "Graph networks")})
+    found = progressive_search("graph networks", max_results, fetch, wanted)
+
+    assert fetch.pulled < max_results
+    assert wanted + RetrievalConfig.MARGIN <= len(found) <= max_results
+    assert [paper["id"] for paper in found] == list(range(1, len(found) + 1))
+
+
+def test_stops_pulling_once_enough_papers_are_relevant():
+    fetch = FakeArxiv({"graph networks": papers(200, "Graph networks")})
+    progressive_search("graph networks", 9, fetch, wanted=3)
+    assert fetch.pulled == 3 + RetrievalConfig.MARGIN
+
+
+def test_wanted_papers_default_to_a_third_of_max_results():
+    fetch = FakeArxiv({"graph networks": papers(200, "Graph networks")})
+    progressive_search("graph networks", 9, fetch)
+    assert fetch.pulled == 3 + RetrievalConfig.MARGIN
+
+
+def test_niche_topic_pulls_no_more_than_max_results():
+    results = papers(4, "Graph networks") + papers(100, "Unrelated", prefix="2402")
+    results[7]["abstract"] = "about graph"
+    fetch = FakeArxiv({"graph networks": results})
+    found = progressive_search("graph networks", 9, fetch, wanted=3)
+
+    assert fetch.pulled == 9
+    assert len(found) == 9
+    # The highly relevant papers first, then the best of the others
+    assert [paper["title"] for paper in found[:4]] == [f"Graph networks {i}" for i in range(4)]
+    assert found[4]["abstract"] == "about graph"
+
+
+def test_pull_is_capped_by_arxiv_limit(monkeypatch):
+    monkeypatch.setattr(ArxivConfig, "MAX_RESULTS", 7)
+    fetch = FakeArxiv({"graph networks": papers(200, "Unrelated")})
+    found = progressive_search("graph networks", 30, fetch, wanted=10)
+    assert fetch.pulled == 7
+    assert len(found) == 7
+
+
+def test_returns_what_arxiv_has():
+    fetch = FakeArxiv({"graph networks": papers(2, "Graph networks")})
+    assert len(progressive_search("graph networks", 9, fetch, wanted=3)) == 2
+
+
+def test_versions_are_counted_once():
+    results = papers(3, "Graph networks")
+    results += [dict(paper, url=paper["url"].replace("v1", "v2")) for paper in results]
+    results += papers(10, "Graph networks", prefix="2402")
+    fetch = FakeArxiv({"graph networks": results})
+    found = progressive_search("graph networks", 9, fetch, wanted=3)
+
+    entry_ids = [paper["url"].rsplit("v", 1)[0] for paper in found]
+    assert len(entry_ids) == len(set(entry_ids))
+    assert len(found) >= 3 + RetrievalConfig.MARGIN
+
+
+def test_poor_first_page_broadens_the_query():
+    fetch = FakeArxiv({
+        "graph networks": papers(10, "Unrelated"),
+        "graph OR networks": papers(50, "Graph networks", prefix="2402"),
+    })
+    found = progressive_search("graph networks", 9, fetch, wanted=3)
+    assert fetch.queries[:2] == ["graph networks", "graph OR networks"]
+    # The broadened page fills up what the first one left of max_results
+    assert fetch.pulled == 9
+    assert [paper["title"] for paper in found[:4]] == [f"Graph networks {i}" for i in range(4)]
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+from scheduler import LLMScheduler, Priority
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _serve(scheduler: LLMScheduler, calls: list) -> list:
+    """Hold the only slot while `calls` (name, priority, model) queue up; returns the order they ran in."""
+    order = []
+
+    async def call(name, priority, model):
+        async with scheduler.slot(priority, model):
+            order.append(name)
+
+    await scheduler.acquire(Priority.INTERACTIVE, "a")
+    tasks = []
+    for name, priority, model in calls:
+        tasks.append(asyncio.create_task(call(name, priority, model)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_rejects_no_slots():
+    with pytest.raises(ValueError):
+        LLMScheduler(max_concurrent=0)
+
+
+def test_free_slot_is_granted_at_once():
+    async def main():
+        scheduler = LLMScheduler(max_concurrent=2)
+        await scheduler.acquire(Priority.BACKGROUND)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        return scheduler.stats()
+
+    stats = run(main())
+    assert stats["running"] == 2
+    assert stats["queued"] == 0
+
+
+def test_interactive_calls_go_before_background_calls():
+    scheduler = LLMScheduler(max_concurrent=1)
+    order = run(_serve(scheduler, [
+        ("batch", Priority.BACKGROUND, "a"),
+        ("chat", Priority.INTERACTIVE, "a"),
+    ]))
+    assert order == ["chat", "batch"]
+
+
+def test_aging_promotes_a_waiting_background_call():
+    async def main():
+        scheduler = LLMScheduler(max_concurrent=1, aging_seconds=0.01)
+        order = []
+
+        async def call(name, priority):
+            async with scheduler.slot(priority, "a"):
+                order.append(name)
+
+        await scheduler.acquire(Priority.INTERACTIVE, "a")
+        batch = asyncio.create_task(call("batch", Priority.BACKGROUND))
+        await asyncio.sleep(0.05)
+        chat = asyncio.create_task(call("chat", Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(batch, chat)
+        return order
+
+    assert run(main()) == ["batch", "chat"]
+
+
+def test_calls_for_the_loaded_model_go_first():
+    scheduler = LLMScheduler(max_concurrent=1)
+    order = run(_serve(scheduler, [
+        ("other model", Priority.INTERACTIVE, "b"),
+        ("same model", Priority.INTERACTIVE, "a"),
+    ]))
+    assert order == ["same model", "other model"]
+    assert scheduler.stats()["model_switches"] == 1
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def main():
+        scheduler = LLMScheduler(max_concurrent=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release()
+
+        # The slot is free again
+        await asyncio.wait_for(scheduler.acquire(Priority.BACKGROUND), timeout=1)
+        return scheduler.stats()
+
+    stats = run(main())
+    assert stats["running"] == 1
+    assert stats["queued"] == 0
+
+
+def test_wait_times_are_recorded_per_class():
+    async def main():
+        scheduler = LLMScheduler(max_concurrent=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(Priority.BACKGROUND))
+        await asyncio.sleep(0.02)
+        started = time.monotonic()
+        scheduler.release()
+        await waiter
+        assert time.monotonic() - started < 1
+        return scheduler.stats()["classes"]
+
+    classes = run(main())
+    assert classes["interactive"]["calls"] == 1
+    assert classes["background"]["calls"] == 1
+    assert classes["background"]["max_wait"] >= 0.02
@@ -6,9 +6,15 @@ from autogen_core.memory import ListMemory, MemoryContent, MemoryMimeType
 from autogen_core import CancellationToken
 from autogen_agentchat.ui import Console
 from autogen_agentchat.teams import SelectorGroupChat
-from autogen_agentchat.conditions import TextMentionTermination
+from autogen_agentchat.conditions import (
+    MaxMessageTermination,
+    TextMentionTermination,
+    TimeoutTermination,
+    TokenUsageTermination,
+)
 
 import subprocess
+import threading
 import asyncio
 import sys 
 
@@ -228,26 +234,108 @@ Writing guidelines:
 End your review with exactly: "--- END OF LITERATURE REVIEW ---"
 """
 
-# === Input function (HIL implementation) ===
-def human_input(prompt: str) -> str:
+# === Input channel (HIL implementation) ===
+# How long a plan waits for the human, and the answer used when nobody replies.
+# Silence is not approval: the default stops the run (see main_termination).
+# Pass default="APPROVED" to HumanInputChannel to opt in to auto-approval.
+APPROVAL_TIMEOUT_SECONDS = 300
+APPROVAL_DEFAULT = "TIMEOUT: no approval"
+
+
+class HumanInputChannel:
     """
-    Custom input function for UserProxyAgent
+    Async input channel for UserProxyAgent.
+
+    Answers arrive on a queue that any producer can feed with `submit`: the
+    CLI reader thread below, a Streamlit callback or an HTTP handler. The
+    User agent awaits the queue instead of calling the blocking input(), so
+    other runs, streams and timers keep going while a plan waits.
     """
-    print("\n" + "="*80)
-    print("HUMAN INPUT REQUIRED")
-    print("="*80)
-    print(f"\n{prompt}\n")
-    print("Options:")
-    print("  - Type 'APPROVED' to proceed with the plan")
-    print("  - Type your feedback/changes to revise the plan")
-    print("  - Press Ctrl+C to exit\n")
-    return input("> ").strip()
+
+    def __init__(self, timeout: float = APPROVAL_TIMEOUT_SECONDS, default: str = APPROVAL_DEFAULT):
+        """
+        :param timeout: Seconds to wait for an answer, None to wait forever
+        :param default: Answer used when the timeout expires, a rejection
+            that stops the run unless set to "APPROVED"
+        """
+        self.timeout = timeout
+        self.default = default
+        self._loop = None
+        self._answers = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """
+        Attach the channel to the event loop the team runs on.
+        :param loop: The running loop when omitted
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        self._answers = asyncio.Queue()
+
+    def submit(self, answer: str) -> None:
+        """
+        Feed an answer. Safe to call from any thread.
+        :param answer: The human's reply
+        """
+        if self._loop is None:
+            raise RuntimeError("Call bind() from the event loop before submitting answers")
+        self._loop.call_soon_threadsafe(self._answers.put_nowait, answer.strip())
+
+    def start_cli_reader(self) -> threading.Thread:
+        """
+        Feed every line typed on stdin into the channel from a daemon thread.
+        :returns: The reader thread
+        """
+        def read_lines():
+            for line in sys.stdin:
+                self.submit(line)
+
+        reader = threading.Thread(target=read_lines, name="human-input-reader", daemon=True)
+        reader.start()
+        return reader
+
+    async def ask(self, prompt: str, cancellation_token: CancellationToken | None = None) -> str:
+        """
+        Input function for UserProxyAgent: show the prompt and await an answer.
+        :param prompt: Question from the agent
+        :param cancellation_token: Cancels the wait when the run is cancelled
+        :returns: The answer, or the default after the timeout
+        """
+        if self._answers is None:
+            self.bind()
+
+        # Lines typed before the question are not answers to it
+        while not self._answers.empty():
+            self._answers.get_nowait()
+
+        print("\n" + "="*80)
+        print("HUMAN INPUT REQUIRED")
+        print("="*80)
+        print(f"\n{prompt}\n")
+        print("Options:")
+        print("  - Type 'APPROVED' to proceed with the plan")
+        print("  - Type your feedback/changes to revise the plan")
+        if self.timeout is not None:
+            print(f"  - No answer within {self.timeout:g}s means '{self.default}'")
+        print("  - Press Ctrl+C to exit\n")
+        print("> ", end="", flush=True)
+
+        answer = asyncio.ensure_future(self._answers.get())
+        if cancellation_token is not None:
+            cancellation_token.link_future(answer)
+        try:
+            return await asyncio.wait_for(answer, self.timeout)
+        except asyncio.TimeoutError:
+            print(f"\nNo answer within {self.timeout:g}s, answering '{self.default}'")
+            return self.default
+
+
+human_channel = HumanInputChannel()
 
 # === Agents ===
 user_proxy = UserProxyAgent(
     name="User",
     description="Human in the loop for approving or revising plans",
-    input_func=human_input
+    input_func=human_channel.ask
 )
 
 planner = AssistantAgent(
@@ -288,26 +376,38 @@ writer = AssistantAgent(
 
 
 
+# === Run budgets ===
+# Caps so a confused selector or a looping agent cannot burn minutes of model time
+MAX_TURNS = 20
+MAX_MESSAGES = 30
+MAX_SECONDS = 900
+MAX_TOTAL_TOKENS = 100000
+
 main_termination = (
     TextMentionTermination("EXECUTION COMPLETE")
-    | TextMentionTermination("END OF LITERATURE REVIEW")
+    | TextMentionTermination("END OF LITERATURE REVIEW", sources=["Writer"])
+    | TextMentionTermination(APPROVAL_DEFAULT, sources=["User"])
+    | MaxMessageTermination(MAX_MESSAGES)
+    | TimeoutTermination(MAX_SECONDS)
+    | TokenUsageTermination(max_total_token=MAX_TOTAL_TOKENS)
 ) 
 
 main_team = SelectorGroupChat(
     participants=[planner, user_proxy, orchestrator, researcher, reviewer, writer],
     model_client=ollama_client_granite,
     termination_condition=main_termination,
+    max_turns=MAX_TURNS,
     name="LiteratureReviewSystem",
     description="Complete literature review system with human-in-the-loop planning"
 )
 
 async def main():
- 
+    human_channel.bind()
+    human_channel.start_cli_reader()
 
     task = "Create a research plan for Human-AI interaction and cognitive flow."
 
-   
-    
+    await Console(main_team.run_stream(task=task))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,42 @@
 import asyncio
+import sys
+from pathlib import Path
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.ui import Console
 from autogen_core.memory import MemoryContent
 from autogen_ext.memory.mem0 import Mem0Memory
 from autogen_ext.models.ollama import OllamaChatCompletionClient
 
+# The embedding cache of the literature review implementation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "implementations" / "literature-review-01" / "src"))
+from embedding_cache import embedding_cache
+
+EMBEDDING_MODEL = "nomic-embed-text:latest"
+
+
+class CachedEmbedder:
+    """
+    Wraps mem0's embedder so identical texts (repeated adds, repeated
+    queries) are embedded once, across runs, through the shared cache.
+    """
+
+    def __init__(self, embedder, model: str):
+        self._embedder = embedder
+        self._model = model
+
+    def embed(self, text, memory_action=None):
+        def compute(texts):
+            return [self._embedder.embed(t, memory_action) for t in texts]
+
+        # Some embedders prefix the text by action (add, search, update), so
+        # vectors of different actions must not share cache entries
+        model = f"{self._model}:{memory_action}" if memory_action else self._model
+        return embedding_cache.embed(model, [text], compute)[0].tolist()
+
+    def __getattr__(self, name):
+        return getattr(self._embedder, name)
+
+
 async def main() -> None:
     
     # --- 1. CONFIGURE LOCAL MEMORY (With Nomic Embeddings) ---
@@ -18,7 +50,7 @@ async def main() -> None:
         "embedder": {
             "provider": "ollama",
             "config": {
-                "model": "nomic-embed-text:latest"  # <--- UPDATED HERE
+                "model": EMBEDDING_MODEL  # <--- UPDATED HERE
             }
         },
         "llm": {
@@ -36,6 +68,9 @@ async def main() -> None:
         config=local_mem0_config,
         limit=5,
     )
+    # Mem0Memory has no hook for a custom embedder: this replaces private
+    # state (_client.embedding_model) and may break on an autogen/mem0 upgrade
+    mem0_memory._client.embedding_model = CachedEmbedder(mem0_memory._client.embedding_model, EMBEDDING_MODEL)
 
     # --- 2. ADD DATA ---
     await mem0_memory.add(
@@ -75,5 +110,7 @@ async def main() -> None:
     stream = assistant_agent.run_stream(task="What are my dietary preferences?")
     await Console(stream)
 
+    print(f"\nEmbedding cache: {embedding_cache.stats()}")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file